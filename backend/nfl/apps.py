@@ -1,6 +1,19 @@
+import importlib
 from django.apps import AppConfig
+from django.conf import settings
+
+# Imported on first use unless DEFER_HEAVY_IMPORTS is off
+HEAVY_IMPORTS = ['numpy', 'requests']
 
 
 class NflConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'nfl'
+
+    def ready(self):
+        # metrics wraps every database connection as it opens, so it goes in first
+        from . import metrics, signals  # noqa: F401
+        if not getattr(settings, 'DEFER_HEAVY_IMPORTS', True):
+            # Long-running workers pay for these once at boot instead of on the first job
+            for module in HEAVY_IMPORTS:
+                importlib.import_module(module)
@@ -0,0 +1,260 @@
+"""Latency and query-count benchmark of every API route against a synthetic season.
+
+load_season_fixture() fills an empty database with a full season: 32 teams,
+18 regular-season and 5 postseason weeks, about 300 games with outcomes,
+states and odds history, 53-man rosters with season stats, team stats and
+weekly team stat snapshots. run() then requests each route once with every
+cache cleared (the cold build) and `runs` times warm, through the test
+client and the full middleware stack. Nothing touches the network.
+
+Results are compared to BASELINE_PATH: query counts may not go up, and
+latencies may not exceed the baseline by more than LATENCY_TOLERANCE (or
+LATENCY_SLACK_MS for very fast views, where timer noise dominates). The
+latencies were recorded on one machine, so the test suite only checks query
+counts unless NFL_TIMING_TESTS=1; benchmark_endpoints checks both.
+"""
+import json
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from . import team_trends, urls
+from .models import (Athlete, Calendar, Game, GameState, OddsSnapshot, Outcome, SeasonStatistic, StatTeam, Team,
+                     TeamStatSnapshot, normalize_position)
+from .gamelog import STAT_MAPPINGS
+from utils import calendar_index
+import utils.get_data as get_data
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'benchmark_baseline.json')
+LATENCY_TOLERANCE = 2.0
+LATENCY_SLACK_MS = 25
+
+# The SSE stream never finishes, so it can't be timed like the other routes
+SKIP_ROUTES = {'live_scores'}
+FIRST_EVENT_ID = 401000001
+SAMPLE_KWARGS = {
+    'games_by_week': {'week_num': 1},
+    'team_schedules': {'team_id': 1},
+    'matchup': {'event_id': FIRST_EVENT_ID},
+    'team_roster': {'team_id': 1},
+    'team_stats': {'team_id': 1},
+    'team_stat_trend': {'team_id': 1, 'stat_name': 'totalPoints'},
+    'team_stat_comparison': {'stat_name': 'totalPoints'},
+    'team_stat_trends': {'stat_name': 'totalPoints'},
+    'position_stats': {'position': 'quarterback'},
+    'game_odds_history': {'event_id': FIRST_EVENT_ID},
+    'week_odds_history': {'week_num': 1},
+}
+
+# Position, players on a 53-man roster, stat categories in their gamelog
+ROSTER = [
+    ('Quarterback', 3, ['passing']), ('Running Back', 4, ['rushing', 'receiving']),
+    ('Wide Receiver', 6, ['receiving']), ('Tight End', 3, ['receiving']), ('Offensive Lineman', 9, []),
+    ('Defensive Lineman', 9, ['defense']), ('Linebacker', 7, ['defense']), ('Cornerback', 6, ['defense']),
+    ('Safety', 4, ['defense']), ('Place Kicker', 1, ['kicking']), ('Punter', 1, []), ('Long Snapper', 1, []),
+]
+TEAM_STAT_CATEGORIES = {
+    'scoring': ['totalPoints', 'totalTouchdowns', 'passingTouchdowns', 'rushingTouchdowns', 'fieldGoals',
+                'kickExtraPoints', 'totalPointsPerGame', 'twoPointPassConvs'],
+    'passing': ['passingYards', 'completions', 'passingAttempts', 'completionPct', 'interceptions', 'sacks',
+                'yardsPerPassAttempt', 'QBRating', 'netPassingYards', 'longPassing'],
+    'rushing': ['rushingYards', 'rushingAttempts', 'yardsPerRushAttempt', 'longRushing', 'rushingFumbles',
+                'rushingFirstDowns'],
+    'receiving': ['receivingYards', 'receptions', 'yardsPerReception', 'receivingTargets', 'longReception'],
+    'defensive': ['totalTackles', 'sacks', 'tacklesForLoss', 'passesDefended', 'defensiveTouchdowns',
+                  'stuffs', 'hurries', 'QBHits'],
+    'general': ['fumbles', 'fumblesLost', 'totalPenalties', 'totalPenaltyYards', 'gamesPlayed'],
+    'miscellaneous': ['firstDowns', 'thirdDownConvPct', 'fourthDownConvPct', 'possessionTimeSeconds',
+                      'redzoneScoringPct', 'totalGiveaways', 'totalTakeaways', 'turnOverDifferential'],
+}
+POSTSEASON_GAMES = [6, 4, 2, 0, 1]  # Wild Card, Divisional, Conference, Pro Bowl, Super Bowl
+
+
+def load_season_fixture(season=None, seed=0):
+    """Bulk-create a full synthetic season in an empty database; returns row counts by model"""
+    season = season or get_data.CURRENT_YEAR
+    rng = random.Random(seed)
+    kickoff = datetime(season, 9, 7, 17, tzinfo=dt_timezone.utc)
+
+    teams = Team.objects.bulk_create([
+        Team(team_id=i, team_name=f'Team {i}', short_name=f'T{i}', record=f'{i % 12}-{12 - i % 12}',
+             last_updated=kickoff) for i in range(1, 33)
+    ])
+
+    weeks = []
+    for week_num in range(1, 19):
+        start = kickoff + timedelta(weeks=week_num - 1, days=-3)
+        weeks.append(Calendar(name=f'Week {week_num}', details=f'Regular Season Week {week_num}',
+                              week_num=week_num, season=season, season_type_name='Regular Season',
+                              season_type_id=2, start_date=start, end_date=start + timedelta(days=7)))
+    for week_num, name in enumerate(['Wild Card', 'Divisional Round', 'Conference Championship', 'Pro Bowl',
+                                     'Super Bowl'], 1):
+        start = kickoff + timedelta(weeks=17 + week_num, days=-3)
+        weeks.append(Calendar(name=name, details=name, week_num=week_num, season=season,
+                              season_type_name='Postseason', season_type_id=3, start_date=start,
+                              end_date=start + timedelta(days=7)))
+    weeks = Calendar.objects.bulk_create(weeks)
+
+    games = []
+    for week in weeks:
+        count = 16 if week.season_type_id == 2 else POSTSEASON_GAMES[week.week_num - 1]
+        order = rng.sample(teams, 32)
+        for i in range(count):
+            home, away = order[2 * i], order[2 * i + 1]
+            event_id = FIRST_EVENT_ID + len(games)
+            games.append(Game(event_id=event_id, short_name=f'{away.short_name} @ {home.short_name}',
+                              game_datetime=week.start_date + timedelta(days=3, hours=i % 4 * 3), season=season,
+                              week_num=week.week_num, home_team=home, away_team=away, week=week))
+    Game.objects.bulk_create(games)
+
+    outcomes, states, odds = [], [], []
+    for game in games:
+        spread = rng.randint(-14, 14)
+        home_prob = round(rng.uniform(10, 90), 1)
+        outcomes.append(Outcome(event_id=game, spread_display=f'{game.home_team.short_name} {spread:+d}',
+                                spread=spread, home_win_prob=home_prob, away_win_prob=100 - home_prob,
+                                pred_diff=round(rng.uniform(-10, 10), 1), last_updated=game.game_datetime))
+        states.append(GameState(event_id=game, home_score=rng.randint(0, 45), away_score=rng.randint(0, 45),
+                                period=4, clock='0:00', status='post', status_detail='Final', completed=True,
+                                last_updated=game.game_datetime))
+        for hours in (168, 72, 24, 6, 1):
+            odds.append(OddsSnapshot(game=game, recorded_at=game.game_datetime - timedelta(hours=hours),
+                                     spread=spread + rng.randint(-2, 2), home_win_prob=home_prob,
+                                     pred_diff=outcomes[-1].pred_diff))
+    Outcome.objects.bulk_create(outcomes)
+    GameState.objects.bulk_create(states)
+    OddsSnapshot.objects.bulk_create(odds)
+
+    athletes, season_stats = [], []
+    for team in teams:
+        for position, count, categories in ROSTER:
+            for _ in range(count):
+                athlete_id = 1000000 + len(athletes)
+                athletes.append(Athlete(athlete_id=athlete_id, first_name='Player', last_name=str(athlete_id),
+                                        display_name=f'Player {athlete_id}', jersey=len(athletes) % 99 + 1,
+                                        team=team, position=position, position_key=normalize_position(position),
+                                        status='Active'))
+                for category in categories:
+                    for stat_name in STAT_MAPPINGS[category]:
+                        value = round(rng.uniform(0, 500), 1)
+                        season_stats.append(SeasonStatistic(
+                            athlete_id=athlete_id, season_year=season, category_name=category,
+                            stat_name=stat_name, stat_value=value, stat_display_value=str(value),
+                        ))
+    Athlete.objects.bulk_create(athletes)
+    SeasonStatistic.objects.bulk_create(season_stats, batch_size=2000)
+
+    team_stats, snapshot_rows = [], {team.team_id: [] for team in teams}
+    for category, stat_names in TEAM_STAT_CATEGORIES.items():
+        for stat_name in stat_names:
+            for rank, team in enumerate(rng.sample(teams, 32), 1):
+                value = round(rng.uniform(0, 500), 1)
+                team_stats.append(StatTeam(team_id=team, category=category, stat_name=stat_name, value=value,
+                                           rank=rank, display_rank=f'#{rank}', description=stat_name))
+                snapshot_rows[team.team_id].append((category, stat_name, value, rank))
+    StatTeam.objects.bulk_create(team_stats)
+
+    ids = team_trends.key_ids((c, n) for c, n, _, _ in snapshot_rows[1])
+    snapshots = [
+        TeamStatSnapshot(team_id=team_id, season=season, season_type_id=2, week_num=week_num,
+                         recorded_at=kickoff + timedelta(weeks=week_num),
+                         stats=team_trends.pack({ids[(c, n)]: (v * week_num / 18, r) for c, n, v, r in rows}))
+        for team_id, rows in snapshot_rows.items() for week_num in range(1, 19)
+    ]
+    TeamStatSnapshot.objects.bulk_create(snapshots)
+
+    return {model.__name__: model.objects.count() for model in
+            (Team, Calendar, Game, Outcome, OddsSnapshot, Athlete, SeasonStatistic, StatTeam, TeamStatSnapshot)}
+
+
+def route_urls():
+    """{url name: path} for every route in nfl.urls"""
+    paths = {}
+    for pattern in urls.urlpatterns:
+        if pattern.name in SKIP_ROUTES:
+            continue
+        if pattern.pattern.converters and pattern.name not in SAMPLE_KWARGS:
+            raise ValueError(f"No sample arguments for route {pattern.name}; add it to SAMPLE_KWARGS")
+        paths[pattern.name] = reverse(pattern.name, kwargs=SAMPLE_KWARGS.get(pattern.name))
+    return paths
+
+
+def reset_caches():
+    """Drop the shared cache and every in-process copy that follows its generation counters"""
+    cache.clear()
+    calendar_index.invalidate()
+
+
+def percentile(timings, p):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))]
+
+
+def _timed_get(client, path):
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = client.get(path)
+        elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise AssertionError(f"{path} returned {response.status_code}")
+    return elapsed, len(queries)
+
+
+def measure(client, path, runs):
+    reset_caches()
+    cold_ms, cold_queries = _timed_get(client, path)
+    timings, warm_queries = [], cold_queries
+    for _ in range(runs):
+        elapsed, warm_queries = _timed_get(client, path)
+        timings.append(elapsed)
+    return {
+        'cold_queries': cold_queries,
+        'warm_queries': warm_queries,
+        'cold_ms': round(cold_ms, 2),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+    }
+
+
+def run(runs=20):
+    """{url name: measurements} for every route"""
+    client = Client()
+    return {name: measure(client, path, runs) for name, path in route_urls().items()}
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, fixture, path=BASELINE_PATH):
+    with open(path, 'w') as f:
+        json.dump({'fixture': fixture, 'routes': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def latency_budget(baseline_ms, tolerance=LATENCY_TOLERANCE):
+    return max(baseline_ms * tolerance, baseline_ms + LATENCY_SLACK_MS)
+
+
+def over_budget(results, baseline, tolerance=LATENCY_TOLERANCE, latency=True):
+    """Messages for every route above its query or latency budget (query counts only without latency)"""
+    failures = []
+    for name, result in results.items():
+        base = baseline['routes'].get(name)
+        if base is None:
+            failures.append(f"{name}: no baseline (run benchmark_endpoints --update-baseline)")
+            continue
+        for key in ('cold_queries', 'warm_queries'):
+            if result[key] > base[key]:
+                failures.append(f"{name}: {result[key]} {key.replace('_', ' ')}, budget {base[key]}")
+        for key in ('cold_ms', 'p95_ms') if latency else ():
+            budget = latency_budget(base[key], tolerance)
+            if result[key] > budget:
+                failures.append(f"{name}: {key} {result[key]:.1f}, budget {budget:.1f}")
+    return failures
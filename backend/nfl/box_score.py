@@ -0,0 +1,155 @@
+import logging
+from django.utils.dateparse import parse_datetime
+from .models import Athlete, GameStatistic
+from . import season_stats
+from utils.bulk import ChangeDetectingUpserter
+
+logger = logging.getLogger(__name__)
+
+# Box score categories and keys mapped onto the names season totals use
+# (nfl.gamelog.STAT_MAPPINGS). Keys holding two values ("20/31", "2-14") map to
+# a pair of names; keys that aren't listed are stored under their ESPN name.
+CATEGORY_NAMES = {'defensive': 'defense', 'interceptions': 'defense'}
+STAT_NAMES = {
+    'passing': {
+        'completions/passingAttempts': ('completions', 'attempts'),
+        'passingYards': 'yards',
+        'yardsPerPassAttempt': 'yards_per_attempt',
+        'passingTouchdowns': 'touchdowns',
+        'interceptions': 'interceptions',
+        'sacks-sackYardsLost': ('sacks', 'sack_yards'),
+        'adjQBR': 'qbr',
+        'QBRating': 'rating',
+    },
+    'rushing': {
+        'rushingAttempts': 'attempts',
+        'rushingYards': 'yards',
+        'yardsPerRushAttempt': 'avg',
+        'rushingTouchdowns': 'touchdowns',
+        'longRushing': 'longest',
+    },
+    'receiving': {
+        'receptions': 'receptions',
+        'receivingYards': 'yards',
+        'yardsPerReception': 'avg',
+        'receivingTouchdowns': 'touchdowns',
+        'longReception': 'longest',
+        'receivingTargets': 'targets',
+    },
+    'defensive': {
+        'totalTackles': 'tackles',
+        'soloTackles': 'solo',
+        'sacks': 'sacks',
+        'tacklesForLoss': 'tackles_for_loss',
+        'passesDefended': 'passes_defended',
+    },
+    'interceptions': {
+        'interceptions': 'interceptions',
+        'interceptionYards': 'int_yards',
+        'interceptionTouchdowns': 'int_touchdowns',
+    },
+    'kicking': {
+        'fieldGoalsMade/fieldGoalAttempts': ('field_goals_made', 'field_goals_attempted'),
+        'fieldGoalPct': 'field_goal_pct',
+        'longFieldGoalMade': 'longest_fg',
+        'extraPointsMade/extraPointAttempts': ('extra_points_made', 'extra_points_attempted'),
+        'totalKickingPoints': 'points',
+    },
+}
+
+GAME_STAT_UPDATE_FIELDS = ['game_date', 'opponent', 'stat_value', 'stat_display_value', 'last_updated']
+
+
+def _number(value):
+    try:
+        return float(str(value).replace(',', ''))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _split(key, names, value):
+    """(stat_name, display_value) pairs for one box score cell"""
+    if not isinstance(names, tuple):
+        return [(names, value)]
+    parts = value.split('/' if '/' in key else '-', 1)
+    return list(zip(names, parts)) if len(parts) == 2 else []
+
+
+def parse_box_score(data):
+    """(athlete_id, team_id, category_name, stat_name, value, display_value) rows from a gamepackage"""
+    rows = []
+    for team in data.get('boxscore', {}).get('players', []):
+        team_id = int(team['team']['id'])
+        for category in team.get('statistics', []):
+            name = category.get('name', '')
+            category_name = CATEGORY_NAMES.get(name, name)
+            names = STAT_NAMES.get(name, {})
+            keys = category.get('keys', [])
+            for entry in category.get('athletes', []):
+                athlete_id = int(entry['athlete']['id'])
+                for key, value in zip(keys, entry.get('stats', [])):
+                    if not value or value == '--':
+                        continue
+                    for stat_name, display_value in _split(key, names.get(key, key), value):
+                        rows.append((athlete_id, team_id, category_name, stat_name,
+                                     _number(display_value), display_value))
+    return rows
+
+
+def save_box_score(game, data):
+    """Write every player's stats for one game in a single batch. Returns the rows written or removed."""
+    rows = parse_box_score(data)
+    if not rows:
+        return 0
+
+    known = set(Athlete.objects.filter(athlete_id__in={r[0] for r in rows}).values_list('athlete_id', flat=True))
+    opponents = {game.home_team_id: game.away_team.short_name, game.away_team_id: game.home_team.short_name}
+    kickoff = game.game_datetime
+    if isinstance(kickoff, str):
+        kickoff = parse_datetime(kickoff)
+    skipped = set()
+    event_rows = GameStatistic.objects.filter(event_id=str(game.event_id))
+    keys = set()
+    changed = set()
+
+    writer = ChangeDetectingUpserter(
+        GameStatistic,
+        unique_fields=['athlete', 'event_id', 'category_name', 'stat_name'],
+        update_fields=GAME_STAT_UPDATE_FIELDS,
+        chunk_size=len(rows),
+        queryset=event_rows,
+        on_write=lambda model, objs: changed.update(obj.athlete_id for obj in objs),
+    )
+    with writer:
+        for athlete_id, team_id, category_name, stat_name, value, display_value in rows:
+            if athlete_id not in known:
+                skipped.add(athlete_id)
+                continue
+            stat = GameStatistic(
+                athlete_id=athlete_id,
+                event_id=str(game.event_id),
+                game_date=kickoff.date() if kickoff else None,
+                opponent=opponents.get(team_id),
+                category_name=category_name,
+                stat_name=stat_name,
+                stat_value=value,
+                stat_display_value=display_value,
+            )
+            keys.add(writer.key(stat))
+            writer.add(stat)
+    if skipped:
+        logger.info(f"Skipped box score stats for {len(skipped)} athletes not on a roster in game {game.event_id}")
+
+    # A corrected box score can drop a stat or an athlete: their old rows for this game go
+    stale = [(pk, athlete_id) for pk, athlete_id, category_name, stat_name
+             in event_rows.values_list('pk', 'athlete_id', 'category_name', 'stat_name')
+             if (athlete_id, str(game.event_id), category_name, stat_name) not in keys]
+    if stale:
+        GameStatistic.objects.filter(pk__in=[pk for pk, _ in stale]).delete()
+        changed.update(athlete_id for _, athlete_id in stale)
+        logger.info(f"Removed {len(stale)} box score stats no longer in game {game.event_id}")
+
+    if changed:
+        # Season totals are recomputed only for athletes with a row created, changed or removed
+        season_stats.update_season_stats(changed, game.season)
+    return writer.written + len(stale)
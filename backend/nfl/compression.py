@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import logging
+import re
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Smaller bodies don't shrink enough to pay for the encoding
+MIN_SIZE = 512
+COMPRESSIBLE_TYPES = re.compile(r'^(text/(?!event-stream)|application/(json|javascript|xml)|image/svg\+xml)')
+# Compressed variants of responses with an ETag are stored under it, so a payload
+# is compressed once however many clients fetch it
+VARIANT_TIMEOUT = 60 * 60 * 24
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def compress(body, encoding, level='dynamic'):
+    """Compress body; level 'static' spends more time for a smaller file written once at build"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=11 if level == 'static' else 5)
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=9 if level == 'static' else 6, mtime=0)
+
+
+def negotiate(accept_encoding, available=None):
+    """The preferred encoding in available that the Accept-Encoding header allows, or None"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        match = re.search(r'q=([0-9.]+)', params)
+        try:
+            accepted[name.strip().lower()] = float(match.group(1)) if match else 1.0
+        except ValueError:
+            continue
+    best, best_q = None, 0
+    for encoding in available or available_encodings():
+        q = accepted.get(encoding, accepted.get('*', 0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _variant_key(request, response, encoding):
+    etag = response['ETag'].removeprefix('W/')
+    digest = hashlib.md5(f"{request.path}|{response.get('Content-Type')}|{etag}".encode()).hexdigest()
+    return f'nfl:compressed:{encoding}:{digest}'
+
+
+def compressed_body(request, response, encoding):
+    if not response.has_header('ETag'):
+        return compress(response.content, encoding)
+    key = _variant_key(request, response, encoding)
+    body = cache.get(key)
+    if body is None:
+        body = compress(response.content, encoding)
+        cache.set(key, body, VARIANT_TIMEOUT)
+    return body
+
+
+class CompressionMiddleware:
+    """Brotli or gzip for compressible responses, by Accept-Encoding.
+
+    Streaming responses (the live SSE feed, static files) are left alone; the
+    static file view serves its own precompressed files.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', MIN_SIZE)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if not self._should_compress(response):
+            return response
+        return await sync_to_async(self.process_response)(request, response)
+
+    def _should_compress(self, response):
+        return not (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < self.min_size
+            or not COMPRESSIBLE_TYPES.match(response.get('Content-Type', ''))
+        )
+
+    def process_response(self, request, response):
+        if not self._should_compress(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        body = compressed_body(request, response, encoding)
+        if len(body) >= len(response.content):
+            return response
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # The bytes differ per encoding, so a strong ETag would be wrong
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -1,51 +1,64 @@
+from django.conf import settings
 from django.core.management import call_command
 from django_cron import CronJobBase, Schedule
+from nfl import scheduler, season_snapshot
+
+def publish():
+    """Run at the end of each job: share the season snapshot, so workers load it from
+    the cache instead of rebuilding it on a request, and refresh the static export"""
+    season_snapshot.publish()
+    if settings.STATIC_EXPORT:
+        call_command('export_static')
 
 class RefreshEveryDay(CronJobBase):
     schedule = Schedule(run_every_mins=1440)
     code = 'nfl.refresh_every_day'
 
     def do(self):
-        pass
+        scheduler.refresh_daily()
+        publish()
 
 class RefreshEveryHour(CronJobBase):
     schedule = Schedule(run_every_mins=60)
     code = 'nfl.refresh_every_hour'
 
     def do(self):
-        pass
+        if not scheduler.in_season():
+            return
+        scheduler.refresh_upcoming_odds()
+        scheduler.refresh_records()
+        scheduler.refresh_team_stats()
+        publish()
 
 class RefreshEveryMinute(CronJobBase):
     schedule = Schedule(run_every_mins=1)
     code = 'nfl.refresh_every_minute'
 
     def do(self):
-        pass
-
-class UpdatePlayerStatsEvery10Minutes(CronJobBase):
-    schedule = Schedule(run_every_mins=10)
-    code = 'nfl.update_player_stats_every_10_minutes'
-
-    def do(self):
-        pass
+        scheduler.refresh_live_games()
+        publish()
 
 class UpdatePlayerStatsPostGame(CronJobBase):
     schedule = Schedule(run_every_mins=1440)
     code = 'nfl.update_player_stats_post_game'
 
     def do(self):
-        pass
+        scheduler.refresh_post_game_player_stats()
+        publish()
 
+# Full refreshes, superseded by the game-aware jobs above but kept for manual runs
 class UpdateSeasonData(CronJobBase):
     schedule = Schedule(run_every_mins=60)
     code = 'nfl.update_season_data'
 
     def do(self):
         call_command('update_season_data')
+        publish()
 
 class UpdateTeamStats(CronJobBase):
     schedule = Schedule(run_every_mins=60)
     code = 'nfl.update_team_stats'
 
     def do(self):
-        call_command('update_team_stats')
\ No newline at end of file
+        call_command('update_team_stats')
+        publish()
@@ -0,0 +1,88 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+REPLICA = 'replica'
+
+# Set for the duration of a read-only API request. Everything else (cron jobs,
+# management commands, writes) keeps using the primary, and so does anything
+# inside read_from_primary().
+_use_replica = ContextVar('nfl_use_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+@contextmanager
+def read_from_replica():
+    """Send ORM reads in this block to the replica, if one is configured"""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """Send ORM reads in this block to the primary, even during an API request.
+
+    For building shared caches: they are stored under the version the primary
+    just bumped, so rows from a replica that hasn't caught up yet would be
+    served as current until the next write.
+    """
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReplicaRouter:
+    """Reads go to the replica inside read_from_replica(), everything else to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_configured():
+            return REPLICA
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
+
+
+class ReplicaReadMiddleware:
+    """Serve GET/HEAD requests to the API from the replica"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _is_read(self, request):
+        return request.method in ('GET', 'HEAD') and request.path.startswith('/api/')
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._is_read(request):
+            return self.get_response(request)
+        with read_from_replica():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        if not self._is_read(request):
+            return await self.get_response(request)
+        with read_from_replica():
+            return await self.get_response(request)
@@ -0,0 +1,110 @@
+import time
+from utils import espn_client
+
+# No model imports here: fetch_shard runs in spawned worker processes that never
+# set up Django's app registry or open a database connection.
+
+GAMELOG_URL = "https://site.web.api.espn.com/apis/common/v3/sports/football/nfl/athletes/{athlete_id}/gamelog"
+
+# Common stat mappings for different positions
+STAT_MAPPINGS = {
+    'passing': ['completions', 'attempts', 'yards', 'completion_pct', 'yards_per_attempt',
+               'touchdowns', 'interceptions', 'sacks', 'sack_yards', 'rating',
+               'qbr', 'longest', 'rushing_attempts', 'rushing_yards', 'rushing_avg'],
+    'rushing': ['attempts', 'yards', 'avg', 'longest', 'touchdowns'],
+    'receiving': ['receptions', 'yards', 'avg', 'longest', 'touchdowns', 'targets'],
+    'defense': ['tackles', 'solo', 'assists', 'sacks', 'sack_yards', 'tackles_for_loss',
+               'passes_defended', 'interceptions', 'int_yards', 'int_touchdowns'],
+    'kicking': ['field_goals_made', 'field_goals_attempted', 'field_goal_pct', 'longest_fg',
+               'extra_points_made', 'extra_points_attempted', 'points']
+}
+
+
+def stat_names_for_category(category_name, position):
+    """Get appropriate stat names based on category and position"""
+    category_lower = category_name.lower()
+
+    if 'passing' in category_lower or (position and 'quarterback' in position.lower()):
+        return STAT_MAPPINGS['passing']
+    elif 'rushing' in category_lower:
+        return STAT_MAPPINGS['rushing']
+    elif 'receiving' in category_lower:
+        return STAT_MAPPINGS['receiving']
+    elif 'defense' in category_lower or 'defensive' in category_lower:
+        return STAT_MAPPINGS['defense']
+    elif 'kicking' in category_lower or (position and 'kicker' in position.lower()):
+        return STAT_MAPPINGS['kicking']
+    else:
+        # Generic stat names for unknown categories
+        return [f'stat_{i}' for i in range(20)]
+
+
+def parse_season_stats(data, season, position):
+    """(category_name, stat_name, value, display_value) rows for a season from a gamelog document"""
+    rows = []
+    # Process season types (Regular Season, Playoffs)
+    for season_type in data.get('seasonTypes', []):
+        season_name = season_type.get('displayName', '')
+        if str(season) not in season_name:
+            continue
+
+        # Process categories (passing, rushing, etc.)
+        for category in season_type.get('categories', []):
+            category_name = category.get('displayName', 'General').lower()
+            totals = category.get('totals', [])
+
+            if not totals:
+                continue
+
+            # Determine stat mapping based on category or position
+            stat_names = stat_names_for_category(category_name, position)
+
+            # Map totals to stat names
+            for i, value in enumerate(totals):
+                if i < len(stat_names) and value and value != '--':
+                    try:
+                        numeric_value = float(str(value).replace(',', ''))
+                    except (ValueError, AttributeError):
+                        numeric_value = None
+                    rows.append((category_name, stat_names[i], numeric_value, str(value)))
+    return rows
+
+
+def fetch_shard(shard, athletes, season, url_template=GAMELOG_URL):
+    """Process pool worker: fetch and parse the gamelogs for one shard of athletes.
+
+    athletes is a list of (athlete_id, position, has_display_name). Returns the
+    parsed rows for the parent's single writer instead of touching the database.
+    """
+    start = time.perf_counter()
+    rows = []
+    names = {}
+    updated = 0
+    failed = 0
+    for athlete_id, position, has_display_name in athletes:
+        try:
+            response = espn_client.get(url_template.format(athlete_id=athlete_id))
+            if response.status_code != 200:
+                failed += 1
+                continue
+            data = response.json()
+        except Exception:
+            failed += 1
+            continue
+
+        if not has_display_name and 'athlete' in data:
+            names[athlete_id] = data['athlete'].get('displayName')
+        athlete_rows = parse_season_stats(data, season, position)
+        if athlete_rows:
+            updated += 1
+            rows.extend((athlete_id, *row) for row in athlete_rows)
+
+    return {
+        'shard': shard,
+        'athletes': len(athletes),
+        'updated': updated,
+        'failed': failed,
+        'rows': rows,
+        'names': names,
+        'elapsed': time.perf_counter() - start,
+    }
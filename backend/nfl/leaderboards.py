@@ -0,0 +1,232 @@
+import threading
+from collections import OrderedDict
+from django.db.models import Count, Max
+from .models import Athlete, SeasonStatistic
+from . import payload_cache
+from .db_router import read_from_primary
+from utils import calendar_index
+
+FIRST_SEASON = 2000
+# Stores kept per process (8 positions for a few seasons); the least recently used go first
+MAX_STORES = 32
+
+# Position mapping and key stats (based on ESPN API order and NFL standards).
+# Ranking scores are weighted sums of the mapped stats, so they can be computed
+# for a whole position at once.
+POSITION_MAPPINGS = {
+    'quarterback': {
+        'key_stats': ['yards', 'touchdowns', 'completion_pct', 'rating', 'interceptions'],
+        'stat_aliases': {
+            'stat_2': 'yards', 'stat_5': 'touchdowns', 'stat_3': 'completion_pct',
+            'stat_9': 'rating', 'stat_6': 'interceptions'
+        },
+        'weights': {'yards': 0.3, 'touchdowns': 100, 'completion_pct': 10, 'interceptions': -50, 'rating': 2},
+    },
+    'running back': {
+        'key_stats': ['rush_attempts', 'rush_yards', 'rush_avg', 'rush_tds', 'receptions'],
+        'stat_aliases': {
+            'stat_0': 'rush_attempts', 'stat_1': 'rush_yards', 'stat_2': 'rush_avg',
+            'stat_3': 'rush_tds', 'stat_5': 'receptions'
+        },
+        'weights': {'rush_yards': 0.4, 'rush_tds': 60, 'rush_avg': 50, 'receptions': 8},
+    },
+    'wide receiver': {
+        'key_stats': ['receptions', 'targets', 'rec_yards', 'rec_avg', 'rec_tds'],
+        'stat_aliases': {
+            'stat_0': 'receptions', 'stat_1': 'targets', 'stat_2': 'rec_yards',
+            'stat_4': 'rec_avg', 'stat_5': 'rec_tds'
+        },
+        'weights': {'receptions': 4, 'rec_yards': 0.5, 'rec_tds': 60, 'rec_avg': 8},
+    },
+    'tight end': {
+        'key_stats': ['receptions', 'targets', 'rec_yards', 'rec_avg', 'rec_tds'],
+        'stat_aliases': {
+            'stat_0': 'receptions', 'stat_1': 'targets', 'stat_2': 'rec_yards',
+            'stat_3': 'rec_avg', 'stat_4': 'rec_tds'
+        },
+        'weights': {'receptions': 4, 'rec_yards': 0.5, 'rec_tds': 60},
+    },
+    'defensive line': {
+        'key_stats': ['tackles', 'solo_tackles', 'assists', 'sacks', 'tfl'],
+        'stat_aliases': {
+            'stat_2': 'tackles', 'stat_1': 'solo_tackles', 'stat_0': 'assists',
+            'stat_3': 'sacks', 'stat_4': 'tfl'
+        },
+        'weights': {'tackles': 2, 'sacks': 20, 'tfl': 10},
+    },
+    'linebacker': {
+        'key_stats': ['tackles', 'solo_tackles', 'assists', 'sacks', 'tfl'],
+        'stat_aliases': {
+            'stat_2': 'tackles', 'stat_1': 'solo_tackles', 'stat_0': 'assists',
+            'stat_4': 'sacks', 'stat_5': 'tfl'
+        },
+        'weights': {'tackles': 2, 'sacks': 15, 'solo_tackles': 1.5},
+    },
+    'defensive back': {
+        'key_stats': ['tackles', 'solo_tackles', 'assists', 'interceptions', 'pass_def'],
+        'stat_aliases': {
+            'stat_2': 'tackles', 'stat_1': 'solo_tackles', 'stat_0': 'assists',
+            'stat_6': 'interceptions', 'stat_7': 'pass_def'
+        },
+        'weights': {'tackles': 1.5, 'interceptions': 40, 'pass_def': 5},
+    },
+    'kicker': {
+        'key_stats': ['fg_made', 'fg_att', 'fg_pct', 'xp_made', 'points'],
+        'stat_aliases': {
+            'stat_0': 'fg_made', 'stat_1': 'fg_att',
+            'stat_2': 'fg_pct', 'stat_3': 'xp_made', 'stat_6': 'points'
+        },
+        'weights': {'fg_made': 3, 'fg_pct': 2, 'points': 1},
+    },
+}
+
+
+def position_keys(position_name):
+    """Normalized positions in a position group (any position containing its first word)"""
+    term = position_name.split()[0].lower()
+    # Only a couple of dozen distinct keys, read straight from the position_key index
+    keys = Athlete.objects.order_by('position_key').values_list('position_key', flat=True).distinct()
+    return [key for key in keys if key and term in key]
+
+
+def position_filter(position_name):
+    """Athlete filter used for a position group"""
+    return {'position_key__in': position_keys(position_name)}
+
+
+class PositionStatsStore:
+    """Columnar season stats for one position: an athletes x stats matrix.
+
+    ``values`` holds floats (missing stats are 0) for scoring, ``raw`` keeps the
+    stored Decimal values so the payload matches what the ORM would return.
+    """
+
+    def __init__(self, season, position_name, validator):
+        self.season = season
+        self.position_name = position_name
+        self.config = POSITION_MAPPINGS[position_name]
+        self.validator = validator
+        self._build()
+
+    def _build(self):
+        # numpy is only needed once a leaderboard is requested, not at startup
+        import numpy as np
+
+        aliases = self.config['stat_aliases']
+        athlete_filter = position_filter(self.position_name)
+        athletes = list(
+            Athlete.objects.filter(**athlete_filter)
+            .order_by('athlete_id')
+            .values_list('athlete_id', 'display_name', 'first_name', 'last_name',
+                         'team__short_name', 'team__team_id', 'jersey', 'position')
+        )
+        rows = (
+            SeasonStatistic.objects.filter(
+                season_year=self.season,
+                season_type='Regular Season',
+                **{f'athlete__{k}': v for k, v in athlete_filter.items()}
+            )
+            # Same order the per-athlete query read rows in (the unique index)
+            .order_by('athlete_id', 'category_name', 'stat_name')
+            .values_list('athlete_id', 'stat_name', 'stat_value')
+        )
+
+        stat_index = {name: i for i, name in enumerate(self.config['key_stats'])}
+        for name in self.config['weights']:
+            stat_index.setdefault(name, len(stat_index))
+        athlete_index = {a[0]: i for i, a in enumerate(athletes)}
+
+        # Latest value per stored stat name, then aliases applied in first-seen order
+        player_stats = {}
+        for athlete_id, stat_name, stat_value in rows:
+            if athlete_id in athlete_index:
+                player_stats.setdefault(athlete_id, {})[stat_name] = stat_value or 0
+
+        values = np.zeros((len(athletes), len(stat_index)))
+        raw = np.zeros((len(athletes), len(stat_index)), dtype=object)
+        has_stats = np.zeros(len(athletes), dtype=bool)
+        for athlete_id, stats in player_stats.items():
+            row = athlete_index[athlete_id]
+            has_stats[row] = True
+            for stat_name, value in stats.items():
+                col = stat_index.get(aliases.get(stat_name, stat_name))
+                if col is not None:
+                    raw[row, col] = value
+                    values[row, col] = float(value)
+
+        keep = np.flatnonzero(has_stats)
+        self.athletes = [athletes[i] for i in keep]
+        self.values = values[keep]
+        self.raw = raw[keep]
+        self.stat_index = stat_index
+
+        weights = np.zeros(len(stat_index))
+        for name, weight in self.config['weights'].items():
+            weights[stat_index[name]] = weight
+        self.scores = self.values @ weights
+        # Stable sort so ties keep athlete_id order
+        self.order = np.argsort(-self.scores, kind='stable')
+
+    def players(self):
+        key_stats = self.config['key_stats']
+        key_cols = [self.stat_index[s] for s in key_stats]
+        players = []
+        for rank, row in enumerate(self.order, start=1):
+            athlete_id, display_name, first_name, last_name, team_short, team_id, jersey, position = self.athletes[row]
+            players.append({
+                'athlete_id': athlete_id,
+                'name': display_name or f"{first_name} {last_name}",
+                'team': team_short if team_id else 'FA',
+                'team_id': team_id,
+                'jersey': jersey,
+                'position': position,
+                'stats': dict(zip(key_stats, self.raw[row, key_cols].tolist())),
+                'ranking_score': float(self.scores[row]),
+                'rank': rank,
+            })
+        return players
+
+
+_stores = OrderedDict()
+_lock = threading.Lock()
+
+
+def parse_season(value):
+    """?season= as an int between FIRST_SEASON and next season, the current season if missing, else None"""
+    if value is None:
+        return calendar_index.current_season()
+    try:
+        season = int(value)
+    except (TypeError, ValueError):
+        return None
+    if not FIRST_SEASON <= season <= calendar_index.current_season() + 1:
+        return None
+    return season
+
+
+def store_validator(season):
+    # One cheap aggregate query plus a cache read detects new stats or roster changes
+    stats = SeasonStatistic.objects.filter(season_year=season).aggregate(
+        last_updated=Max('last_updated'), rows=Count('id')
+    )
+    return (stats['last_updated'], stats['rows'], payload_cache.get_version('athletes'))
+
+
+def get_store(season, position_name, validator=None):
+    """Return the store for a season and position, rebuilding it if its data changed.
+
+    Pass the validator if it was already read for this request (the ETag needs it too).
+    """
+    if validator is None:
+        validator = store_validator(season)
+    key = (season, position_name)
+    with _lock:
+        store = _stores.get(key)
+        if store is None or store.validator != validator:
+            with read_from_primary():
+                store = PositionStatsStore(season, position_name, validator)
+            _stores[key] = store
+        _stores.move_to_end(key)
+        while len(_stores) > MAX_STORES:
+            _stores.popitem(last=False)
+    return store
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import logging
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import GameState, LiveEvent, Sequence
+from . import signals
+
+logger = logging.getLogger(__name__)
+
+# Game states are recorded by more than one process: the poll_live_games
+# command and the per-minute cron (get_data.apply_game_package). Each change is
+# stored as a LiveEvent in the same transaction as its GameState row and
+# numbered from a Sequence row, so event ids are unique and in commit order
+# whichever process writes. Every ASGI worker tails that table once and fans
+# new events out to its clients; new clients start from the GameState rows.
+SEQUENCE_NAME = 'live'
+EVENT_TTL = timedelta(minutes=10)
+SNAPSHOT_RETENTION = timedelta(days=1)
+HUB_POLL_INTERVAL = 1
+HEARTBEAT_INTERVAL = 15
+CLIENT_QUEUE_SIZE = 100
+# Under WSGI a response can't be held open, so clients are told to reconnect after this long
+RECONNECT_MS = 5000
+# Sent to subscribers when the event log went backwards (the table was reset)
+RESET = {'reset': True}
+
+STATE_FIELDS = ['home_score', 'away_score', 'period', 'clock', 'status', 'status_detail', 'completed']
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_game_state(gamepackage):
+    """Score and status from the header of an ESPN gamepackage"""
+    competition = gamepackage['header']['competitions'][0]
+    scores = {c['homeAway']: _int_or_none(c.get('score')) for c in competition['competitors']}
+    status = competition.get('status', {})
+    status_type = status.get('type', {})
+    return {
+        'home_score': scores.get('home'),
+        'away_score': scores.get('away'),
+        'period': status.get('period'),
+        'clock': status.get('displayClock'),
+        'status': status_type.get('state'),
+        'status_detail': status_type.get('shortDetail') or status_type.get('detail'),
+        'completed': bool(status_type.get('completed', False)),
+    }
+
+
+def serialize_state(state):
+    data = {'event_id': state.event_id_id}
+    data.update({f: getattr(state, f) for f in STATE_FIELDS})
+    data['last_updated'] = state.last_updated.isoformat() if state.last_updated else None
+    return data
+
+
+def record_game_state(game, parsed):
+    """Store a parsed state and publish the fields that changed. Returns the delta or None."""
+    with transaction.atomic():
+        # Locked so two writers can't both diff against the same old state
+        state, created = GameState.objects.select_for_update().get_or_create(event_id=game)
+        changes = {f: parsed[f] for f in STATE_FIELDS if getattr(state, f) != parsed[f]}
+        if not changes and not created:
+            return None
+        for field, value in changes.items():
+            setattr(state, field, value)
+        state.last_updated = timezone.now()
+        GameState.objects.filter(pk=state.pk).update(**changes, last_updated=state.last_updated)
+        delta = {'event_id': game.event_id, **changes, 'last_updated': state.last_updated.isoformat()}
+        delta = publish(delta)
+        # Caches are invalidated once the row is committed, not before
+        transaction.on_commit(lambda: signals.bulk_saved(GameState, [state]))
+    return delta
+
+
+def _next_seq():
+    Sequence.objects.get_or_create(name=SEQUENCE_NAME)
+    Sequence.objects.filter(name=SEQUENCE_NAME).update(value=F('value') + 1)
+    return Sequence.objects.values_list('value', flat=True).get(name=SEQUENCE_NAME)
+
+
+def publish(delta):
+    """Append a delta to the event log and return it with its seq"""
+    with transaction.atomic():
+        now = timezone.now()
+        delta = {'seq': _next_seq(), **delta}
+        LiveEvent.objects.create(seq=delta['seq'], data=delta, created_at=now)
+        LiveEvent.objects.filter(created_at__lt=now - EVENT_TTL).delete()
+    return delta
+
+
+def latest_seq():
+    return Sequence.objects.filter(name=SEQUENCE_NAME).values_list('value', flat=True).first() or 0
+
+
+def events_after(seq):
+    return [event.data for event in LiveEvent.objects.filter(seq__gt=seq).order_by('seq')]
+
+
+def snapshot():
+    """Current state of every game in progress or upcoming, and of games finished in the last day"""
+    cutoff = timezone.now() - SNAPSHOT_RETENTION
+    states = GameState.objects.filter(Q(completed=False) | Q(last_updated__gte=cutoff)).order_by('event_id')
+    return [serialize_state(state) for state in states]
+
+
+def format_sse(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def catch_up(last_event_id=None):
+    """The frames a client starts with and the seq they bring it up to.
+
+    A client resuming from Last-Event-ID gets the events it missed. A new
+    client gets a snapshot, and so does one whose id is ahead of the log (it
+    was reset) or whose next event has already been pruned.
+    """
+    seq = latest_seq()
+    if last_event_id is not None and last_event_id <= seq:
+        events = events_after(last_event_id)
+        if (events and events[0]['seq'] == last_event_id + 1) or (not events and last_event_id == seq):
+            sent = events[-1]['seq'] if events else last_event_id
+            return [format_sse(event, 'score', event['seq']) for event in events], sent
+    # Read before the states, so anything published meanwhile is sent again rather than missed
+    return [format_sse(snapshot(), 'snapshot', seq)], seq
+
+
+class LiveHub:
+    """Per-process fan-out: one task tails the event log for all connected clients"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def _run(self):
+        last_seq = await sync_to_async(latest_seq)()
+        while self.subscribers:
+            await asyncio.sleep(HUB_POLL_INTERVAL)
+            try:
+                last_seq = await self.poll(last_seq)
+            except Exception as e:
+                logger.error(f"An error occurred reading live score events: {e}")
+        self.task = None
+
+    async def poll(self, last_seq):
+        """Broadcast the events after last_seq; returns the new position in the log"""
+        seq = await sync_to_async(latest_seq)()
+        if seq < last_seq:
+            self._broadcast(RESET)
+            return seq
+        if seq == last_seq:
+            return last_seq
+        for event in await sync_to_async(events_after)(last_seq):
+            self._broadcast(event)
+            last_seq = event['seq']
+        return last_seq
+
+    def _broadcast(self, event):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A client that can't keep up is dropped rather than slowing everyone down
+                logger.warning("Dropping slow live score subscriber")
+                self.unsubscribe(queue)
+
+
+hub = LiveHub()
+
+
+async def event_stream(last_event_id=None):
+    queue = hub.subscribe()
+    try:
+        frames, sent = await sync_to_async(catch_up)(last_event_id)
+        for frame in frames:
+            yield frame
+
+        while queue in hub.subscribers:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ': keep-alive\n\n'
+                continue
+            if event is RESET:
+                # The ids this client holds mean nothing in the new log: start over from a snapshot
+                frames, sent = await sync_to_async(catch_up)()
+                for frame in frames:
+                    yield frame
+                continue
+            if event['seq'] <= sent:
+                continue
+            sent = event['seq']
+            yield format_sse(event, 'score', sent)
+    finally:
+        hub.unsubscribe(queue)
+
+
+def reconnecting_stream(last_event_id=None):
+    """For WSGI servers: the catch-up frames, then end the response.
+
+    EventSource reconnects after RECONNECT_MS with the last id it saw, so
+    clients still get every change without holding a worker open.
+    """
+    frames, _ = catch_up(last_event_id)
+    yield f'retry: {RECONNECT_MS}\n\n'
+    yield from frames
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from nfl import benchmark
+
+
+class Command(BaseCommand):
+    help = "Time every API route against a synthetic season in a scratch database and check the baseline budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=20, help='Warm requests per route (default: 20)')
+        parser.add_argument('--baseline', default=benchmark.BASELINE_PATH, help='Baseline JSON file')
+        parser.add_argument('--update-baseline', action='store_true', help='Write the results as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=benchmark.LATENCY_TOLERANCE,
+                            help=f'Allowed latency factor over the baseline (default: {benchmark.LATENCY_TOLERANCE})')
+
+    def handle(self, *args, **options):
+        # A scratch test database and an in-memory cache: the real data and cache are never touched
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                                   ESPN_CACHE_DIR=''):
+                fixture = benchmark.load_season_fixture()
+                self.stdout.write(', '.join(f'{count} {model}' for model, count in fixture.items()))
+                results = benchmark.run(max(options['runs'], 1))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(f"{'route':<24}{'cold q':>8}{'warm q':>8}{'cold ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        for name, r in results.items():
+            self.stdout.write(f"{name:<24}{r['cold_queries']:>8}{r['warm_queries']:>8}"
+                              f"{r['cold_ms']:>10.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}")
+
+        if options['update_baseline']:
+            benchmark.save_baseline(results, fixture, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        failures = benchmark.over_budget(results, benchmark.load_baseline(options['baseline']), options['tolerance'])
+        if failures:
+            raise CommandError('Over budget:\n' + '\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} routes within budget"))
@@ -0,0 +1,53 @@
+import time
+import requests
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from utils import fetch
+from utils.stub_espn import StubESPNServer
+
+
+class Command(BaseCommand):
+    help = "Compare sequential and concurrent event fetching against a local stub ESPN server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--weeks', type=int, default=18, help='Number of weeks to fetch (default: 18)')
+        parser.add_argument('--events-per-week', type=int, default=16, help='Events in each week (default: 16)')
+        parser.add_argument('--latency', type=float, default=0.05, help='Stub response latency in seconds (default: 0.05)')
+        parser.add_argument('--limit', type=int, help='Max in-flight requests for the concurrent engine')
+
+    def handle(self, *args, **options):
+        # The response cache would turn the concurrent run into 304s, so compare raw fetches
+        with override_settings(ESPN_CACHE_DIR=''), \
+                StubESPNServer(latency=options['latency'], events_per_week=options['events_per_week']) as stub:
+            week_urls = [f'{stub.base_url}/nfl/seasons/2025/types/2/weeks/{w}/events' for w in range(1, options['weeks'] + 1)]
+
+            start = time.perf_counter()
+            sequential = self.sequential(week_urls)
+            sequential_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            concurrent = self.concurrent(week_urls, options['limit'])
+            concurrent_time = time.perf_counter() - start
+
+        if sequential != concurrent:
+            self.stderr.write(self.style.ERROR("Concurrent fetch returned different documents than the sequential loop"))
+            return
+
+        self.stdout.write(f"Fetched {len(sequential)} events across {len(week_urls)} weeks ({options['latency'] * 1000:.0f} ms latency)")
+        self.stdout.write(f"Sequential loop: {sequential_time:.2f}s")
+        self.stdout.write(f"Concurrent engine (limit {options['limit'] or fetch.max_in_flight()}): {concurrent_time:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {sequential_time / concurrent_time:.1f}x"))
+
+    def sequential(self, week_urls):
+        """Mirror the original get_games_from_espn loop: one blocking request at a time"""
+        events = []
+        for url in week_urls:
+            games = requests.get(url).json()
+            for x in games['items']:
+                events.append(requests.get(x['$ref']).json())
+        return events
+
+    def concurrent(self, week_urls, limit):
+        weeks = fetch.fetch_json_many(week_urls, limit=limit)
+        event_urls = [x['$ref'] for games in weeks for x in games['items']]
+        return fetch.fetch_json_many(event_urls, limit=limit)
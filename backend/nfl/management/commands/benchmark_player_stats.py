@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from unittest import mock
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from utils.stub_espn import StubESPNServer
+from .fetch_player_stats import Command as FetchStatsCommand
+
+
+class RowCounter:
+    """Stands in for the stats writer so the benchmark never touches the database"""
+
+    def __init__(self):
+        self.rows = 0
+
+    def add(self, obj):
+        self.rows += 1
+
+
+@contextmanager
+def scratch_espn_cache():
+    """A fresh response cache for one run, so runs start cold and the real cache is never written.
+
+    Spawned workers read settings from the environment, so it's set there too.
+    """
+    with tempfile.TemporaryDirectory(prefix='espn-cache-') as location, \
+            mock.patch.dict(os.environ, {'ESPN_CACHE_DIR': location}), \
+            override_settings(ESPN_CACHE_DIR=location):
+        yield location
+
+
+class Command(BaseCommand):
+    help = "Time a sharded player stats refresh at several worker counts against a local stub ESPN server"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--athletes', type=int, default=1700, help='Synthetic athletes (default: 1700)')
+        parser.add_argument('--teams', type=int, default=32, help='Shards, one per team (default: 32)')
+        parser.add_argument('--latency', type=float, default=0.02, help='Stub response latency in seconds (default: 0.02)')
+        parser.add_argument('--workers', default='1,2,4', help='Comma-separated worker counts (default: 1,2,4)')
+
+    def handle(self, *args, **options):
+        season = 2025
+        shards = {}
+        for athlete_id in range(1, options['athletes'] + 1):
+            shards.setdefault(athlete_id % options['teams'] + 1, []).append((athlete_id, 'Quarterback', True))
+
+        results = []
+        with StubESPNServer(latency=options['latency'], season=season) as stub:
+            url_template = f'{stub.base_url}/nfl/athletes/{{athlete_id}}/gamelog'
+            for workers in [int(w) for w in options['workers'].split(',')]:
+                fetch_command = FetchStatsCommand(stdout=io.StringIO())
+                writer = RowCounter()
+                with scratch_espn_cache():
+                    start = time.perf_counter()
+                    updated = fetch_command.fetch_sharded(shards, season, workers, writer, url_template)
+                    elapsed = time.perf_counter() - start
+                results.append((workers, elapsed))
+                self.stdout.write(f"{workers} workers: {updated} athletes, {writer.rows} rows in {elapsed:.2f}s")
+
+        base_workers, base_time = results[0]
+        for workers, elapsed in results[1:]:
+            speedup = base_time / elapsed
+            self.stdout.write(f"{workers} vs {base_workers} workers: {speedup:.2f}x "
+                              f"({speedup / (workers / base_workers):.0%} of linear)")
@@ -0,0 +1,52 @@
+import mimetypes
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from nfl.compression import COMPRESSIBLE_TYPES, MIN_SIZE, available_encodings, compress
+from nfl.static_export import export_root
+from nfl.static_files import SUFFIXES
+
+
+class Command(BaseCommand):
+    help = "Write .br and .gz variants of compressible files in STATIC_ROOT (only for new or changed files)"
+
+    def handle(self, *args, **options):
+        written = unchanged = removed = 0
+        original_bytes = compressed_bytes = 0
+        variant_suffixes = tuple(SUFFIXES.values())
+        # An export configured inside STATIC_ROOT writes its own variants
+        exported = os.path.abspath(export_root())
+        for dirpath, dirnames, filenames in os.walk(settings.STATIC_ROOT):
+            dirnames[:] = [d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != exported]
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith(variant_suffixes):
+                    # Drop variants whose original was removed by a new build
+                    if not os.path.exists(path.rsplit('.', 1)[0]):
+                        os.remove(path)
+                        removed += 1
+                    continue
+                content_type = mimetypes.guess_type(path)[0] or ''
+                if not COMPRESSIBLE_TYPES.match(content_type) or os.path.getsize(path) < MIN_SIZE:
+                    continue
+
+                with open(path, 'rb') as f:
+                    body = f.read()
+                for encoding in available_encodings():
+                    variant = path + SUFFIXES[encoding]
+                    if os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(path):
+                        unchanged += 1
+                        continue
+                    data = compress(body, encoding, 'static')
+                    with open(variant, 'wb') as f:
+                        f.write(data)
+                    written += 1
+                    if encoding == 'br' or len(available_encodings()) == 1:
+                        original_bytes += len(body)
+                        compressed_bytes += len(data)
+
+        self.stdout.write(f"{written} variants written, {unchanged} up to date, {removed} stale removed")
+        if original_bytes:
+            self.stdout.write(self.style.SUCCESS(
+                f"Compressed {original_bytes} bytes to {compressed_bytes} ({compressed_bytes / original_bytes:.0%})"
+            ))
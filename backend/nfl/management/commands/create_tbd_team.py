@@ -1,12 +1,7 @@
-from datetime import datetime, timedelta
-from django.utils.timezone import now
 from django.core.management.base import BaseCommand
 from nfl import models
 from utils import get_data
 
-CURRENT_YEAR = (datetime.now() - timedelta(days=150)).year
-NOW = now()
-
 class Command(BaseCommand):
     help = "Update game info for games in current and upcoming weeks"
 
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from nfl import static_export
+
+
+class Command(BaseCommand):
+    help = "Write every week, schedule, roster, matchup and stat comparison response as JSON under STATIC_EXPORT_ROOT (only files whose data changed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help='Directory to write to (default STATIC_EXPORT_ROOT)')
+
+    def handle(self, *args, **options):
+        counts, removed = static_export.export(options['root'])
+        self.stdout.write(self.style.SUCCESS(f"Files: {counts}, {removed} removed"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from nfl import scheduler
+from nfl.models import Game
+import utils.get_data as get_data
+
+
+class Command(BaseCommand):
+    help = "Fetch box scores (one request per game) and write every player's per-game stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--season', type=int, help='Season year (default: current)')
+        parser.add_argument('--week', type=int, help='Week number (default: every played game in the season)')
+        parser.add_argument('--event-id', type=int, help='Specific game')
+
+    def handle(self, *args, **options):
+        if options['event_id']:
+            games = Game.objects.filter(event_id=options['event_id'])
+        else:
+            games = Game.objects.filter(season=options['season'] or get_data.CURRENT_YEAR)
+            if options['week']:
+                games = games.filter(week_num=options['week'])
+            games = games.filter(game_datetime__lte=timezone.now())
+
+        self.stdout.write(f"Fetching box scores for {games.count()} games")
+        refreshed = scheduler.refresh_box_scores(games)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed box scores for {refreshed} games"))
@@ -1,29 +1,26 @@
+import multiprocessing
 import requests
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from nfl.models import Athlete, SeasonStatistic
+from nfl import gamelog, season_stats
 import utils.get_data as get_data
+from utils import espn_client
 
 class Command(BaseCommand):
-    help = "Fetch season statistics for all athletes"
+    help = "Fetch the season stats box scores don't give (QBR, a passer's rushing line) from each athlete's gamelog"
 
-    # Common stat mappings for different positions
-    STAT_MAPPINGS = {
-        'passing': ['completions', 'attempts', 'yards', 'completion_pct', 'yards_per_attempt', 
-                   'touchdowns', 'interceptions', 'sacks', 'sack_yards', 'rating', 
-                   'qbr', 'longest', 'rushing_attempts', 'rushing_yards', 'rushing_avg'],
-        'rushing': ['attempts', 'yards', 'avg', 'longest', 'touchdowns'],
-        'receiving': ['receptions', 'yards', 'avg', 'longest', 'touchdowns', 'targets'],
-        'defense': ['tackles', 'solo', 'assists', 'sacks', 'sack_yards', 'tackles_for_loss', 
-                   'passes_defended', 'interceptions', 'int_yards', 'int_touchdowns'],
-        'kicking': ['field_goals_made', 'field_goals_attempted', 'field_goal_pct', 'longest_fg',
-                   'extra_points_made', 'extra_points_attempted', 'points']
-    }
+    STAT_MAPPINGS = gamelog.STAT_MAPPINGS
 
     def add_arguments(self, parser):
         parser.add_argument('--season', type=int, help='Season year (default: current)')
         parser.add_argument('--athlete-id', type=int, help='Specific athlete ID')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Stat rows written per bulk upsert (default: 500)')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Worker processes; athletes are sharded by team (default: 1, no pool)')
 
     def handle(self, *args, **options):
         season = options['season'] or get_data.CURRENT_YEAR
@@ -37,22 +34,36 @@ class Command(BaseCommand):
         self.stdout.write(f"Fetching stats for {athletes.count()} athletes (season {season})")
         
         updated_count = 0
-        for athlete in athletes:
-            try:
-                if self.fetch_athlete_stats(athlete, season):
-                    updated_count += 1
-                    self.stdout.write(f"✓ {athlete.display_name or f'{athlete.first_name} {athlete.last_name}'}")
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"Failed {athlete}: {str(e)}"))
+        with self.stat_writer(options['chunk_size']) as writer:
+            if options['workers'] > 1:
+                updated_count = self.fetch_sharded(self.shard_by_team(athletes), season, options['workers'], writer)
+            else:
+                for athlete in athletes:
+                    try:
+                        if self.fetch_athlete_stats(athlete, season, writer):
+                            updated_count += 1
+                            self.stdout.write(f"✓ {athlete.display_name or f'{athlete.first_name} {athlete.last_name}'}")
+                    except Exception as e:
+                        self.stdout.write(self.style.WARNING(f"Failed {athlete}: {str(e)}"))
         
+        self.stdout.write(f"Stat rows: {writer.counts} in {writer.chunks} chunks")
         self.stdout.write(self.style.SUCCESS(f"Updated stats for {updated_count} athletes"))
 
-    def fetch_athlete_stats(self, athlete, season):
-        """Fetch stats using ESPN gamelog API"""
-        url = f"https://site.web.api.espn.com/apis/common/v3/sports/football/nfl/athletes/{athlete.athlete_id}/gamelog"
+    @staticmethod
+    def stat_writer(chunk_size=500):
+        """Batched SeasonStatistic writer keyed on the model's unique_together"""
+        return season_stats.season_stat_writer(chunk_size)
+
+    def fetch_athlete_stats(self, athlete, season, writer=None):
+        """Fetch stats using ESPN gamelog API and queue them on writer (flushed here if not given)"""
+        if writer is None:
+            with self.stat_writer() as writer:
+                return self.fetch_athlete_stats(athlete, season, writer)
+
+        url = gamelog.GAMELOG_URL.format(athlete_id=athlete.athlete_id)
         
         try:
-            response = requests.get(url, timeout=10)
+            response = espn_client.get(url)
             if response.status_code != 200:
                 return False
                 
@@ -63,48 +74,9 @@ class Command(BaseCommand):
                 athlete.display_name = data['athlete'].get('displayName')
                 athlete.save()
             
-            stats_saved = False
-            
-            # Process season types (Regular Season, Playoffs)
-            for season_type in data.get('seasonTypes', []):
-                season_name = season_type.get('displayName', '')
-                if str(season) not in season_name:
-                    continue
-                    
-                # Process categories (passing, rushing, etc.)
-                for category in season_type.get('categories', []):
-                    category_name = category.get('displayName', 'General').lower()
-                    totals = category.get('totals', [])
-                    
-                    if not totals:
-                        continue
-                    
-                    # Determine stat mapping based on category or position
-                    stat_names = self.get_stat_names_for_category(category_name, athlete.position)
-                    
-                    # Map totals to stat names
-                    for i, value in enumerate(totals):
-                        if i < len(stat_names) and value and value != '--':
-                            try:
-                                numeric_value = float(str(value).replace(',', ''))
-                            except (ValueError, AttributeError):
-                                numeric_value = None
-                            
-                            SeasonStatistic.objects.update_or_create(
-                                athlete=athlete,
-                                season_year=season,
-                                season_type='Regular Season',
-                                category_name=category_name,
-                                stat_name=stat_names[i],
-                                defaults={
-                                    'stat_value': numeric_value,
-                                    'stat_display_value': str(value),
-                                    'last_updated': timezone.now()
-                                }
-                            )
-                            stats_saved = True
-            
-            return stats_saved
+            rows = gamelog.parse_season_stats(data, season, athlete.position)
+            self.add_rows(writer, athlete.athlete_id, season, rows)
+            return bool(rows)
             
         except requests.RequestException as e:
             self.stdout.write(self.style.WARNING(f"API error for {athlete}: {str(e)}"))
@@ -112,18 +84,68 @@ class Command(BaseCommand):
 
     def get_stat_names_for_category(self, category_name, position):
         """Get appropriate stat names based on category and position"""
-        category_lower = category_name.lower()
-        
-        if 'passing' in category_lower or (position and 'quarterback' in position.lower()):
-            return self.STAT_MAPPINGS['passing']
-        elif 'rushing' in category_lower:
-            return self.STAT_MAPPINGS['rushing']
-        elif 'receiving' in category_lower:
-            return self.STAT_MAPPINGS['receiving']
-        elif 'defense' in category_lower or 'defensive' in category_lower:
-            return self.STAT_MAPPINGS['defense']
-        elif 'kicking' in category_lower or (position and 'kicker' in position.lower()):
-            return self.STAT_MAPPINGS['kicking']
-        else:
-            # Generic stat names for unknown categories
-            return [f'stat_{i}' for i in range(20)]
+        return gamelog.stat_names_for_category(category_name, position)
+
+    @classmethod
+    def add_rows(cls, writer, athlete_id, season, rows):
+        # Totals box scores give are summed from the games (nfl.season_stats); the gamelog only fills in the rest
+        for row in rows:
+            if not season_stats.from_box_scores(row[0], row[1]):
+                writer.add(cls.stat_from_row(athlete_id, season, row))
+
+    @staticmethod
+    def stat_from_row(athlete_id, season, row):
+        category_name, stat_name, numeric_value, display_value = row
+        return SeasonStatistic(
+            athlete_id=athlete_id,
+            season_year=season,
+            season_type='Regular Season',
+            category_name=category_name,
+            stat_name=stat_name,
+            stat_value=numeric_value,
+            stat_display_value=display_value,
+            last_updated=timezone.now()
+        )
+
+    @staticmethod
+    def shard_by_team(athletes):
+        """Group athletes into one shard per team (free agents share one)"""
+        shards = {}
+        for athlete_id, team_id, position, display_name in athletes.values_list(
+                'athlete_id', 'team_id', 'position', 'display_name'):
+            shards.setdefault(team_id or 'FA', []).append((athlete_id, position, bool(display_name)))
+        return shards
+
+    def fetch_sharded(self, shards, season, workers, writer, url_template=gamelog.GAMELOG_URL):
+        """Fetch and parse shards in a process pool; rows come back here and go through one writer"""
+        self.stdout.write(f"Fetching {len(shards)} shards with {workers} worker processes")
+        start = time.perf_counter()
+        updated_count = 0
+        names = {}
+        # Spawned workers don't inherit this process's database connections
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            futures = {
+                pool.submit(gamelog.fetch_shard, shard, members, season, url_template): shard
+                for shard, members in shards.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.stdout.write(self.style.WARNING(f"Shard {futures[future]} failed: {str(e)}"))
+                    continue
+                for athlete_id, *row in result['rows']:
+                    self.add_rows(writer, athlete_id, season, [row])
+                names.update(result['names'])
+                updated_count += result['updated']
+                self.stdout.write(
+                    f"[{done}/{len(shards)}] shard {result['shard']}: {result['updated']}/{result['athletes']} athletes, "
+                    f"{len(result['rows'])} rows, {result['failed']} failed in {result['elapsed']:.1f}s"
+                )
+
+        for athlete in Athlete.objects.filter(athlete_id__in=[k for k, v in names.items() if v]):
+            athlete.display_name = names[athlete.athlete_id]
+            athlete.save()
+        self.stdout.write(f"Fetched all shards in {time.perf_counter() - start:.1f}s")
+        return updated_count
@@ -1,7 +1,7 @@
-import requests
 from django.core.management.base import BaseCommand
 from django.db import models
 from nfl.models import Athlete
+from utils import espn_client
 
 class Command(BaseCommand):
     help = "Fix missing player names by fetching from ESPN API"
@@ -20,7 +20,7 @@ class Command(BaseCommand):
         for athlete in athletes:
             try:
                 url = f"https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/athletes/{athlete.athlete_id}"
-                response = requests.get(url, timeout=10)
+                response = espn_client.get(url)
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -0,0 +1,145 @@
+import threading
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test import Client
+from django.utils import timezone
+from nfl.models import Athlete, SeasonStatistic
+from utils import calendar_index
+from .fetch_player_stats import Command as FetchStatsCommand
+
+# Scratch athletes use an id range the real data never uses. Their stats go in
+# the current season, the one the leaderboard serves, and are deleted with them.
+FIRST_ATHLETE_ID = 900000000
+
+
+class Command(BaseCommand):
+    help = "Reproduce read/write contention: stats writers against concurrent API readers"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=2, help='Concurrent stats refresh writers (default: 2)')
+        parser.add_argument('--readers', type=int, default=8, help='Concurrent API readers (default: 8)')
+        parser.add_argument('--athletes', type=int, default=200, help='Scratch athletes per writer (default: 200)')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Write with the batched upserter instead of one update_or_create per stat')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows per bulk upsert (default: 500)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Database: {connection.vendor} ({connection.settings_dict['NAME']})")
+        self.season = calendar_index.current_season()
+        athlete_ids = self.create_athletes(options['writers'] * options['athletes'])
+        stat_names = FetchStatsCommand.STAT_MAPPINGS['passing']
+        self.results = {'writes': 0, 'write_errors': 0, 'reads': 0, 'read_errors': 0, 'bad_responses': {},
+                        'read_times': []}
+        self.lock = threading.Lock()
+        self.writing = threading.Event()
+        self.writing.set()
+
+        shards = [athlete_ids[i::options['writers']] for i in range(options['writers'])]
+        writers = [threading.Thread(target=self.run_writer, args=(shard, stat_names, options)) for shard in shards]
+        readers = [threading.Thread(target=self.run_reader) for _ in range(options['readers'])]
+        start = time.perf_counter()
+        try:
+            for thread in readers + writers:
+                thread.start()
+            for thread in writers:
+                thread.join()
+            self.writing.clear()
+            for thread in readers:
+                thread.join()
+        finally:
+            Athlete.objects.filter(athlete_id__in=athlete_ids).delete()
+        elapsed = time.perf_counter() - start
+
+        self.report(elapsed, options)
+
+    def create_athletes(self, count):
+        athletes = [
+            Athlete(athlete_id=FIRST_ATHLETE_ID + i, first_name='Load', last_name=f'Test {i}',
+                    display_name=f'Load Test {i}', position='Quarterback', position_key='quarterback')
+            for i in range(count)
+        ]
+        Athlete.objects.bulk_create(athletes, ignore_conflicts=True)
+        return [a.athlete_id for a in athletes]
+
+    def run_writer(self, athlete_ids, stat_names, options):
+        try:
+            if options['bulk']:
+                with FetchStatsCommand.stat_writer(options['chunk_size']) as writer:
+                    for athlete_id in athlete_ids:
+                        for i, stat_name in enumerate(stat_names):
+                            writer.add(self.stat_row(athlete_id, stat_name, i))
+                    try:
+                        writer.flush()
+                    except OperationalError:
+                        self.count('write_errors')
+                self.count('writes', writer.written)
+            else:
+                # The original fetch_player_stats pattern: one update_or_create per stat
+                for athlete_id in athlete_ids:
+                    for i, stat_name in enumerate(stat_names):
+                        try:
+                            with transaction.atomic():
+                                SeasonStatistic.objects.update_or_create(
+                                    athlete_id=athlete_id, season_year=self.season, season_type='Regular Season',
+                                    category_name='passing', stat_name=stat_name,
+                                    defaults={'stat_value': i, 'stat_display_value': str(i), 'last_updated': timezone.now()},
+                                )
+                            self.count('writes')
+                        except OperationalError:
+                            self.count('write_errors')
+        finally:
+            connections.close_all()
+
+    def stat_row(self, athlete_id, stat_name, value):
+        return SeasonStatistic(
+            athlete_id=athlete_id, season_year=self.season, season_type='Regular Season',
+            category_name='passing', stat_name=stat_name, stat_value=value,
+            stat_display_value=str(value), last_updated=timezone.now(),
+        )
+
+    def run_reader(self):
+        # Goes through the URL conf and middleware, so reads are routed like real API traffic
+        client = Client()
+        url = f'/api/position/quarterback/stats/?season={self.season}'
+        try:
+            while self.writing.is_set():
+                start = time.perf_counter()
+                try:
+                    status = client.get(url).status_code
+                except OperationalError:
+                    status = None
+                with self.lock:
+                    self.results['read_times'].append(time.perf_counter() - start)
+                    self.results['reads'] += 1
+                    # Only database errors (raised, or reported by the view as a 500) are contention;
+                    # any other status means the request itself is wrong
+                    if status is None or status >= 500:
+                        self.results['read_errors'] += 1
+                    elif status != 200:
+                        self.results['bad_responses'][status] = self.results['bad_responses'].get(status, 0) + 1
+        finally:
+            connections.close_all()
+
+    def count(self, key, n=1):
+        with self.lock:
+            self.results[key] += n
+
+    def report(self, elapsed, options):
+        results = self.results
+        times = sorted(results['read_times']) or [0]
+        mode = f"bulk upserts of {options['chunk_size']}" if options['bulk'] else 'update_or_create per stat'
+        self.stdout.write(f"{options['writers']} writers ({mode}), {options['readers']} readers, {elapsed:.1f}s")
+        self.stdout.write(f"Writes: {results['writes']} rows ({results['writes'] / elapsed:.0f}/s), "
+                          f"{results['write_errors']} failed")
+        self.stdout.write(f"Reads: {results['reads']} requests, p50 {times[len(times) // 2] * 1000:.0f} ms, "
+                          f"p95 {times[int(len(times) * 0.95)] * 1000:.0f} ms, {results['read_errors']} failed")
+        if results['bad_responses']:
+            statuses = ', '.join(f'{n} x {status}' for status, n in sorted(results['bad_responses'].items()))
+            raise CommandError(f"Reader requests to the position stats API were rejected ({statuses}); "
+                               f"the run measured nothing")
+        errors = results['write_errors'] + results['read_errors']
+        if errors:
+            self.stdout.write(self.style.ERROR(f"{errors} operations failed with 'database is locked' or similar"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No lock contention errors"))
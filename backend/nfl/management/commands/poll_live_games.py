@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand
+from nfl import live, scheduler
+from utils import fetch, get_data
+
+
+class Command(BaseCommand):
+    help = "Poll games in progress and publish score/status changes to live score clients"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=15, help='Seconds between polls while games are live (default: 15)')
+        parser.add_argument('--idle-interval', type=int, default=60, help='Seconds between checks when no game is live (default: 60)')
+        parser.add_argument('--once', action='store_true', help='Poll once and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            polled = self.poll()
+            if options['once']:
+                break
+            time.sleep(options['interval'] if polled else options['idle_interval'])
+
+    def poll(self):
+        """One upstream request per live game, shared by every connected client"""
+        games = list(scheduler.live_games())
+        if not games:
+            return 0
+        packages = fetch.fetch_json_many(get_data.game_package_url(g.event_id) for g in games)
+        changed = 0
+        for game, package in zip(games, packages):
+            if not package or not package.get('gamepackageJSON'):
+                continue
+            try:
+                delta = live.record_game_state(game, live.parse_game_state(package['gamepackageJSON']))
+            except (KeyError, IndexError) as e:
+                self.stderr.write(self.style.WARNING(f"Could not parse game {game.event_id}: {e}"))
+                continue
+            if delta:
+                changed += 1
+                self.stdout.write(f"{game.short_name}: {delta}")
+        self.stdout.write(f"Polled {len(games)} live games, {changed} changed")
+        return len(games)
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from nfl import odds_history
+
+
+class Command(BaseCommand):
+    help = "Downsample old odds and win-probability history (see ODDS_HISTORY_RETENTION)"
+
+    def handle(self, *args, **options):
+        deleted = odds_history.downsample()
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} odds history rows"))
@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: time django.setup() and the first request through
+# the WSGI handler, which is when the URLconf and views get imported.
+COLD_START_SCRIPT = '''
+import time
+start = time.perf_counter()
+import io, json, django
+django.setup()
+setup = time.perf_counter()
+from django.core.handlers.wsgi import WSGIHandler
+handler = WSGIHandler()
+status = []
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': %(url)r, 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+    'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.input': io.BytesIO(), 'wsgi.url_scheme': 'http',
+    'wsgi.errors': io.StringIO(),
+}
+response = handler(environ, lambda s, headers, exc_info=None: status.append(s))
+b''.join(response)
+end = time.perf_counter()
+print(json.dumps({
+    'setup_ms': (setup - start) * 1000,
+    'first_request_ms': (end - setup) * 1000,
+    'total_ms': (end - start) * 1000,
+    'status': status[0],
+}))
+'''
+
+
+def measure_cold_start(url='/api/', importtime=False, environ=None):
+    """Start a new interpreter, serve one request and return its timings (plus -X importtime lines)"""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', COLD_START_SCRIPT % {'url': url}]
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'sports.settings'),
+           **(environ or {})}
+    result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['imports'] = parse_importtime(result.stderr) if importtime else []
+    return timings
+
+
+@contextmanager
+def scratch_environ():
+    """Environment for cold starts that leave the real database, cache, log and ESPN cache alone"""
+    with tempfile.TemporaryDirectory() as directory:
+        yield {
+            'POSTGRES_DB': '',
+            'SQLITE_PATH': os.path.join(directory, 'db.sqlite3'),
+            'DJANGO_CACHE_BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'DJANGO_LOG_FILE': os.path.join(directory, 'django.log'),
+            'ESPN_CACHE_DIR': os.path.join(directory, 'espn'),
+        }
+
+
+def parse_importtime(output):
+    """(module, self_us, cumulative_us) for each line of -X importtime output"""
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+class Command(BaseCommand):
+    help = "Measure cold start: per-module import time and time to the first request served"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/', help='Path of the first request (default: /api/)')
+        parser.add_argument('--top', type=int, default=20, help='Modules to list by cumulative import time (default: 20)')
+        parser.add_argument('--runs', type=int, default=3, help='Cold starts to time; the fastest is reported (default: 3)')
+
+    def handle(self, *args, **options):
+        profile = measure_cold_start(options['url'], importtime=True)
+        self.stdout.write(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for name, self_us, cumulative_us in sorted(profile['imports'], key=lambda i: -i[2])[:options['top']]:
+            self.stdout.write(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+        # -X importtime adds its own overhead, so time the cold start separately
+        runs = [measure_cold_start(options['url']) for _ in range(options['runs'])]
+        best = min(runs, key=lambda r: r['total_ms'])
+        budget = getattr(settings, 'STARTUP_BUDGET_MS', None)
+        self.stdout.write(f"django.setup(): {best['setup_ms']:.0f} ms")
+        self.stdout.write(f"First request to {options['url']} ({best['status']}): {best['first_request_ms']:.0f} ms")
+        summary = f"Cold start to first response: {best['total_ms']:.0f} ms"
+        if budget is None:
+            self.stdout.write(summary)
+        elif best['total_ms'] > budget:
+            self.stdout.write(self.style.ERROR(f"{summary} (over the {budget} ms budget)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{summary} (budget {budget} ms)"))
@@ -1,7 +1,3 @@
-from datetime import datetime, timedelta
-
-from requests import get
-from django.utils.timezone import now
 from django.core.management.base import BaseCommand
 from utils import get_data
 from nfl import models
@@ -9,9 +5,6 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-CURRENT_YEAR = (datetime.now() - timedelta(days=150)).year
-NOW = now()
-
 class Command(BaseCommand):
     help = "Update game info for games in current and upcoming weeks"
 
@@ -3,12 +3,15 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from nfl.models import Game, Athlete, SeasonStatistic
 from nfl.management.commands.fetch_player_stats import Command as FetchStatsCommand
+import utils.get_data as get_data
 
 class Command(BaseCommand):
     help = "Update player stats for active/recent games"
 
     def add_arguments(self, parser):
         parser.add_argument('--force', action='store_true', help='Force update all players')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Worker processes; athletes are sharded by team (default: 1, no pool)')
 
     def handle(self, *args, **options):
         now = timezone.now()
@@ -40,15 +43,23 @@ class Command(BaseCommand):
             self.stdout.write(f"Updating {athletes.count()} athletes from {len(active_games)} active/recent games")
         
         # Use the fetch stats command logic
+        season = get_data.CURRENT_YEAR
         fetch_command = FetchStatsCommand()
         updated_count = 0
         
-        for athlete in athletes:
-            try:
-                if fetch_command.fetch_athlete_stats(athlete, 2025):  # Current season
-                    updated_count += 1
-                    self.stdout.write(f"✓ {athlete.display_name or f'{athlete.first_name} {athlete.last_name}'}")
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"Failed {athlete}: {str(e)}"))
+        with fetch_command.stat_writer() as writer:
+            if options['workers'] > 1:
+                fetch_command.stdout = self.stdout
+                shards = fetch_command.shard_by_team(athletes)
+                updated_count = fetch_command.fetch_sharded(shards, season, options['workers'], writer)
+            else:
+                for athlete in athletes:
+                    try:
+                        if fetch_command.fetch_athlete_stats(athlete, season, writer):
+                            updated_count += 1
+                            self.stdout.write(f"✓ {athlete.display_name or f'{athlete.first_name} {athlete.last_name}'}")
+                    except Exception as e:
+                        self.stdout.write(self.style.WARNING(f"Failed {athlete}: {str(e)}"))
         
+        self.stdout.write(f"Stat rows: {writer.counts} in {writer.chunks} chunks")
         self.stdout.write(self.style.SUCCESS(f"Updated stats for {updated_count} athletes"))
@@ -1,25 +1,37 @@
 from django.core.management.base import BaseCommand
 from django.core.management import call_command
-from utils import get_data
+from utils import get_data, espn_client, profiling
 
 class Command(BaseCommand):
     help = "Update all current season game info (schedule, team records, and odds)"
 
+    def add_arguments(self, parser):
+        profiling.add_arguments(parser)
+
     def handle(self, *args, **kwargs):
-        self.stdout.write("Updating calendar...")
-        call_command('update_calendar')
-        self.stdout.write(self.style.SUCCESS("Successfully updated calendar."))
+        profiler = profiling.from_options(kwargs)
+        with profiler.span('update_season_data'):
+            self.stdout.write("Updating calendar...")
+            with profiler.span('calendar'):
+                call_command('update_calendar')
+            self.stdout.write(self.style.SUCCESS("Successfully updated calendar."))
 
-        self.stdout.write("Updating team records...")
-        get_data.get_team_records()
-        self.stdout.write(self.style.SUCCESS("Successfully updated team records."))
+            self.stdout.write("Updating team records...")
+            with profiler.span('records'):
+                get_data.get_team_records()
+            self.stdout.write(self.style.SUCCESS("Successfully updated team records."))
 
-        self.stdout.write("Updating game info...")
-        call_command('update_game_info')
-        self.stdout.write(self.style.SUCCESS("Successfully updated game info."))
+            self.stdout.write("Updating game info...")
+            with profiler.span('game info'):
+                call_command('update_game_info')
+            self.stdout.write(self.style.SUCCESS("Successfully updated game info."))
 
-        self.stdout.write("Updating odds...")
-        get_data.update_odds_cron()
-        self.stdout.write(self.style.SUCCESS("Successfully updated odds."))
+            self.stdout.write("Updating odds...")
+            with profiler.span('odds'):
+                counts = get_data.update_odds_cron()
+            self.stdout.write(self.style.SUCCESS(f"Successfully updated odds ({counts})."))
 
+        self.stdout.write(f"ESPN: {espn_client.stats}")
+        if profiler.enabled:
+            self.stdout.write(profiler.report())
         self.stdout.write(self.style.SUCCESS("All current season data has been updated."))
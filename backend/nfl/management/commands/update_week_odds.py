@@ -10,5 +10,6 @@ class Command(BaseCommand):
     def handle(self, *args, **kwargs):
         week_num = kwargs['week_num']
         self.stdout.write(f"Updating odds and win probabilities for week {week_num}...")
-        get_data.week_num_odds(week_num)
+        counts = get_data.week_num_odds(week_num)
+        self.stdout.write(f"Outcome rows: {counts}")
         self.stdout.write(self.style.SUCCESS(f"Successfully updated odds and win probabilities for week {week_num}."))
@@ -0,0 +1,179 @@
+"""Per-route request latency, SQL query counts and DB time in Prometheus text format.
+
+MetricsMiddleware times every request and counts its queries (nothing is
+logged per query); metrics_view serves the totals at /metrics. Figures are per
+process: with several workers, scrape each one or add up the series.
+
+Every database connection gets one execute_wrapper when it opens, which adds
+to the QueryCounter of the request in the current context. Under ASGI, sync
+views and ORM calls run in worker threads through sync_to_async, which copies
+the context, so their queries are counted the same way as under WSGI.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Anything else a client sends is counted as OTHER, to keep the label set bounded
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Histograms and counters keyed by (route, method, status)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.queries = {}
+        self.db_seconds = {}
+
+    def record(self, labels, seconds, queries, db_seconds):
+        with self.lock:
+            self.latency.setdefault(labels, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.queries.setdefault(labels, Histogram(QUERY_BUCKETS)).observe(queries)
+            self.db_seconds[labels] = self.db_seconds.get(labels, 0) + db_seconds
+
+    def render(self):
+        with self.lock:
+            lines = []
+            self._histogram(lines, 'nfl_http_request_duration_seconds', 'Request latency by route', self.latency)
+            self._histogram(lines, 'nfl_http_request_db_queries', 'SQL queries per request by route', self.queries)
+            lines.append('# HELP nfl_http_request_db_seconds_total Time spent in SQL queries by route')
+            lines.append('# TYPE nfl_http_request_db_seconds_total counter')
+            for labels, total in sorted(self.db_seconds.items()):
+                lines.append(f'nfl_http_request_db_seconds_total{{{_labels(labels)}}} {total:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram(lines, name, help_text, histograms):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for labels, h in sorted(histograms.items()):
+            label_text = _labels(labels)
+            for bound, count in zip(h.bounds, h.counts):
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {h.count}')
+            lines.append(f'{name}_sum{{{label_text}}} {h.sum:.6f}')
+            lines.append(f'{name}_count{{{label_text}}} {h.count}')
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _labels(labels):
+    route, method, status = labels
+    return f'route="{_escape(route)}",method="{_escape(method)}",status="{status}"'
+
+
+registry = Registry()
+
+
+class QueryCounter:
+    """execute_wrapper that counts queries and the time spent in them"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+# The QueryCounter of the request being handled, if any
+_counter = ContextVar('nfl_metrics_query_counter', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    counter = _counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    # A connection object outlives reconnects, so it may already have one
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def route_name(request):
+    """The URL name (or view path) the request resolved to; one label per route, not per URL"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.url_name or match.view_name
+
+
+def _request_labels(request, response):
+    method = request.method if request.method in METHODS else 'OTHER'
+    return route_name(request), method, response.status_code
+
+
+class MetricsMiddleware:
+    """Record latency, query count and DB time of every request by route, method and status"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        counter = QueryCounter()
+        token = _counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _counter.reset(token)
+        registry.record(_request_labels(request, response), time.perf_counter() - start, counter.queries, counter.seconds)
+        return response
+
+    async def __acall__(self, request):
+        counter = QueryCounter()
+        token = _counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _counter.reset(token)
+        registry.record(_request_labels(request, response), time.perf_counter() - start, counter.queries, counter.seconds)
+        return response
+
+
+def metrics_view(request):
+    return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
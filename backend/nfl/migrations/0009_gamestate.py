@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0008_athlete_display_name_athlete_position_abbreviation_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameState',
+            fields=[
+                ('event_id', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='state', serialize=False, to='nfl.game')),
+                ('home_score', models.IntegerField(null=True)),
+                ('away_score', models.IntegerField(null=True)),
+                ('period', models.IntegerField(null=True)),
+                ('clock', models.CharField(max_length=10, null=True)),
+                ('status', models.CharField(max_length=10, null=True)),
+                ('status_detail', models.CharField(max_length=50, null=True)),
+                ('completed', models.BooleanField(default=False)),
+                ('last_updated', models.DateTimeField(null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0009_gamestate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statteam',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True, null=True),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:43
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def fill_position_key(apps, schema_editor):
+    Athlete = apps.get_model('nfl', 'Athlete')
+    Athlete.objects.update(position_key=Lower(Trim('position')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0010_statteam_last_updated'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='position_key',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.RunPython(fill_position_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='athlete',
+            index=models.Index(fields=['position_key'], name='athlete_position_key'),
+        ),
+        migrations.AddIndex(
+            model_name='athlete',
+            index=models.Index(fields=['team', 'position', 'jersey'], name='athlete_team_position'),
+        ),
+        migrations.AddIndex(
+            model_name='calendar',
+            index=models.Index(fields=['season', 'week_num'], name='calendar_season_week'),
+        ),
+        migrations.AddIndex(
+            model_name='calendar',
+            index=models.Index(fields=['season', 'end_date'], name='calendar_season_end'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['week', 'game_datetime'], name='game_week_datetime'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['season', 'week_num'], name='game_season_week'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['game_datetime'], name='game_datetime'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['home_team', 'game_datetime'], name='game_home_datetime'),
+        ),
+        migrations.AddIndex(
+            model_name='game',
+            index=models.Index(fields=['away_team', 'game_datetime'], name='game_away_datetime'),
+        ),
+        migrations.AddIndex(
+            model_name='seasonstatistic',
+            index=models.Index(fields=['season_year', 'season_type', 'athlete'], name='seasonstat_season_athlete'),
+        ),
+        migrations.AddIndex(
+            model_name='seasonstatistic',
+            index=models.Index(fields=['season_year', 'last_updated'], name='seasonstat_season_updated'),
+        ),
+        migrations.AddIndex(
+            model_name='statteam',
+            index=models.Index(fields=['stat_name', 'last_updated'], name='statteam_stat_updated'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0011_indexes_position_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OddsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField()),
+                ('spread', models.IntegerField(null=True)),
+                ('home_win_prob', models.FloatField(null=True)),
+                ('pred_diff', models.FloatField(null=True)),
+                ('game', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='odds_history', to='nfl.game')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['game', 'recorded_at'], name='odds_game_recorded')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0012_odds_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='source_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='calendar',
+            name='source_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='source_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='gamestatistic',
+            name='source_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='outcome',
+            name='odds_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='outcome',
+            name='probs_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='seasonstatistic',
+            name='source_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='statteam',
+            name='source_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='source_hash',
+            field=models.CharField(max_length=16, null=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.20 on 2026-10-17 00:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0013_source_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamStatKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=50)),
+                ('stat_name', models.CharField(max_length=50)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TeamStatSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('season', models.IntegerField()),
+                ('season_type_id', models.IntegerField()),
+                ('week_num', models.IntegerField()),
+                ('recorded_at', models.DateTimeField()),
+                ('stats', models.BinaryField()),
+                ('team', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='stat_snapshots', to='nfl.team')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='teamstatkey',
+            constraint=models.UniqueConstraint(fields=('stat_name', 'category'), name='unique_team_stat_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='teamstatsnapshot',
+            constraint=models.UniqueConstraint(fields=('season', 'team', 'season_type_id', 'week_num'), name='unique_team_stat_snapshot'),
+        ),
+    ]
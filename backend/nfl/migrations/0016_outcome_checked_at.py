@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-17 01:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nfl', '0015_live_event'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outcome',
+            name='checked_at',
+            field=models.DateTimeField(null=True),
+        ),
+    ]
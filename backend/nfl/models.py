@@ -1,11 +1,18 @@
 from django.db import models
 
+
+def normalize_position(position):
+    """Case-insensitive lookup key for a position name"""
+    return position.strip().lower() if position else None
+
+
 class Team(models.Model):
     team_id = models.IntegerField(primary_key=True)
     team_name = models.CharField(max_length=100)
     short_name = models.CharField(max_length=10, blank=True, null=True)
     record = models.CharField(max_length=20, blank=True, null=True)
     last_updated = models.DateTimeField(null=True)
+    source_hash = models.CharField(max_length=16, null=True)  # utils.bulk.fingerprint of the source values
 
     def __str__(self):
         return f'{self.short_name}'
@@ -20,6 +27,13 @@ class Calendar(models.Model):
     season_type_id = models.IntegerField(null=True)
     start_date = models.DateTimeField(null=True)
     end_date = models.DateTimeField(null=True)
+    source_hash = models.CharField(max_length=16, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['season', 'week_num'], name='calendar_season_week'),
+            models.Index(fields=['season', 'end_date'], name='calendar_season_end'),
+        ]
 
     def __str__(self):
         return f'{self.name}: {self.details} during {self.season_type_name}'
@@ -34,6 +48,17 @@ class Game(models.Model):
     home_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='home_games')
     away_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='away_games')
     week = models.ForeignKey(Calendar, on_delete=models.CASCADE, related_name='games_for_week', null=True)
+    source_hash = models.CharField(max_length=16, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['week', 'game_datetime'], name='game_week_datetime'),
+            models.Index(fields=['season', 'week_num'], name='game_season_week'),
+            models.Index(fields=['game_datetime'], name='game_datetime'),
+            # team_schedules ORs these two and orders by kickoff
+            models.Index(fields=['home_team', 'game_datetime'], name='game_home_datetime'),
+            models.Index(fields=['away_team', 'game_datetime'], name='game_away_datetime'),
+        ]
 
     def __str__(self):
         return f'{self.home_team} vs {self.away_team}'
@@ -47,11 +72,71 @@ class Outcome(models.Model):
     away_win_prob = models.FloatField(null=True)
     pred_diff = models.FloatField(null=True)
     last_updated = models.DateTimeField(null=True)
+    # When odds or probabilities were last fetched, whether or not they changed
+    checked_at = models.DateTimeField(null=True)
+    # Odds and power index are fetched separately, so each keeps its own fingerprint
+    odds_hash = models.CharField(max_length=16, null=True)
+    probs_hash = models.CharField(max_length=16, null=True)
 
     def __str__(self):
         return f'{self.spread_display}'
 
 
+class OddsSnapshot(models.Model):
+    """Spread and win probability for a game from recorded_at until the next row.
+
+    Append-only: a row is written only when a value changes (nfl.odds_history).
+    """
+    # No single-column index: odds_game_recorded covers lookups by game
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='odds_history', db_index=False)
+    recorded_at = models.DateTimeField()
+    spread = models.IntegerField(null=True)
+    home_win_prob = models.FloatField(null=True)
+    pred_diff = models.FloatField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['game', 'recorded_at'], name='odds_game_recorded'),
+        ]
+
+    def __str__(self):
+        return f'{self.game_id} @ {self.recorded_at}: {self.spread} / {self.home_win_prob}'
+
+
+class GameState(models.Model):
+    event_id = models.OneToOneField(Game, on_delete=models.CASCADE, primary_key=True, related_name='state')
+    home_score = models.IntegerField(null=True)
+    away_score = models.IntegerField(null=True)
+    period = models.IntegerField(null=True)
+    clock = models.CharField(max_length=10, null=True)
+    status = models.CharField(max_length=10, null=True)  # pre, in, post
+    status_detail = models.CharField(max_length=50, null=True)  # e.g. "3rd Qtr 5:12", "Final"
+    completed = models.BooleanField(default=False)
+    last_updated = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f'{self.event_id}: {self.away_score}-{self.home_score} {self.status_detail}'
+
+
+class Sequence(models.Model):
+    """A named counter; incrementing it locks the row until commit, so values follow commit order"""
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
+class LiveEvent(models.Model):
+    """A live score change as sent to Server-Sent Events clients (nfl.live)"""
+    seq = models.BigIntegerField(primary_key=True)
+    data = models.JSONField()
+    created_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'{self.seq}: {self.data}'
+
+
 class Athlete(models.Model):
     athlete_id = models.IntegerField(unique=True, primary_key=True)
     first_name = models.CharField(max_length=30, null=True)
@@ -62,6 +147,7 @@ class Athlete(models.Model):
     position_id = models.IntegerField(null=True)
     position = models.CharField(max_length=50, null=True)
     position_abbreviation = models.CharField(max_length=10, null=True)  # Added
+    position_key = models.CharField(max_length=50, null=True)  # normalize_position(position)
     age = models.IntegerField(null=True)
     weight = models.IntegerField(null=True)
     height = models.IntegerField(null=True)
@@ -70,6 +156,20 @@ class Athlete(models.Model):
     status_id = models.IntegerField(null=True)
     status = models.CharField(max_length=50, null=True)
     injuries = models.CharField(max_length=50, null=True)
+    source_hash = models.CharField(max_length=16, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['position_key'], name='athlete_position_key'),
+            models.Index(fields=['team', 'position', 'jersey'], name='athlete_team_position'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.position_key = normalize_position(self.position)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'position' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'position_key'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f'{self.first_name} {self.last_name}'
@@ -84,9 +184,14 @@ class SeasonStatistic(models.Model):
     stat_value = models.DecimalField(max_digits=12, decimal_places=3, null=True)
     stat_display_value = models.CharField(max_length=50, null=True)
     last_updated = models.DateTimeField(auto_now=True)
+    source_hash = models.CharField(max_length=16, null=True)
 
     class Meta:
         unique_together = ['athlete', 'season_year', 'season_type', 'category_name', 'stat_name']
+        indexes = [
+            models.Index(fields=['season_year', 'season_type', 'athlete'], name='seasonstat_season_athlete'),
+            models.Index(fields=['season_year', 'last_updated'], name='seasonstat_season_updated'),
+        ]
 
     def __str__(self):
         return f'{self.athlete} - {self.season_year} {self.category_name}: {self.stat_name}'
@@ -102,6 +207,7 @@ class GameStatistic(models.Model):
     stat_value = models.DecimalField(max_digits=12, decimal_places=3, null=True)
     stat_display_value = models.CharField(max_length=50, null=True)
     last_updated = models.DateTimeField(auto_now=True)
+    source_hash = models.CharField(max_length=16, null=True)
 
     class Meta:
         unique_together = ['athlete', 'event_id', 'category_name', 'stat_name']
@@ -118,6 +224,8 @@ class StatTeam(models.Model):
     rank = models.IntegerField(null=True)
     display_rank = models.CharField(max_length=10, null=True)
     description = models.CharField(max_length=200, null=True)
+    last_updated = models.DateTimeField(auto_now=True, null=True)
+    source_hash = models.CharField(max_length=16, null=True)
 
     class Meta:
         constraints = [
@@ -126,3 +234,40 @@ class StatTeam(models.Model):
                 name='unique_team_category_stat'
             )
         ]
+        indexes = [
+            models.Index(fields=['stat_name', 'last_updated'], name='statteam_stat_updated'),
+        ]
+
+
+class TeamStatKey(models.Model):
+    """Small id for a team stat name, used inside TeamStatSnapshot.stats"""
+    category = models.CharField(max_length=50)
+    stat_name = models.CharField(max_length=50)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['stat_name', 'category'], name='unique_team_stat_key'),
+        ]
+
+    def __str__(self):
+        return f'{self.category}.{self.stat_name}'
+
+
+class TeamStatSnapshot(models.Model):
+    """Every StatTeam value and rank for one team as of one week, packed by nfl.team_trends"""
+    # Looked up by season (and team) through unique_team_stat_snapshot, so no index of its own
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='stat_snapshots', db_index=False)
+    season = models.IntegerField()
+    season_type_id = models.IntegerField()
+    week_num = models.IntegerField()
+    recorded_at = models.DateTimeField()
+    stats = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['season', 'team', 'season_type_id', 'week_num'],
+                                    name='unique_team_stat_snapshot'),
+        ]
+
+    def __str__(self):
+        return f'{self.team} {self.season} week {self.week_num}'
@@ -0,0 +1,60 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from .models import OddsSnapshot
+
+logger = logging.getLogger(__name__)
+
+TRACKED_FIELDS = ('spread', 'home_win_prob', 'pred_diff')
+
+# (age in days, seconds per bucket): history older than the age keeps the last
+# snapshot in each bucket, plus each game's opening line
+DEFAULT_RETENTION = [(7, 3600), (60, 86400)]
+
+
+def record(game, when=None, **values):
+    """Append a snapshot for game if any of values changed. Returns the new row or None.
+
+    Odds and probabilities are fetched separately, so values not passed carry
+    over from the previous snapshot.
+    """
+    last = (OddsSnapshot.objects.filter(game=game).order_by('-recorded_at').values(*TRACKED_FIELDS).first()
+            or dict.fromkeys(TRACKED_FIELDS))
+    current = {**last, **{k: v for k, v in values.items() if k in TRACKED_FIELDS and v is not None}}
+    if current == last:
+        return None
+    return OddsSnapshot.objects.create(game=game, recorded_at=when or timezone.now(), **current)
+
+
+def series(snapshots):
+    """Movement series per game from a snapshot queryset: {event_id: [{recorded_at, spread, ...}]}"""
+    games = {}
+    rows = snapshots.order_by('game_id', 'recorded_at').values_list('game_id', 'recorded_at', *TRACKED_FIELDS)
+    for game_id, recorded_at, *values in rows:
+        games.setdefault(game_id, []).append({'recorded_at': recorded_at, **dict(zip(TRACKED_FIELDS, values))})
+    return games
+
+
+def downsample(now=None, retention=None, batch_size=500):
+    """Thin out old history according to the retention policy. Returns the rows deleted."""
+    now = now or timezone.now()
+    retention = retention or getattr(settings, 'ODDS_HISTORY_RETENTION', DEFAULT_RETENTION)
+    deleted = 0
+    for days, bucket_seconds in retention:
+        cutoff = now - timedelta(days=days)
+        rows = (OddsSnapshot.objects.filter(recorded_at__lt=cutoff)
+                .order_by('game_id', 'recorded_at').values_list('id', 'game_id', 'recorded_at'))
+        doomed = []
+        previous = None  # (id, game_id, bucket, opening) of the row before; dropped if the next shares its bucket
+        for snapshot_id, game_id, recorded_at in rows.iterator(chunk_size=2000):
+            bucket = int(recorded_at.timestamp() // bucket_seconds)
+            if previous and previous[1] == game_id and previous[2] == bucket and not previous[3]:
+                doomed.append(previous[0])
+            opening = not previous or previous[1] != game_id
+            previous = (snapshot_id, game_id, bucket, opening)
+        for i in range(0, len(doomed), batch_size):
+            deleted += OddsSnapshot.objects.filter(id__in=doomed[i:i + batch_size]).delete()[0]
+        logger.info(f"Downsampled odds history older than {days} days to one row per {bucket_seconds}s: "
+                    f"{len(doomed)} rows removed")
+    return deleted
@@ -0,0 +1,111 @@
+import secrets
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+GLOBAL_VERSION_KEY = 'nfl:games:version'
+CURRENT_WEEK = 'current'
+
+
+def _new_version():
+    # Versions are only compared for equality, so every bump stores a value no
+    # reader has seen: clock plus random bits, unique across processes and
+    # after a key was evicted and re-created
+    return f'{time.time_ns():x}{secrets.token_hex(4)}'
+
+
+def _week_version_key(season, week_num):
+    return f'nfl:games:version:{season}:{week_num}'
+
+
+def _payload_key(season, requested, global_version):
+    return f'nfl:games:payload:{season}:{requested}:{global_version}'
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump(key):
+    # A single set, not incr: FileBasedCache's incr is a get and a set, so two
+    # processes bumping at once could both write the same value and a payload
+    # built between them would stay valid. Concurrent sets can't be lost that
+    # way; whichever lands last is still a value no stored payload was built under.
+    cache.set(key, _new_version(), None)
+
+
+def get_version(name):
+    """Shared generation counter for other in-process caches (e.g. nfl.leaderboards)"""
+    return _get_version(f'nfl:version:{name}')
+
+
+def bump_version(name):
+    _bump(f'nfl:version:{name}')
+
+
+def global_version():
+    return _get_version(GLOBAL_VERSION_KEY)
+
+
+def week_version(season, week_num):
+    return _get_version(_week_version_key(season, week_num))
+
+
+def invalidate_week(season, week_num):
+    """Mark the games payload for one week as stale"""
+    _bump(_week_version_key(season, week_num))
+
+
+def invalidate_all():
+    """Mark every games payload as stale (team records and the week list appear in all of them)"""
+    _bump(GLOBAL_VERSION_KEY)
+
+
+def _valid_entry(season, week_num):
+    requested = week_num or CURRENT_WEEK
+    global_v = global_version()
+    entry = cache.get(_payload_key(season, requested, global_v))
+    if entry is None:
+        return None
+    entry_week, entry_version, body = entry
+    if cache.get(_week_version_key(season, entry_week)) != entry_version:
+        return None
+    return global_v, entry
+
+
+def games_etag(global_v, week_num, week_v):
+    return f'"games-{global_v}-{week_num}-{week_v}"'
+
+
+def get_games_payload(season, week_num=None):
+    """Return the pre-serialized games payload for a week, or None on a miss.
+
+    Only touches the cache: the global version, the stored entry and the
+    version of the week the entry was built for.
+    """
+    valid = _valid_entry(season, week_num)
+    return valid[1][2] if valid else None
+
+
+def get_games_etag(season, week_num=None):
+    """ETag of the cached payload a request would get, or None if it has to be built"""
+    valid = _valid_entry(season, week_num)
+    if valid is None:
+        return None
+    global_v, (entry_week, entry_version, body) = valid
+    return games_etag(global_v, entry_week, entry_version)
+
+
+def set_games_payload(season, week_num, built_week_num, versions, body):
+    """Store a payload built for built_week_num under the versions read before building it"""
+    global_v, week_v = versions
+    requested = week_num or CURRENT_WEEK
+    # The current week moves with the clock, so that entry also expires on its own
+    timeout = getattr(settings, 'GAMES_PAYLOAD_TIMEOUT', 60 * 60 * 24)
+    if requested == CURRENT_WEEK:
+        timeout = min(timeout, getattr(settings, 'CURRENT_WEEK_PAYLOAD_TIMEOUT', 300))
+    cache.set(_payload_key(season, requested, global_v), (built_week_num, week_v, body), timeout)
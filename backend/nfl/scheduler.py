@@ -0,0 +1,146 @@
+"""Decide what the cron jobs refresh, based on where each game is in its lifecycle.
+
+Games are upcoming (kickoff within UPCOMING_WINDOW), live (kicked off less than
+LIVE_WINDOW ago and not marked completed in GameState) or finished. Live games
+are refreshed every minute, odds for upcoming games at most once per
+ODDS_MAX_AGE, team records and team stats once after each finished game, and
+when no game is within SEASON_WINDOW of now (the off-season) nothing is
+fetched at all. Player stats come from each game's box score (one
+request per game), and season totals are derived from those in nfl.season_stats.
+"""
+import logging
+from datetime import timedelta
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Min
+from django.utils import timezone
+from .models import Game, Team
+import utils.get_data as get_data
+from utils import fetch
+
+logger = logging.getLogger(__name__)
+
+LIVE_WINDOW = timedelta(hours=4)
+UPCOMING_WINDOW = timedelta(days=7)
+SEASON_WINDOW = timedelta(days=14)
+ODDS_MAX_AGE = timedelta(hours=1)
+POST_GAME_WINDOW = timedelta(days=1)
+# Unchanged StatTeam rows aren't rewritten, so the last refresh is kept here
+TEAM_STATS_REFRESHED_KEY = 'nfl:scheduler:team_stats_refreshed'
+
+
+def in_season(now=None):
+    now = now or timezone.now()
+    return Game.objects.filter(game_datetime__range=(now - SEASON_WINDOW, now + SEASON_WINDOW)).exists()
+
+
+def live_games(now=None):
+    now = now or timezone.now()
+    return Game.objects.filter(
+        game_datetime__lte=now, game_datetime__gt=now - LIVE_WINDOW
+    ).exclude(state__completed=True).select_related('home_team', 'away_team')
+
+
+def upcoming_games(now=None):
+    now = now or timezone.now()
+    return Game.objects.filter(
+        game_datetime__gt=now, game_datetime__lte=now + UPCOMING_WINDOW
+    ).select_related('home_team', 'away_team', 'outcome')
+
+
+def finished_games(since, now=None):
+    """Games whose live window closed between since and now"""
+    now = now or timezone.now()
+    return Game.objects.filter(game_datetime__gt=since - LIVE_WINDOW, game_datetime__lte=now - LIVE_WINDOW)
+
+
+def odds_are_stale(game, now=None):
+    now = now or timezone.now()
+    outcome = getattr(game, 'outcome', None)
+    # Unchanged odds aren't rewritten, so last_updated only says when they last moved
+    checked = outcome and (outcome.checked_at or outcome.last_updated)
+    return checked is None or checked < now - ODDS_MAX_AGE
+
+
+def refresh_live_games(now=None):
+    """Every minute: game info and win probability for games in progress"""
+    games = list(live_games(now))
+    for game in games:
+        get_data.update_game(game)
+        try:
+            get_data.single_game_probs(game)
+        except Exception as e:
+            logger.error(f"An error occurred refreshing probabilities for game {game.event_id}: {e}")
+    logger.info(f"Refreshed {len(games)} live games")
+    return len(games)
+
+
+def refresh_upcoming_odds(now=None):
+    """Every hour: odds and probabilities for upcoming games whose outcome is older than ODDS_MAX_AGE"""
+    games = [g for g in upcoming_games(now) if odds_are_stale(g, now)]
+    for game in games:
+        get_data.single_game_odds(game)
+        try:
+            get_data.single_game_probs(game)
+        except Exception as e:
+            logger.error(f"An error occurred refreshing probabilities for game {game.event_id}: {e}")
+    logger.info(f"Refreshed odds for {len(games)} upcoming games")
+    return len(games)
+
+
+def refresh_records(now=None):
+    """Every hour: team records, but only after a game has finished since the last refresh"""
+    now = now or timezone.now()
+    oldest = Team.objects.aggregate(oldest=Min('last_updated'))['oldest']
+    if oldest is not None and not finished_games(oldest, now).exists():
+        return False
+    get_data.get_team_records()
+    return True
+
+
+def refresh_team_stats(now=None):
+    """Every hour: team stats, but only after a game has finished since the last refresh"""
+    now = now or timezone.now()
+    refreshed = cache.get(TEAM_STATS_REFRESHED_KEY)
+    if refreshed is not None and not finished_games(refreshed, now).exists():
+        return False
+    call_command('update_team_stats')
+    cache.set(TEAM_STATS_REFRESHED_KEY, now, None)
+    return True
+
+
+def refresh_daily(now=None):
+    """Every day in season: calendar, game times/matchups for the next two weeks and odds history retention"""
+    if not in_season(now):
+        logger.info("Off-season, skipping daily refresh")
+        return False
+    call_command('update_calendar')
+    get_data.update_upcoming_games()
+    call_command('prune_odds_history')
+    return True
+
+
+def refresh_box_scores(games):
+    """One gamepackage request per game: schedule info, score/status and every player's box score"""
+    games = list(games.select_related('home_team', 'away_team'))
+    packages = fetch.fetch_json_many(get_data.game_package_url(g.event_id) for g in games)
+    refreshed = 0
+    for game, package in zip(games, packages):
+        if not package or not package.get('gamepackageJSON'):
+            continue
+        try:
+            get_data.apply_game_package(game, package['gamepackageJSON'])
+            refreshed += 1
+        except Exception as e:
+            logger.error(f"An error occurred refreshing the box score for game {game.event_id}: {e}")
+    logger.info(f"Refreshed box scores for {refreshed} games")
+    return refreshed
+
+
+def refresh_post_game_player_stats(now=None):
+    """Every day: final box scores (and with them season totals) for games that finished in the last day"""
+    now = now or timezone.now()
+    games = finished_games(now - POST_GAME_WINDOW, now)
+    if not games.exists():
+        return 0
+    return refresh_box_scores(games)
@@ -0,0 +1,228 @@
+"""An immutable in-memory copy of the schedule: teams, weeks, games with their
+outcomes and states, and each team's stats.
+
+It is built from about five queries after an ingestion run (publish()) and
+stored in the shared cache, so every worker loads the same copy once and swaps
+it in; the games, team_schedules and matchup views then answer without touching
+the database. It is kept in two parts, each with its own generation (bumped
+from nfl.signals): the schedule (teams, weeks, games, team stats) under
+'season', and the odds and game states under 'season_live'. Those change every
+minute on game day, and only the small live part is rebuilt for them.
+"""
+import logging
+import threading
+from django.core.cache import cache
+from . import payload_cache
+from .db_router import read_from_primary
+from .models import Calendar, Game, GameState, Outcome, StatTeam, Team
+
+logger = logging.getLogger(__name__)
+
+VERSION_NAME = 'season'
+LIVE_VERSION_NAME = 'season_live'
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+STAT_FIELDS = ('id', 'team_id', 'category', 'stat_name', 'value', 'rank', 'display_rank', 'description')
+
+
+class Frozen:
+    """Slotted record whose attributes can't be changed after construction"""
+
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.__slots__, args):
+            object.__setattr__(self, name, value)
+        for name in self.__slots__[len(args):]:
+            object.__setattr__(self, name, kwargs.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self):
+        # Stable across processes, so a node can go into an ETag
+        return f"{type(self).__name__}{tuple(getattr(self, name) for name in self.__slots__)}"
+
+    def __reduce__(self):
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_row(cls, row, **extra):
+        return cls(**{name: getattr(row, name, None) for name in cls.__slots__ if name not in extra}, **extra)
+
+
+class TeamNode(Frozen):
+    __slots__ = ('team_id', 'team_name', 'short_name', 'record', 'last_updated')
+
+
+class WeekNode(Frozen):
+    __slots__ = ('id', 'name', 'details', 'week_num', 'season', 'season_type_name', 'season_type_id',
+                 'start_date', 'end_date')
+
+
+class OutcomeNode(Frozen):
+    __slots__ = ('spread_display', 'spread', 'home_win_prob', 'away_win_prob', 'pred_diff', 'last_updated')
+
+
+class StateNode(Frozen):
+    __slots__ = ('home_score', 'away_score', 'period', 'clock', 'status', 'status_detail', 'completed',
+                 'last_updated')
+
+
+class GameNode(Frozen):
+    __slots__ = ('event_id', 'short_name', 'game_datetime', 'season', 'week_num', 'week_id',
+                 'home_team_id', 'away_team_id', 'home_team', 'away_team', 'outcome', 'state')
+
+
+class LiveLayer(Frozen):
+    """Every Outcome and GameState row by event id"""
+
+    __slots__ = ('generation', 'outcomes', 'states')
+
+    @classmethod
+    def build(cls, generation):
+        return cls(
+            generation,
+            {o.event_id_id: OutcomeNode.from_row(o) for o in Outcome.objects.all()},
+            {s.event_id_id: StateNode.from_row(s) for s in GameState.objects.all()},
+        )
+
+
+class SeasonSnapshot(Frozen):
+    """Every Team, Calendar and Game row, indexed the way the read views look them up"""
+
+    __slots__ = ('generation', 'live_generation', 'teams', 'weeks_by_season', 'weeks_by_num', 'games_by_week',
+                 'games_by_team', 'games_by_event', 'team_stats')
+
+    @classmethod
+    def build(cls, generation):
+        """The schedule alone; with_live() adds the outcomes and states"""
+        teams = {t.team_id: TeamNode.from_row(t) for t in Team.objects.all()}
+
+        weeks_by_season, weeks_by_num = {}, {}
+        for week in Calendar.objects.order_by('id'):
+            node = WeekNode.from_row(week)
+            weeks_by_season.setdefault(week.season, []).append(node)
+            # The first row wins, like Calendar.objects.filter(season=, week_num=).first()
+            weeks_by_num.setdefault((week.season, week.week_num), node)
+        for weeks in weeks_by_season.values():
+            # Same order as order_by('end_date') on SQLite and Postgres: missing dates first
+            weeks.sort(key=lambda w: (w.end_date is not None, w.end_date or 0))
+
+        games_by_week, games_by_team, games_by_event = {}, {}, {}
+        for game in Game.objects.order_by('game_datetime', 'event_id'):
+            node = GameNode.from_row(
+                game, home_team=teams.get(game.home_team_id), away_team=teams.get(game.away_team_id),
+                outcome=None, state=None,
+            )
+            games_by_event[game.event_id] = node
+            games_by_week.setdefault(game.week_id, []).append(node)
+            games_by_team.setdefault(game.home_team_id, []).append(node)
+            if game.away_team_id != game.home_team_id:
+                games_by_team.setdefault(game.away_team_id, []).append(node)
+
+        team_stats = {}
+        for stat in StatTeam.objects.order_by('id').values(*STAT_FIELDS):
+            team_stats.setdefault(stat['team_id'], []).append(stat)
+
+        return cls(
+            generation, None, teams,
+            {season: tuple(weeks) for season, weeks in weeks_by_season.items()}, weeks_by_num,
+            {week_id: tuple(games) for week_id, games in games_by_week.items()},
+            {team_id: tuple(games) for team_id, games in games_by_team.items()},
+            games_by_event,
+            {team_id: tuple(stats) for team_id, stats in team_stats.items()},
+        )
+
+    def with_live(self, live):
+        """A copy whose games carry the layer's outcomes and states; no queries"""
+        games_by_event = {
+            event_id: GameNode(*(getattr(game, name) for name in GameNode.__slots__[:-2]),
+                               outcome=live.outcomes.get(event_id), state=live.states.get(event_id))
+            for event_id, game in self.games_by_event.items()
+        }
+
+        def relink(index):
+            return {key: tuple(games_by_event[g.event_id] for g in games) for key, games in index.items()}
+
+        return SeasonSnapshot(
+            self.generation, live.generation, self.teams, self.weeks_by_season, self.weeks_by_num,
+            relink(self.games_by_week), relink(self.games_by_team), games_by_event, self.team_stats,
+        )
+
+    def season_weeks(self, season):
+        return self.weeks_by_season.get(season, ())
+
+    def week(self, season, week_num):
+        return self.weeks_by_num.get((season, week_num))
+
+    def week_games(self, week_id):
+        return self.games_by_week.get(week_id, ())
+
+    def team_games(self, team_id):
+        return self.games_by_team.get(team_id, ())
+
+    def stats_for(self, team_id):
+        """StatTeam rows for a team as dicts (the fields model_to_dict gave the matchup payload)"""
+        return [dict(stat) for stat in self.team_stats.get(team_id, ())]
+
+
+_schedule = None
+_snapshot = None
+_lock = threading.Lock()
+
+
+def _cache_key(generation):
+    return f'nfl:season_snapshot:{generation}'
+
+
+def _live_cache_key(generation):
+    return f'nfl:season_snapshot:live:{generation}'
+
+
+def _shared(key, build, generation):
+    """The copy other workers stored under key, or a new one built from the primary and stored there"""
+    obj = cache.get(key)
+    if obj is None:
+        with read_from_primary():
+            obj = build(generation)
+        cache.set(key, obj, SNAPSHOT_TIMEOUT)
+        logger.debug(f"Built {type(obj).__name__} {generation}")
+    return obj
+
+
+def get_snapshot():
+    """This process's snapshot, swapped for the shared one when a generation moves.
+
+    Costs two cache reads while the generations are unchanged. A live write only
+    reloads the outcomes and states; the schedule part is kept.
+    """
+    global _schedule, _snapshot
+    # Read the generations before building so a concurrent write triggers another build
+    generation = payload_cache.get_version(VERSION_NAME)
+    live_generation = payload_cache.get_version(LIVE_VERSION_NAME)
+    snapshot = _snapshot
+    if snapshot is not None and (snapshot.generation, snapshot.live_generation) == (generation, live_generation):
+        return snapshot
+    with _lock:
+        snapshot = _snapshot
+        if snapshot is None or (snapshot.generation, snapshot.live_generation) != (generation, live_generation):
+            if _schedule is None or _schedule.generation != generation:
+                _schedule = _shared(_cache_key(generation), SeasonSnapshot.build, generation)
+            live = _shared(_live_cache_key(live_generation), LiveLayer.build, live_generation)
+            _snapshot = _schedule.with_live(live)
+        return _snapshot
+
+
+def publish():
+    """Build and share the snapshot for the current data (run after ingestion)"""
+    return get_snapshot()
+
+
+def invalidate():
+    """Mark the schedule stale in every process (called when a team, week, game or team stat changes)"""
+    payload_cache.bump_version(VERSION_NAME)
+
+
+def invalidate_live():
+    """Mark the outcomes and game states stale in every process"""
+    payload_cache.bump_version(LIVE_VERSION_NAME)
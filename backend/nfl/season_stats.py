@@ -0,0 +1,163 @@
+from collections import defaultdict
+from django.db.models import CharField, Max, Q, Sum
+from django.db.models.functions import Cast
+from django.utils import timezone
+from .models import Game, GameStatistic, SeasonStatistic
+from utils.bulk import ChangeDetectingUpserter
+
+# Season totals are recomputed from the stored GameStatistic rows of the
+# athletes a box score touched. Re-ingesting an event overwrites its game rows,
+# so the totals never double count. The stats listed here (and DERIVED) are
+# owned by this module; the rest of an athlete's Regular Season rows (QBR, a
+# passer's rushing line) come from ESPN gamelogs via fetch_player_stats.
+SUMMED = {
+    'passing': ['completions', 'attempts', 'yards', 'touchdowns', 'interceptions', 'sacks', 'sack_yards'],
+    'rushing': ['attempts', 'yards', 'touchdowns'],
+    'receiving': ['receptions', 'yards', 'touchdowns', 'targets'],
+    'defense': ['tackles', 'solo', 'sacks', 'tackles_for_loss', 'passes_defended',
+                'interceptions', 'int_yards', 'int_touchdowns'],
+    'kicking': ['field_goals_made', 'field_goals_attempted', 'extra_points_made', 'extra_points_attempted', 'points'],
+}
+LONGEST = {
+    'passing': [],
+    'rushing': ['longest'],
+    'receiving': ['longest'],
+    'defense': [],
+    'kicking': ['longest_fg'],
+}
+DERIVED = {
+    'passing': ['completion_pct', 'yards_per_attempt', 'rating'],
+    'rushing': ['avg'],
+    'receiving': ['avg'],
+    'defense': ['assists'],
+    'kicking': ['field_goal_pct'],
+}
+OWNED = {category: {*SUMMED[category], *LONGEST[category], *DERIVED[category]} for category in SUMMED}
+
+
+def from_box_scores(category_name, stat_name):
+    """Whether the Regular Season row for this stat is derived here rather than read from a gamelog"""
+    return stat_name in OWNED.get(category_name, ())
+
+
+def _ratio(stats, numerator, denominator, scale=1):
+    if not stats.get(denominator):
+        return None
+    return stats.get(numerator, 0) / stats[denominator] * scale
+
+
+def passer_rating(stats):
+    """NFL passer rating from season totals"""
+    attempts = stats.get('attempts')
+    if not attempts:
+        return None
+    parts = [
+        (stats.get('completions', 0) / attempts - 0.3) * 5,
+        (stats.get('yards', 0) / attempts - 3) * 0.25,
+        stats.get('touchdowns', 0) / attempts * 20,
+        2.375 - stats.get('interceptions', 0) / attempts * 25,
+    ]
+    return sum(min(max(p, 0), 2.375) for p in parts) / 6 * 100
+
+
+def derived_stats(category_name, stats):
+    """Averages and percentages that can be rebuilt from the totals"""
+    if category_name == 'passing':
+        return {
+            'completion_pct': _ratio(stats, 'completions', 'attempts', 100),
+            'yards_per_attempt': _ratio(stats, 'yards', 'attempts'),
+            'rating': passer_rating(stats),
+        }
+    if category_name == 'rushing':
+        return {'avg': _ratio(stats, 'yards', 'attempts')}
+    if category_name == 'receiving':
+        return {'avg': _ratio(stats, 'yards', 'receptions')}
+    if category_name == 'defense' and 'tackles' in stats and 'solo' in stats:
+        return {'assists': stats['tackles'] - stats['solo']}
+    if category_name == 'kicking':
+        return {'field_goal_pct': _ratio(stats, 'field_goals_made', 'field_goals_attempted', 100)}
+    return {}
+
+
+def display_value(value):
+    if float(value).is_integer():
+        return f'{int(value):,}'
+    return f'{value:,.1f}'
+
+
+def season_event_ids(season):
+    """Regular season games, as the string event ids GameStatistic stores"""
+    return Game.objects.filter(
+        Q(week__season_type_id=2) | Q(week__isnull=True), season=season
+    ).annotate(event_key=Cast('event_id', CharField())).values('event_key')
+
+
+def season_totals(athlete_ids, season):
+    """{(athlete_id, category_name): {stat_name: value}} from the athletes' game rows"""
+    rows = (
+        GameStatistic.objects.filter(
+            athlete_id__in=athlete_ids,
+            event_id__in=season_event_ids(season),
+            category_name__in=SUMMED,
+        )
+        .values('athlete_id', 'category_name', 'stat_name')
+        .annotate(total=Sum('stat_value'), best=Max('stat_value'))
+        .order_by()
+    )
+    totals = defaultdict(dict)
+    for row in rows:
+        category_name, stat_name = row['category_name'], row['stat_name']
+        if stat_name in SUMMED[category_name]:
+            value = row['total']
+        elif stat_name in LONGEST[category_name]:
+            value = row['best']
+        else:
+            continue
+        if value is not None:
+            totals[(row['athlete_id'], category_name)][stat_name] = float(value)
+    return totals
+
+
+def season_stat_writer(chunk_size=500, season=None):
+    """Batched SeasonStatistic writer keyed on the model's unique_together; unchanged rows are skipped"""
+    queryset = SeasonStatistic.objects.all()
+    if season is not None:
+        queryset = queryset.filter(season_year=season)
+    return ChangeDetectingUpserter(
+        SeasonStatistic,
+        unique_fields=['athlete', 'season_year', 'season_type', 'category_name', 'stat_name'],
+        update_fields=['stat_value', 'stat_display_value', 'last_updated'],
+        chunk_size=chunk_size,
+        queryset=queryset,
+    )
+
+
+def update_season_stats(athlete_ids, season):
+    """Recompute the Regular Season rows of the given athletes. Returns the rows written or removed."""
+    totals = season_totals(athlete_ids, season)
+    now = timezone.now()
+    keys = set()
+    with season_stat_writer(season=season) as writer:
+        for (athlete_id, category_name), stats in totals.items():
+            values = dict(stats)
+            values.update({k: v for k, v in derived_stats(category_name, stats).items() if v is not None})
+            for stat_name, value in values.items():
+                keys.add((athlete_id, category_name, stat_name))
+                writer.add(SeasonStatistic(
+                    athlete_id=athlete_id,
+                    season_year=season,
+                    season_type='Regular Season',
+                    category_name=category_name,
+                    stat_name=stat_name,
+                    stat_value=round(value, 3),
+                    stat_display_value=display_value(value),
+                    last_updated=now,
+                ))
+    # Totals the game rows no longer add up to (a stat dropped from a corrected box score)
+    stored = SeasonStatistic.objects.filter(athlete_id__in=athlete_ids, season_year=season,
+                                            season_type='Regular Season', category_name__in=SUMMED)
+    stale = [pk for pk, *key in stored.values_list('pk', 'athlete_id', 'category_name', 'stat_name')
+             if tuple(key) not in keys and from_box_scores(key[1], key[2])]
+    if stale:
+        SeasonStatistic.objects.filter(pk__in=stale).delete()
+    return writer.written + len(stale)
@@ -0,0 +1,71 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Calendar, Team, Game, Outcome, GameState, Athlete, StatTeam
+from . import payload_cache, season_snapshot
+from utils import calendar_index
+
+
+@receiver([post_save, post_delete], sender=Game)
+def game_changed(sender, instance, **kwargs):
+    payload_cache.invalidate_week(instance.season, instance.week_num)
+    payload_cache.bump_version('games')
+
+
+@receiver([post_save, post_delete], sender=Outcome)
+@receiver([post_save, post_delete], sender=GameState)
+def outcome_changed(sender, instance, **kwargs):
+    try:
+        game = instance.event_id
+    except Game.DoesNotExist:
+        return
+    payload_cache.invalidate_week(game.season, game.week_num)
+    payload_cache.bump_version('games')
+
+
+@receiver([post_save, post_delete], sender=Team)
+@receiver([post_save, post_delete], sender=Calendar)
+def season_changed(sender, instance, **kwargs):
+    payload_cache.invalidate_all()
+
+
+@receiver([post_save, post_delete], sender=Calendar)
+def calendar_changed(sender, instance, **kwargs):
+    calendar_index.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Team)
+@receiver([post_save, post_delete], sender=Calendar)
+@receiver([post_save, post_delete], sender=Game)
+@receiver([post_save, post_delete], sender=StatTeam)
+def snapshot_changed(sender, instance, **kwargs):
+    season_snapshot.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Outcome)
+@receiver([post_save, post_delete], sender=GameState)
+def live_snapshot_changed(sender, instance, **kwargs):
+    # Odds and scores move every minute on game day: only the live part is rebuilt
+    season_snapshot.invalidate_live()
+
+
+@receiver([post_save, post_delete], sender=Athlete)
+@receiver([post_save, post_delete], sender=Team)
+def roster_changed(sender, instance, **kwargs):
+    payload_cache.bump_version('athletes')
+
+
+def bulk_saved(sender, objs):
+    """bulk_create()/bulk_update() don't send post_save: run the receivers once per batch.
+
+    Game, Outcome and GameState rows invalidate per week, so one row per week is
+    enough; every other model's receivers don't look at the instance.
+    """
+    if sender in (Game, Outcome, GameState):
+        def week(obj):
+            game = obj if sender is Game else obj.event_id
+            return game.season, game.week_num
+        objs = list({week(obj): obj for obj in objs}.values())
+    else:
+        objs = objs[:1]
+    for obj in objs:
+        post_save.send(sender=sender, instance=obj, created=False, update_fields=None, raw=False, using='default')
@@ -0,0 +1,123 @@
+"""Write the read-only API responses as JSON files a front server can serve directly.
+
+Each route is written to STATIC_EXPORT_ROOT/<URL path>/index.json with .br/.gz
+variants next to it, e.g. for nginx:
+
+    location /api/ { root <STATIC_EXPORT_ROOT>; gzip_static on; try_files $uri/index.json @django; }
+
+The export root sits outside STATIC_ROOT by default: a frontend build empties
+STATIC_ROOT, and the files here are already compressed.
+
+A manifest keeps each route's ETag and body hash. Routes are requested with
+If-None-Match, so one whose rows haven't changed answers 304 without its
+payload being built, and a file is only rewritten when its bytes differ.
+"""
+import hashlib
+import json
+import logging
+import os
+from django.conf import settings
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from . import season_snapshot
+from .compression import available_encodings, compress
+from .static_files import SUFFIXES
+from utils.bulk import WriteCounts
+import utils.helpers as h
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+
+
+def export_root():
+    return str(getattr(settings, 'STATIC_EXPORT_ROOT', os.path.join(settings.BASE_DIR, 'static_export')))
+
+
+def api_paths(season=None):
+    """URL paths of every exported response, read from the season snapshot"""
+    season = season or h.current_season()
+    snapshot = season_snapshot.get_snapshot()
+    paths = [reverse('games')]
+    paths += [reverse('games_by_week', args=[n]) for n in sorted({w.week_num for w in snapshot.season_weeks(season)})]
+    for team_id in sorted(snapshot.teams):
+        paths.append(reverse('team_schedules', args=[team_id]))
+        paths.append(reverse('team_roster', args=[team_id]))
+    paths += [reverse('matchup', args=[event_id])
+              for event_id, game in sorted(snapshot.games_by_event.items()) if game.season == season]
+    stat_names = {stat['stat_name'] for stats in snapshot.team_stats.values() for stat in stats}
+    paths += [reverse('team_stat_comparison', args=[name]) for name in sorted(filter(None, stat_names))]
+    return paths
+
+
+def file_for(root, path):
+    return os.path.join(root, path.strip('/'), 'index.json')
+
+
+def _write(filename, data):
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    tmp = f'{filename}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, filename)
+
+
+def _remove(filename):
+    for name in (filename, *(filename + suffix for suffix in SUFFIXES.values())):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def load_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def export(root=None, paths=None):
+    """Bring the exported files up to date; returns (WriteCounts of files, files removed)"""
+    root = root or export_root()
+    manifest = load_manifest(root)
+    paths = api_paths() if paths is None else paths
+    factory = RequestFactory()
+    counts = WriteCounts()
+    new_manifest = {}
+
+    for path in paths:
+        entry = manifest.get(path)
+        filename = file_for(root, path)
+        exists = os.path.exists(filename)
+        headers = {'HTTP_IF_NONE_MATCH': entry['etag']} if exists and entry and entry.get('etag') else {}
+        match = resolve(path)
+        response = match.func(factory.get(path, **headers), *match.args, **match.kwargs)
+        if response.status_code == 304:
+            new_manifest[path] = entry
+            counts.skipped += 1
+            continue
+        if response.status_code != 200:
+            logger.warning(f"Not exporting {path}: status {response.status_code}")
+            continue
+
+        body = response.content
+        digest = hashlib.md5(body).hexdigest()
+        new_manifest[path] = {'etag': response.get('ETag'), 'md5': digest}
+        if exists and entry and entry.get('md5') == digest:
+            counts.skipped += 1
+            continue
+        _write(filename, body)
+        for encoding in available_encodings():
+            _write(filename + SUFFIXES[encoding], compress(body, encoding, 'static'))
+        if entry:
+            counts.updated += 1
+        else:
+            counts.created += 1
+
+    removed = 0
+    for path in manifest.keys() - new_manifest.keys():
+        _remove(file_for(root, path))
+        removed += 1
+    _write(os.path.join(root, MANIFEST), json.dumps(new_manifest, indent=1, sort_keys=True).encode())
+    logger.info(f"Static export: {counts}, {removed} removed")
+    return counts, removed
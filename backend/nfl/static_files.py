@@ -0,0 +1,105 @@
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+from .compression import available_encodings, compress, negotiate
+
+# Precompressed variants sit next to the original (written by `manage.py compress_static`)
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+# Vite writes built files to assets/ as <name>-<8 character hash>.<ext>
+# (assets/index-4f1a2b3c.js), so those can be cached forever; a new build gets
+# new names. Files copied from public/ (icons, logos/) keep their names.
+HASHED_ASSET = re.compile(r'(^|/)assets/[^/]+-[0-9A-Za-z_-]{8}\.(js|mjs|css|map|woff2?|ttf|otf|eot|svg|png|jpe?g|gif|webp|avif|ico|wasm)$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def cache_control(path):
+    if HASHED_ASSET.search(path):
+        return IMMUTABLE
+    return f"public, max-age={getattr(settings, 'STATIC_MAX_AGE', 3600)}"
+
+
+def serve_static(request, path):
+    """A file from STATIC_ROOT, precompressed variant if the client accepts one"""
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404(f'{path} not found')
+
+    stat = os.stat(fullpath)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        variants = [e for e in available_encodings() if os.path.isfile(fullpath + SUFFIXES[e])]
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING'), variants)
+        content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+        response = FileResponse(open(fullpath + SUFFIXES.get(encoding, ''), 'rb'), content_type=content_type)
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['Cache-Control'] = cache_control(path)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+class IndexPage:
+    """index.html and its compressed variants, reloaded when the file changes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        mtime = os.stat(self.path).st_mtime
+        if mtime != self.mtime:
+            with self.lock:
+                if mtime != self.mtime:
+                    with open(self.path, 'rb') as f:
+                        body = f.read()
+                    self.bodies = {None: body, **{e: compress(body, e, 'static') for e in available_encodings()}}
+                    self.etag = '"%s"' % hashlib.md5(body).hexdigest()
+                    self.mtime = mtime
+        return self
+
+
+_index_page = None
+
+
+def index_page():
+    global _index_page
+    path = os.path.join(settings.STATIC_ROOT, 'index.html')
+    if _index_page is None or _index_page.path != path:
+        _index_page = IndexPage(path)
+    return _index_page
+
+
+def serve_react_app(request):
+    """Serve the React app's index.html from memory"""
+    try:
+        page = index_page().load()
+    except FileNotFoundError:
+        raise Http404('Frontend not built')
+
+    if page.etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponseNotModified()
+    else:
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING'))
+        response = HttpResponse(page.bodies[encoding], content_type='text/html; charset=utf-8')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = page.etag
+    # Always revalidate so a new build (new asset names) is picked up straight away
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
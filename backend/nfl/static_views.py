@@ -1,7 +1,7 @@
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
 from .models import Team, Game, Calendar
-import json
+import utils.helpers as h
 
 @require_http_methods(["GET"])
 def static_routes(request):
@@ -14,7 +14,7 @@ def static_routes(request):
         routes.append(f'/team/{team.team_id}')
     
     # Add week routes
-    weeks = Calendar.objects.filter(season=2024).values_list('week_num', flat=True).distinct()
+    weeks = Calendar.objects.filter(season=h.current_season()).values_list('week_num', flat=True).distinct()
     for week in weeks:
         routes.append(f'/games/{week}')
     
@@ -24,12 +24,17 @@ def static_routes(request):
 def prerender_data(request):
     """Get all data needed for static generation"""
     teams = list(Team.objects.values())
-    games = list(Game.objects.select_related('home_team', 'away_team').values(
+    season = h.current_season()
+    games = list(Game.objects.filter(season=season).values(
         'event_id', 'week_num', 'game_datetime',
-        'home_team__team_id', 'home_team__short_name', 'home_team__logo',
-        'away_team__team_id', 'away_team__short_name', 'away_team__logo'
+        'home_team__team_id', 'home_team__short_name',
+        'away_team__team_id', 'away_team__short_name',
     ))
-    weeks = list(Calendar.objects.filter(season=2024).values())
+    # Logos aren't stored on Team; they come from the static logo map
+    for game in games:
+        game['home_team__logo'] = h.get_team_logo(game['home_team__team_id'])
+        game['away_team__logo'] = h.get_team_logo(game['away_team__team_id'])
+    weeks = list(Calendar.objects.filter(season=season).values())
     
     return JsonResponse({
         'teams': teams,
@@ -0,0 +1,104 @@
+import logging
+import math
+import struct
+import threading
+from bisect import bisect_left
+from django.utils import timezone
+from .models import TeamStatKey, TeamStatSnapshot
+
+logger = logging.getLogger(__name__)
+
+# A snapshot packs a team's stats as a count followed by three little-endian
+# columns: sorted uint16 key ids, float32 values (NaN for missing) and int16
+# ranks (-1 for missing). That's 8 bytes a stat against a full StatTeam row.
+NO_RANK = -1
+
+_keys = {}  # (category, stat_name) -> id; keys are never renumbered, so this only grows
+_keys_lock = threading.Lock()
+
+
+def key_ids(pairs):
+    """Ids for (category, stat_name) pairs, creating keys seen for the first time"""
+    pairs = set(pairs)
+    if not pairs <= _keys.keys():
+        with _keys_lock:
+            missing = pairs - _keys.keys()
+            TeamStatKey.objects.bulk_create(
+                [TeamStatKey(category=c, stat_name=n) for c, n in missing], ignore_conflicts=True
+            )
+            for key_id, category, stat_name in TeamStatKey.objects.values_list('id', 'category', 'stat_name'):
+                _keys[(category, stat_name)] = key_id
+    return {pair: _keys[pair] for pair in pairs}
+
+
+def ids_for_stat(stat_name, category=None):
+    """Key ids for a stat name (every category it appears in, lowest id first)"""
+    keys = TeamStatKey.objects.filter(stat_name=stat_name)
+    if category:
+        keys = keys.filter(category=category)
+    return list(keys.order_by('id').values_list('id', flat=True))
+
+
+def pack(stats):
+    """Pack {key_id: (value, rank)} into bytes"""
+    ids = sorted(stats)
+    values = [math.nan if stats[i][0] is None else stats[i][0] for i in ids]
+    ranks = [NO_RANK if stats[i][1] is None else stats[i][1] for i in ids]
+    n = len(ids)
+    return struct.pack(f'<H{n}H{n}f{n}h', n, *ids, *values, *ranks)
+
+
+def lookup(blob, key_id):
+    """(value, rank) for key_id in a packed snapshot, or None"""
+    blob = bytes(blob)
+    n, = struct.unpack_from('<H', blob)
+    ids = struct.unpack_from(f'<{n}H', blob, 2)
+    i = bisect_left(ids, key_id)
+    if i == n or ids[i] != key_id:
+        return None
+    value, = struct.unpack_from('<f', blob, 2 + 2 * n + 4 * i)
+    rank, = struct.unpack_from('<h', blob, 2 + 6 * n + 2 * i)
+    # float32 keeps about 7 significant digits; round off the binary noise
+    return (None if math.isnan(value) else float(f'{value:.7g}'), None if rank == NO_RANK else rank)
+
+
+def unpack(blob):
+    """{key_id: (value, rank)} for a packed snapshot"""
+    blob = bytes(blob)
+    n, = struct.unpack_from('<H', blob)
+    return {key_id: lookup(blob, key_id) for key_id in struct.unpack_from(f'<{n}H', blob, 2)}
+
+
+def record_snapshot(team, week, rows):
+    """Store rows of (category, stat_name, value, rank) as team's snapshot for a Calendar week.
+
+    Written again through the week so it ends up holding the week's last values;
+    nothing is written when the packed stats haven't changed.
+    """
+    ids = key_ids((category, stat_name) for category, stat_name, _, _ in rows)
+    blob = pack({ids[(category, stat_name)]: (value, rank) for category, stat_name, value, rank in rows})
+    lookup_fields = {'team': team, 'season': week.season, 'season_type_id': week.season_type_id,
+                     'week_num': week.week_num}
+    existing = TeamStatSnapshot.objects.filter(**lookup_fields).values_list('stats', flat=True).first()
+    if existing is not None and bytes(existing) == blob:
+        return False
+    TeamStatSnapshot.objects.update_or_create(**lookup_fields, defaults={'stats': blob, 'recorded_at': timezone.now()})
+    logger.debug(f"Stored {len(rows)} stats ({len(blob)} bytes) for {team} week {week.week_num}")
+    return True
+
+
+def series(snapshots, key_ids):
+    """{team_id: [{season_type_id, week_num, value, rank}]} for the first of key_ids each snapshot has"""
+    teams = {}
+    rows = snapshots.order_by('team_id', 'season_type_id', 'week_num').values_list(
+        'team_id', 'season_type_id', 'week_num', 'stats'
+    )
+    for team_id, season_type_id, week_num, blob in rows:
+        found = next(filter(None, (lookup(blob, key_id) for key_id in key_ids)), None)
+        if found is None:
+            continue
+        value, rank = found
+        teams.setdefault(team_id, []).append(
+            {'season_type_id': season_type_id, 'week_num': week_num, 'value': value, 'rank': rank}
+        )
+    return teams
@@ -7,8 +7,13 @@ urlpatterns = [
     path('games/<int:week_num>/', views.games, name='games_by_week'),  # Games for specific week
     path('team-schedule/<int:team_id>/', views.team_schedules, name='team_schedules'),  # Team schedule
     path('matchup/<int:event_id>/', views.matchup, name='matchup'),  # Game matchup details
+    path('live/', views.live_scores, name='live_scores'),  # Live score/status stream (SSE)
     path('teams/<int:team_id>/roster/', views.team_roster, name='team_roster'),  # Team roster
     path('teams/<int:team_id>/stats/', views.team_stats, name='team_stats'),  # Team statistics
+    path('teams/<int:team_id>/stats/<str:stat_name>/trend/', views.team_stat_trend, name='team_stat_trend'),  # One stat by week for a team
     path('team-stat/<str:stat_name>/', views.team_stat_comparison, name='team_stat_comparison'),  # Team stat comparison
+    path('team-stat/<str:stat_name>/trend/', views.team_stat_trend, name='team_stat_trends'),  # One stat by week for every team
     path('position/<str:position>/stats/', views.position_stats, name='position_stats'),  # Position stats
+    path('odds-history/<int:event_id>/', views.game_odds_history, name='game_odds_history'),  # Line movement for a game
+    path('odds-history/week/<int:week_num>/', views.week_odds_history, name='week_odds_history'),  # Line movement for a week
 ]
@@ -0,0 +1,114 @@
+import hashlib
+import logging
+from functools import wraps
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from .models import Game, OddsSnapshot, StatTeam, TeamStatSnapshot
+from . import payload_cache, leaderboards, season_snapshot
+import utils.get_data as get_data
+
+logger = logging.getLogger(__name__)
+
+# Each ETag function is computed before the view runs, from timestamps, counts and
+# the generation counters in nfl.payload_cache, so a matching If-None-Match gets
+# a 304 without the payload being built.
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def http_cached(etag_func):
+    """Answer conditional GETs from etag_func and mark successful responses cacheable"""
+    def safe_etag(request, *args, **kwargs):
+        try:
+            return etag_func(request, *args, **kwargs)
+        except Exception as e:
+            # No validator just means the view builds the response as usual
+            logger.warning(f"Could not compute ETag for {request.path}: {e}")
+            return None
+
+    def decorator(view):
+        conditional_view = condition(etag_func=safe_etag)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                patch_cache_control(response, public=True, max_age=getattr(settings, 'API_CACHE_MAX_AGE', 60))
+            elif response.has_header('ETag'):
+                del response['ETag']
+            return response
+        return wrapper
+    return decorator
+
+
+def games_etag(request, week_num=None):
+    # None when the payload isn't cached; the view sets the ETag once it's built
+    return payload_cache.get_games_etag(get_data.CURRENT_YEAR, week_num)
+
+
+def team_schedule_etag(request, team_id):
+    # Odds change on their own generation: only this team's games' outcomes go in
+    snapshot = season_snapshot.get_snapshot()
+    outcomes = [game.outcome for game in snapshot.team_games(team_id)]
+    return make_etag('schedule', team_id, snapshot.generation, outcomes)
+
+
+def matchup_etag(request, event_id):
+    snapshot = season_snapshot.get_snapshot()
+    game = snapshot.games_by_event.get(event_id)
+    if game is None:
+        return None
+    return make_etag('matchup', event_id, snapshot.generation, game.outcome, game.state)
+
+
+def team_roster_etag(request, team_id):
+    return make_etag('roster', team_id, payload_cache.get_version('athletes'))
+
+
+def team_stats_etag(request, team_id):
+    stats = StatTeam.objects.filter(team_id=team_id).aggregate(last_updated=Max('last_updated'), rows=Count('id'))
+    return make_etag('team_stats', team_id, payload_cache.global_version(), *stats.values())
+
+
+def team_stat_comparison_etag(request, stat_name):
+    stats = StatTeam.objects.filter(stat_name=stat_name).aggregate(last_updated=Max('last_updated'), rows=Count('id'))
+    return make_etag('comparison', stat_name, payload_cache.global_version(), *stats.values())
+
+
+def team_stat_trend_etag(request, stat_name, team_id=None):
+    season = leaderboards.parse_season(request.GET.get('season'))
+    if season is None:
+        return None
+    snapshots = TeamStatSnapshot.objects.filter(season=season)
+    if team_id is not None:
+        snapshots = snapshots.filter(team_id=team_id)
+    stamps = snapshots.aggregate(last=Max('recorded_at'), rows=Count('id'))
+    return make_etag('trend', stat_name, request.GET.get('category'), season, team_id, *stamps.values())
+
+
+def position_stats_etag(request, position):
+    season = leaderboards.parse_season(request.GET.get('season'))
+    if season is None:
+        return None
+    # The view reuses it instead of running the aggregate again
+    request.leaderboard_validator = leaderboards.store_validator(season)
+    return make_etag('position', position, season, *request.leaderboard_validator)
+
+
+def game_odds_history_etag(request, event_id):
+    history = OddsSnapshot.objects.filter(game_id=event_id).aggregate(last=Max('recorded_at'), rows=Count('id'))
+    return make_etag('odds', event_id, *history.values())
+
+
+def week_odds_history_etag(request, week_num):
+    season = leaderboards.parse_season(request.GET.get('season'))
+    if season is None:
+        return None
+    history = OddsSnapshot.objects.filter(game__season=season, game__week_num=week_num).aggregate(
+        last=Max('recorded_at'), rows=Count('id')
+    )
+    return make_etag('odds_week', season, week_num, *history.values())
@@ -1,15 +1,18 @@
-import requests
 from django.shortcuts import render
-from django.http import HttpResponse, JsonResponse
-from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, HttpResponseNotAllowed
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.db import models
-from .models import Calendar, Team, Game, Athlete, Outcome, StatTeam, Calendar, SeasonStatistic
+from django.db.models import FilteredRelation
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.handlers.wsgi import WSGIRequest
+from .models import Calendar, Team, Game, Athlete, Outcome, OddsSnapshot, StatTeam, Calendar, SeasonStatistic, TeamStatSnapshot
+from . import payload_cache, leaderboards, live, validators, odds_history, team_trends, season_snapshot
+from .validators import http_cached
 import json
 import utils.get_data as get_data
 import utils.helpers as h
-import utils.test as t
+import utils.espn_client as espn_client
 from datetime import timedelta, datetime
 import time
 import logging
@@ -66,6 +69,28 @@ def api_root(request):
                 'description': 'Get team season statistics',
                 'parameters': {'team_id': 'Integer (1-32)'},
                 'response': 'Team performance statistics'
+            },
+            'team_stat_trend': {
+                'url': '/teams/<team_id>/stats/<stat_name>/trend/ or /team-stat/<stat_name>/trend/',
+                'method': 'GET',
+                'description': 'Get one stat week by week for a team or for every team',
+                'parameters': {'stat_name': 'ESPN stat name', 'season': 'Optional query parameter',
+                               'category': 'Optional query parameter for names used in several categories'},
+                'response': 'Value and rank per week, keyed by team_id'
+            },
+            'game_odds_history': {
+                'url': '/odds-history/<event_id>/',
+                'method': 'GET',
+                'description': 'Get spread and win probability movement for a game',
+                'parameters': {'event_id': 'Integer (ESPN event ID)'},
+                'response': 'Snapshots in time order, one per change'
+            },
+            'week_odds_history': {
+                'url': '/odds-history/week/<week_num>/',
+                'method': 'GET',
+                'description': 'Get spread and win probability movement for every game in a week',
+                'parameters': {'week_num': 'Integer', 'season': 'Optional query parameter (defaults to current season)'},
+                'response': 'Snapshots per game, keyed by event_id'
             }
         },
         'admin': '/admin/',
@@ -104,33 +129,79 @@ def safe_get_outcome_data(game, field, default='N/A'):
         return default
 
 
+def serialize_week(week):
+    return {
+        'name': week.name,
+        'details': week.details,
+        'week_num': week.week_num,
+        'season': week.season,
+        'season_type_id': week.season_type_id,
+        'season_type_name': week.season_type_name,
+        'start_date': week.start_date,
+        'end_date': week.end_date
+    }
+
+
+def serialize_game(game):
+    """Game fields shared by the games and matchup payloads"""
+    last_updated = safe_get_outcome_data(game, 'last_updated', None)
+    state = getattr(game, 'state', None)
+    return {
+        'event_id': game.event_id,
+        'short_name': game.short_name,
+        'game_datetime': format_game_time(game.game_datetime),
+        'season': game.season,
+        'week_num': game.week_num,
+        'home_team': game.home_team.team_name if game.home_team else 'TBD',
+        'home_team_id': game.home_team.team_id if game.home_team else None,
+        'home_team_record': game.home_team.record if game.home_team else '0-0',
+        'away_team': game.away_team.team_name if game.away_team else 'TBD',
+        'away_team_id': game.away_team.team_id if game.away_team else None,
+        'away_team_record': game.away_team.record if game.away_team else '0-0',
+        'home_team_logo': h.get_team_logo(game.home_team.team_id) if game.home_team else 'default-logo.png',
+        'away_team_logo': h.get_team_logo(game.away_team.team_id) if game.away_team else 'default-logo.png',
+        'odds': safe_get_outcome_data(game, 'spread_display'),
+        'home_win_prob': safe_get_outcome_data(game, 'home_win_prob'),
+        'away_win_prob': safe_get_outcome_data(game, 'away_win_prob'),
+        'pred_diff': safe_get_outcome_data(game, 'pred_diff'),
+        'odds_last_updated': format_game_time(last_updated) if last_updated else 'N/A',
+        'home_score': state.home_score if state else None,
+        'away_score': state.away_score if state else None,
+        'status': state.status_detail if state else None,
+    }
+
+
 @require_http_methods(["GET"])
+@http_cached(validators.games_etag)
 def games(request, week_num=None):
-    """Get games data with improved error handling and week filtering"""
+    """Get games data with improved error handling and week filtering.
+
+    The payload for each week is built once and served from the cache as
+    pre-serialized JSON until a Game, Outcome, Team or Calendar row it depends
+    on changes (see nfl.signals). Misses are built from nfl.season_snapshot.
+    """
     try:
+        season = get_data.CURRENT_YEAR
+        body = payload_cache.get_games_payload(season, week_num)
+        if body is not None:
+            return HttpResponse(body, content_type='application/json')
+
+        # Read the global version before building so a concurrent change invalidates this payload
+        global_version = payload_cache.global_version()
+
+        snapshot = season_snapshot.get_snapshot()
+
         # Get all weeks for the current season
-        unique_weeks = Calendar.objects.filter(season=get_data.CURRENT_YEAR).order_by('end_date')
-        unique_weeks_data = [{
-            'name': week.name,
-            'details': week.details,
-            'week_num': week.week_num,
-            'season': week.season,
-            'season_type_id': week.season_type_id,
-            'season_type_name': week.season_type_name,
-            'start_date': week.start_date,
-            'end_date': week.end_date
-        } for week in unique_weeks]
+        unique_weeks = snapshot.season_weeks(season)
+        unique_weeks_data = [serialize_week(week) for week in unique_weeks]
 
         # Determine which week to show
         if week_num:
             try:
-                week = Calendar.objects.filter(
-                    season=get_data.CURRENT_YEAR, 
-                    week_num=week_num
-                ).first()
+                week = snapshot.week(season, week_num)
                 if not week:
                     return JsonResponse({
-                        'error': f'Week {week_num} not found for season {get_data.CURRENT_YEAR}',
+                        'error': f'Week {week_num} not found for season {season}',
                         'available_weeks': [w['week_num'] for w in unique_weeks_data]
                     }, status=404)
             except Exception as e:
@@ -141,63 +212,40 @@ def games(request, week_num=None):
             try:
                 week = h.current_week()
                 if not week:
-                    week = unique_weeks.first() if unique_weeks else None
+                    week = unique_weeks[0] if unique_weeks else None
             except Exception as e:
                 logger.warning(f"Error getting current week: {e}")
-                week = unique_weeks.first() if unique_weeks else None
+                week = unique_weeks[0] if unique_weeks else None
                 
             if not week:
                 return JsonResponse({'error': 'No calendar data available'}, status=404)
 
+        week_version = payload_cache.week_version(season, week.week_num)
+        # Odds and scores change without moving the global version: take the
+        # snapshot again so it is at least as new as week_version
+        snapshot = season_snapshot.get_snapshot()
+
         # Get games for the selected week
-        games_queryset = Game.objects.filter(week=week).select_related('home_team', 'away_team', 'outcome').order_by('game_datetime')
-        
         games_list = []
-        for game in games_queryset:
+        for game in snapshot.week_games(week.id):
             try:
-                game_data = {
-                    'event_id': game.event_id,
-                    'short_name': game.short_name,
-                    'game_datetime': format_game_time(game.game_datetime),
-                    'season': game.season,
-                    'week_num': game.week_num,
-                    'home_team': game.home_team.team_name if game.home_team else 'TBD',
-                    'home_team_id': game.home_team.team_id if game.home_team else None,
-                    'home_team_record': game.home_team.record if game.home_team else '0-0',
-                    'away_team': game.away_team.team_name if game.away_team else 'TBD',
-                    'away_team_id': game.away_team.team_id if game.away_team else None,
-                    'away_team_record': game.away_team.record if game.away_team else '0-0',
-                    'home_team_logo': h.get_team_logo(game.home_team.team_id) if game.home_team else 'default-logo.png',
-                    'away_team_logo': h.get_team_logo(game.away_team.team_id) if game.away_team else 'default-logo.png',
-                    'odds': safe_get_outcome_data(game, 'spread_display'),
-                    'home_win_prob': safe_get_outcome_data(game, 'home_win_prob'),
-                    'away_win_prob': safe_get_outcome_data(game, 'away_win_prob'),
-                    'pred_diff': safe_get_outcome_data(game, 'pred_diff'),
-                    'odds_last_updated': format_game_time(safe_get_outcome_data(game, 'last_updated', None)) if safe_get_outcome_data(game, 'last_updated', None) else 'N/A',
-                }
-                games_list.append(game_data)
+                games_list.append(serialize_game(game))
             except Exception as e:
                 logger.error(f"Error processing game {game.event_id}: {e}")
                 continue
 
-        current_week_data = {
-            'name': week.name,
-            'details': week.details,
-            'week_num': week.week_num,
-            'season': week.season,
-            'season_type_id': week.season_type_id,
-            'season_type_name': week.season_type_name,
-            'start_date': week.start_date,
-            'end_date': week.end_date
-        }
-
-        return JsonResponse({
+        body = json.dumps({
             'games': games_list,
             'weeks': unique_weeks_data,
-            'current_week': current_week_data,
+            'current_week': serialize_week(week),
             'total_games': len(games_list),
             'week_requested': week_num
-        })
+        }, cls=DjangoJSONEncoder).encode()
+        payload_cache.set_games_payload(season, week_num, week.week_num, (global_version, week_version), body)
+
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = payload_cache.games_etag(global_version, week.week_num, week_version)
+        return response
 
     except Exception as e:
         logger.error(f"Error in games view: {e}")
@@ -207,6 +255,30 @@ def games(request, week_num=None):
         }, status=500)
 
 
+async def live_scores(request):
+    """Server-Sent Events stream of live score and status changes.
+
+    Clients get a snapshot of current game states, then one event per change.
+    The stream is held open under an ASGI server (sports.asgi, how the app is
+    deployed). A WSGI worker can't wait on it, so there the response ends after
+    catching the client up and EventSource reconnects a few seconds later.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        last_event_id = int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        last_event_id = None
+    if isinstance(request, WSGIRequest):
+        stream = live.reconnecting_stream(last_event_id)
+    else:
+        stream = live.event_stream(last_event_id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 def teams(team_id):
     team = Team.objects.get(pk=team_id)
     players = Athlete.objects.filter(team_id=team_id, status='Active').order_by('position')
@@ -225,7 +297,7 @@ def teams(team_id):
 def update_athlete_status(athlete_id):
     athlete = Athlete.objects.get(pk=athlete_id)
     url = h.get_espn_api_url(f'athletes/{athlete.athlete_id}')
-    data = requests.get(url).json()
+    data = espn_client.get_json(url)
     data = data['athlete']
     status_id = data['status']['id']
     status = data['status']['name']
@@ -242,25 +314,21 @@ def update_athlete_status(athlete_id):
 
 
 @require_http_methods(["GET"])
+@http_cached(validators.team_schedule_etag)
 def team_schedules(request, team_id):
     """Get team schedule with enhanced error handling and data validation"""
     try:
+        snapshot = season_snapshot.get_snapshot()
         # Validate team exists
-        try:
-            team = Team.objects.get(pk=team_id)
-        except Team.DoesNotExist:
+        team = snapshot.teams.get(team_id)
+        if team is None:
             return JsonResponse({
                 'error': f'Team with ID {team_id} not found',
                 'message': 'Please provide a valid team ID (1-32)'
             }, status=404)
     
         schedule = []
-        # Use Q objects for proper OR query
-        games = Game.objects.filter(
-            models.Q(home_team_id=team_id) | models.Q(away_team_id=team_id)
-        ).select_related('home_team', 'away_team', 'outcome').order_by('game_datetime')
-        
-        for game in games:
+        for game in snapshot.team_games(team_id):
             try:
                 is_home = int(team_id) == int(game.home_team_id)
                 opponent = game.away_team if is_home else game.home_team
@@ -303,56 +371,25 @@ def team_schedules(request, team_id):
 
 
 @require_http_methods(["GET"])
+@http_cached(validators.matchup_etag)
 def matchup(request, event_id):
     """Get detailed matchup information with improved error handling"""
     try:
-        # Try to get the game by event_id
-        try:
-            game = Game.objects.select_related('home_team', 'away_team', 'outcome').get(event_id=event_id)
-        except Game.DoesNotExist:
+        snapshot = season_snapshot.get_snapshot()
+        game = snapshot.games_by_event.get(event_id)
+        if game is None:
             return JsonResponse({
                 'error': f'Game with event_id {event_id} not found',
                 'message': 'Please check the event_id and try again'
             }, status=404)
 
         # Get team statistics
-        home_stats = []
-        away_stats = []
-        
-        try:
-            if game.home_team:
-                home_stats = StatTeam.objects.filter(team_id=game.home_team.team_id)
-                home_stats = [model_to_dict(stat) for stat in home_stats]
-        except Exception as e:
-            logger.warning(f"Error fetching home team stats: {e}")
-
-        try:
-            if game.away_team:
-                away_stats = StatTeam.objects.filter(team_id=game.away_team.team_id)
-                away_stats = [model_to_dict(stat) for stat in away_stats]
-        except Exception as e:
-            logger.warning(f"Error fetching away team stats: {e}")
+        home_stats = snapshot.stats_for(game.home_team_id)
+        away_stats = snapshot.stats_for(game.away_team_id)
 
         # Build matchup data
         matchup_data = {
-            'event_id': game.event_id,
-            'short_name': game.short_name,
-            'game_datetime': format_game_time(game.game_datetime),
-            'season': game.season,
-            'week_num': game.week_num,
-            'home_team': game.home_team.team_name if game.home_team else 'TBD',
-            'home_team_id': game.home_team.team_id if game.home_team else None,
-            'home_team_record': game.home_team.record if game.home_team else '0-0',
-            'away_team': game.away_team.team_name if game.away_team else 'TBD',
-            'away_team_id': game.away_team.team_id if game.away_team else None,
-            'away_team_record': game.away_team.record if game.away_team else '0-0',
-            'home_team_logo': h.get_team_logo(game.home_team.team_id) if game.home_team else 'default-logo.png',
-            'away_team_logo': h.get_team_logo(game.away_team.team_id) if game.away_team else 'default-logo.png',
-            'odds': safe_get_outcome_data(game, 'spread_display'),
-            'home_win_prob': safe_get_outcome_data(game, 'home_win_prob'),
-            'away_win_prob': safe_get_outcome_data(game, 'away_win_prob'),
-            'pred_diff': safe_get_outcome_data(game, 'pred_diff'),
-            'odds_last_updated': format_game_time(safe_get_outcome_data(game, 'last_updated', None)) if safe_get_outcome_data(game, 'last_updated', None) else 'N/A',
+            **serialize_game(game),
             'home_stats': home_stats,
             'away_stats': away_stats,
             'has_stats': len(home_stats) > 0 or len(away_stats) > 0
@@ -370,6 +407,7 @@ def matchup(request, event_id):
 
 
 @require_http_methods(["GET"])
+@http_cached(validators.team_roster_etag)
 def team_roster(request, team_id):
     """Get roster data for a specific team with enhanced error handling"""
     try:
@@ -506,6 +544,7 @@ def order_stats_by_priority(stats_queryset):
 
 
 @require_http_methods(["GET"])
+@http_cached(validators.team_stats_etag)
 def team_stats(request, team_id):
     """Get season stats for a specific team with prioritized ordering"""
     try:
@@ -609,49 +648,90 @@ def team_stats(request, team_id):
 
 
 @require_http_methods(["GET"])
+@http_cached(validators.team_stat_trend_etag)
+def team_stat_trend(request, stat_name, team_id=None):
+    """Week-by-week value and rank of one stat for a team, or for every team"""
+    try:
+        season = leaderboards.parse_season(request.GET.get('season'))
+        if season is None:
+            return JsonResponse({'error': f"Invalid season: {request.GET.get('season')}"}, status=400)
+        key_ids = team_trends.ids_for_stat(stat_name, request.GET.get('category'))
+        if not key_ids:
+            return JsonResponse({'error': f'Stat {stat_name} not found'}, status=404)
+
+        snapshots = TeamStatSnapshot.objects.filter(season=season)
+        if team_id is not None:
+            snapshots = snapshots.filter(team_id=team_id)
+        teams = team_trends.series(snapshots, key_ids)
+
+        # Keyed by team_id either way, so one team is just a single-entry response
+        return JsonResponse({
+            'stat_name': stat_name,
+            'season': season,
+            'teams': teams,
+        })
+
+    except Exception as e:
+        logger.error(f"Error in team_stat_trend view for stat {stat_name}: {e}")
+        return JsonResponse({
+            'error': 'Internal server error while fetching team stat trend',
+            'message': str(e),
+            'stat_name': stat_name
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+@http_cached(validators.team_stat_comparison_etag)
 def team_stat_comparison(request, stat_name):
     """Get all 32 teams ranked by a specific stat"""
     try:
-        # Get all teams
-        all_teams = Team.objects.all().order_by('team_id')
-        
-        # Get the stat for all teams
+        # Every team with its row for this stat (if any) in one LEFT JOIN
+        rows = Team.objects.annotate(
+            stat=FilteredRelation('statteam', condition=models.Q(statteam__stat_name=stat_name))
+        ).values(
+            'team_id', 'team_name', 'short_name',
+            'stat__id', 'stat__value', 'stat__rank', 'stat__display_rank', 'stat__description', 'stat__category'
+        ).order_by('team_id', 'stat__id')
+
         team_stats = []
-        for team in all_teams:
+        seen = set()
+        for row in rows:
+            team_id = row['team_id']
+            # A stat name can appear in more than one category; keep the first row like .first() did
+            if team_id in seen:
+                continue
+            seen.add(team_id)
             try:
-                # Try to get real stat from database
-                stat_obj = StatTeam.objects.filter(team_id=team.team_id, stat_name=stat_name).first()
-                
-                if stat_obj:
+                if row['stat__id'] is not None:
                     team_stats.append({
-                        'team_id': team.team_id,
-                        'team_name': team.team_name,
-                        'short_name': team.short_name,
-                        'value': stat_obj.value,
-                        'rank': stat_obj.rank,
-                        'display_rank': stat_obj.display_rank,
-                        'description': stat_obj.description,
-                        'category': stat_obj.category
+                        'team_id': team_id,
+                        'team_name': row['team_name'],
+                        'short_name': row['short_name'],
+                        'value': row['stat__value'],
+                        'rank': row['stat__rank'],
+                        'display_rank': row['stat__display_rank'],
+                        'description': row['stat__description'],
+                        'category': row['stat__category']
                     })
                 else:
                     # Fallback to mock data if stat not found
                     import random
-                    random.seed(team.team_id + hash(stat_name))
+                    random.seed(team_id + hash(stat_name))
                     mock_value = round(random.uniform(10, 100), 1)
                     mock_rank = random.randint(1, 32)
                     
                     team_stats.append({
-                        'team_id': team.team_id,
-                        'team_name': team.team_name,
-                        'short_name': team.short_name,
+                        'team_id': team_id,
+                        'team_name': row['team_name'],
+                        'short_name': row['short_name'],
                         'value': mock_value,
                         'rank': mock_rank,
                         'display_rank': str(mock_rank),
-                        'description': f"{stat_name} for {team.team_name}",
+                        'description': f"{stat_name} for {row['team_name']}",
                         'category': 'General'
                     })
             except Exception as e:
-                logger.warning(f"Error getting stat {stat_name} for team {team.team_id}: {e}")
+                logger.warning(f"Error getting stat {stat_name} for team {team_id}: {e}")
                 continue
         
         # Sort by rank (ascending - lower rank is better)
@@ -677,171 +757,23 @@ def team_stat_comparison(request, stat_name):
 
 
 @require_http_methods(["GET"])
+@http_cached(validators.position_stats_etag)
 def position_stats(request, position):
     """Get stats for all players of a specific position with ranking"""
     try:
-        season = request.GET.get('season', get_data.CURRENT_YEAR if hasattr(get_data, 'CURRENT_YEAR') else 2024)
-        
-        # Position mapping and key stats (based on ESPN API order and NFL standards)
-        position_mappings = {
-            'quarterback': {
-                'key_stats': ['yards', 'touchdowns', 'completion_pct', 'rating', 'interceptions'],
-                'stat_aliases': {
-                    'stat_2': 'yards', 'stat_5': 'touchdowns', 'stat_3': 'completion_pct', 
-                    'stat_9': 'rating', 'stat_6': 'interceptions'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('yards', 0)) * 0.3 +
-                    float(stats.get('touchdowns', 0)) * 100 +
-                    float(stats.get('completion_pct', 0)) * 10 -
-                    float(stats.get('interceptions', 0)) * 50 +
-                    float(stats.get('rating', 0)) * 2
-                )
-            },
-            'running back': {
-                'key_stats': ['rush_attempts', 'rush_yards', 'rush_avg', 'rush_tds', 'receptions'],
-                'stat_aliases': {
-                    'stat_0': 'rush_attempts', 'stat_1': 'rush_yards', 'stat_2': 'rush_avg', 
-                    'stat_3': 'rush_tds', 'stat_5': 'receptions'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('rush_yards', 0)) * 0.4 +
-                    float(stats.get('rush_tds', 0)) * 60 +
-                    float(stats.get('rush_avg', 0)) * 50 +
-                    float(stats.get('receptions', 0)) * 8
-                )
-            },
-            'wide receiver': {
-                'key_stats': ['receptions', 'targets', 'rec_yards', 'rec_avg', 'rec_tds'],
-                'stat_aliases': {
-                    'stat_0': 'receptions', 'stat_1': 'targets', 'stat_2': 'rec_yards', 
-                    'stat_4': 'rec_avg', 'stat_5': 'rec_tds'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('receptions', 0)) * 4 +
-                    float(stats.get('rec_yards', 0)) * 0.5 +
-                    float(stats.get('rec_tds', 0)) * 60 +
-                    float(stats.get('rec_avg', 0)) * 8
-                )
-            },
-            'tight end': {
-                'key_stats': ['receptions', 'targets', 'rec_yards', 'rec_avg', 'rec_tds'],
-                'stat_aliases': {
-                    'stat_0': 'receptions', 'stat_1': 'targets', 'stat_2': 'rec_yards', 
-                    'stat_3': 'rec_avg', 'stat_4': 'rec_tds'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('receptions', 0)) * 4 +
-                    float(stats.get('rec_yards', 0)) * 0.5 +
-                    float(stats.get('rec_tds', 0)) * 60
-                )
-            },
-            'defensive line': {
-                'key_stats': ['tackles', 'solo_tackles', 'assists', 'sacks', 'tfl'],
-                'stat_aliases': {
-                    'stat_2': 'tackles', 'stat_1': 'solo_tackles', 'stat_0': 'assists', 
-                    'stat_3': 'sacks', 'stat_4': 'tfl'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('tackles', 0)) * 2 +
-                    float(stats.get('sacks', 0)) * 20 +
-                    float(stats.get('tfl', 0)) * 10
-                )
-            },
-            'linebacker': {
-                'key_stats': ['tackles', 'solo_tackles', 'assists', 'sacks', 'tfl'],
-                'stat_aliases': {
-                    'stat_2': 'tackles', 'stat_1': 'solo_tackles', 'stat_0': 'assists', 
-                    'stat_4': 'sacks', 'stat_5': 'tfl'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('tackles', 0)) * 2 +
-                    float(stats.get('sacks', 0)) * 15 +
-                    float(stats.get('solo_tackles', 0)) * 1.5
-                )
-            },
-            'defensive back': {
-                'key_stats': ['tackles', 'solo_tackles', 'assists', 'interceptions', 'pass_def'],
-                'stat_aliases': {
-                    'stat_2': 'tackles', 'stat_1': 'solo_tackles', 'stat_0': 'assists', 
-                    'stat_6': 'interceptions', 'stat_7': 'pass_def'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('tackles', 0)) * 1.5 +
-                    float(stats.get('interceptions', 0)) * 40 +
-                    float(stats.get('pass_def', 0)) * 5
-                )
-            },
-            'kicker': {
-                'key_stats': ['fg_made', 'fg_att', 'fg_pct', 'xp_made', 'points'],
-                'stat_aliases': {
-                    'stat_0': 'fg_made', 'stat_1': 'fg_att', 
-                    'stat_2': 'fg_pct', 'stat_3': 'xp_made', 'stat_6': 'points'
-                },
-                'ranking_formula': lambda stats: (
-                    float(stats.get('fg_made', 0)) * 3 +
-                    float(stats.get('fg_pct', 0)) * 2 +
-                    float(stats.get('points', 0)) * 1
-                )
-            }
-        }
+        season = leaderboards.parse_season(request.GET.get('season'))
+        if season is None:
+            return JsonResponse({'error': f"Invalid season: {request.GET.get('season')}"}, status=400)
         
         position_lower = position.lower().replace('_', ' ')
-        position_config = position_mappings.get(position_lower)
+        position_config = leaderboards.POSITION_MAPPINGS.get(position_lower)
         
         if not position_config:
             return JsonResponse({'error': f'Position {position} not supported'}, status=400)
         
-        # Get all athletes for this position
-        athletes = Athlete.objects.filter(
-            position__icontains=position_lower.split()[0]
-        ).select_related('team')
-        
-        players_data = []
-        
-        for athlete in athletes:
-            # Get season stats for this athlete
-            stats = SeasonStatistic.objects.filter(
-                athlete=athlete,
-                season_year=season,
-                season_type='Regular Season'
-            )
-            
-            # Organize stats by name
-            player_stats = {}
-            for stat in stats:
-                player_stats[stat.stat_name] = stat.stat_value or 0
-            
-            # Map generic stat names to meaningful names using aliases
-            mapped_stats = {}
-            stat_aliases = position_config.get('stat_aliases', {})
-            for generic_name, value in player_stats.items():
-                meaningful_name = stat_aliases.get(generic_name, generic_name)
-                mapped_stats[meaningful_name] = value
-            
-            # Only include players with some stats
-            if player_stats:
-                # Calculate ranking score using mapped stats
-                ranking_score = position_config['ranking_formula'](mapped_stats)
-                
-                player_data = {
-                    'athlete_id': athlete.athlete_id,
-                    'name': athlete.display_name or f"{athlete.first_name} {athlete.last_name}",
-                    'team': athlete.team.short_name if athlete.team else 'FA',
-                    'team_id': athlete.team.team_id if athlete.team else None,
-                    'jersey': athlete.jersey,
-                    'position': athlete.position,
-                    'stats': {stat: mapped_stats.get(stat, 0) for stat in position_config['key_stats']},
-                    'ranking_score': ranking_score
-                }
-                players_data.append(player_data)
-        
-        # Sort by ranking score (highest first)
-        players_data.sort(key=lambda x: x['ranking_score'], reverse=True)
-        
-        # Add rank numbers
-        for i, player in enumerate(players_data):
-            player['rank'] = i + 1
+        # Scores and ranks come from the columnar store for this season and position
+        store = leaderboards.get_store(season, position_lower, getattr(request, 'leaderboard_validator', None))
+        players_data = store.players()
         
         return JsonResponse({
             'position': position,
@@ -860,6 +792,45 @@ def position_stats(request, position):
         }, status=500)
 
 
+@require_http_methods(["GET"])
+@http_cached(validators.game_odds_history_etag)
+def game_odds_history(request, event_id):
+    """Line and win-probability movement for one game"""
+    try:
+        series = odds_history.series(OddsSnapshot.objects.filter(game_id=event_id)).get(event_id)
+        if series is None and not Game.objects.filter(event_id=event_id).exists():
+            return JsonResponse({'error': f'Game with event_id {event_id} not found'}, status=404)
+        return JsonResponse({'event_id': event_id, 'history': series or []})
+
+    except Exception as e:
+        logger.error(f"Error in game_odds_history view for event_id {event_id}: {e}")
+        return JsonResponse({
+            'error': 'Internal server error while fetching odds history',
+            'message': str(e),
+            'event_id': event_id
+        }, status=500)
+
+
+@require_http_methods(["GET"])
+@http_cached(validators.week_odds_history_etag)
+def week_odds_history(request, week_num):
+    """Line and win-probability movement for every game in a week, keyed by event_id"""
+    try:
+        season = leaderboards.parse_season(request.GET.get('season'))
+        if season is None:
+            return JsonResponse({'error': f"Invalid season: {request.GET.get('season')}"}, status=400)
+        games = odds_history.series(OddsSnapshot.objects.filter(game__season=season, game__week_num=week_num))
+        return JsonResponse({'season': season, 'week_num': week_num, 'games': games})
+
+    except Exception as e:
+        logger.error(f"Error in week_odds_history view for week {week_num}: {e}")
+        return JsonResponse({
+            'error': 'Internal server error while fetching odds history',
+            'message': str(e),
+            'week_num': week_num
+        }, status=500)
+
+
 #post_season = Calendar.objects.filter(season_type_id=3, week_num=3)[0]
 #post_season_games = Game.objects.filter(week=post_season)
 #[get_data.single_game_probs(x) for x in post_season_games]
@@ -3,6 +3,11 @@ ASGI config for sports project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+This is how the app is deployed (gunicorn with uvicorn workers, see the setup
+scripts), so the /api/live/ Server-Sent Events stream can stay open without
+holding a worker. Scores are recorded by `manage.py poll_live_games` and the
+cron jobs and shared with every worker through nfl.live's event log.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -37,14 +37,15 @@ CRON_CLASSES = [
     'nfl.cron.RefreshEveryDay',
     'nfl.cron.RefreshEveryHour',
     'nfl.cron.RefreshEveryMinute',
-    'nfl.cron.UpdatePlayerStatsEvery10Minutes',
     'nfl.cron.UpdatePlayerStatsPostGame',
-    'nfl.cron.UpdateSeasonData',
-    'nfl.cron.UpdateTeamStats',
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its latency covers the whole stack (served at /metrics)
+    'nfl.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Before anything else that touches the body, so it compresses the final response
+    'nfl.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +53,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'nfl.db_router.ReplicaReadMiddleware',
 ]
 
 ROOT_URLCONF = 'sports.urls'
@@ -82,12 +84,72 @@ CSRF_TRUSTED_ORIGINS = [
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
+# SQLite is the local default. Setting POSTGRES_DB switches to PostgreSQL with
+# persistent connections; point POSTGRES_HOST/PORT at pgbouncer for server-side
+# pooling and set POSTGRES_REPLICA_HOST to serve API reads from a replica
+# (see nfl.db_router).
+
+def postgres_database(host, port):
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['POSTGRES_DB'],
+        'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': host,
+        'PORT': port,
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        # pgbouncer in transaction mode can't keep server-side cursors between transactions
+        'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('POSTGRES_PGBOUNCER', '') == 'True',
+    }
+
+
+if os.environ.get('POSTGRES_DB'):
+    DATABASES = {
+        'default': postgres_database(os.environ.get('POSTGRES_HOST', 'localhost'), os.environ.get('POSTGRES_PORT', '5432')),
+    }
+    if os.environ.get('POSTGRES_REPLICA_HOST'):
+        DATABASES['replica'] = {
+            **postgres_database(os.environ['POSTGRES_REPLICA_HOST'],
+                                os.environ.get('POSTGRES_REPLICA_PORT', os.environ.get('POSTGRES_PORT', '5432'))),
+            'TEST': {'MIRROR': 'default'},
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', str(BASE_DIR / 'db.sqlite3')),
+        }
+    }
+
+DATABASE_ROUTERS = ['nfl.db_router.ReplicaRouter']
+
+
+# Cache shared by web workers and cron processes, used for the materialized
+# games payloads in nfl.payload_cache. Point it at Redis/Memcached in production.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', str(BASE_DIR / 'cache' / 'django')),
     }
 }
+GAMES_PAYLOAD_TIMEOUT = 60 * 60 * 24
+CURRENT_WEEK_PAYLOAD_TIMEOUT = 300
+
+# Odds history retention: (age in days, seconds per bucket). Snapshots older than
+# the age are thinned to the last one in each bucket (nfl.odds_history.downsample)
+ODDS_HISTORY_RETENTION = [(7, 3600), (60, 86400)]
+
+# numpy and requests load on first use so web workers start faster; set
+# DEFER_HEAVY_IMPORTS=False for workers that should import them at boot
+DEFER_HEAVY_IMPORTS = os.environ.get('DEFER_HEAVY_IMPORTS', 'True') == 'True'
+
+# Cold start (interpreter start to first response) budget checked by
+# `manage.py startup_profile` and nfl.tests.StartupBudgetTests
+STARTUP_BUDGET_MS = int(os.environ.get('STARTUP_BUDGET_MS', 1500))
+
+# Cache-Control max-age for the API views; conditional requests revalidate with ETags
+API_CACHE_MAX_AGE = int(os.environ.get('API_CACHE_MAX_AGE', 60))
 
 
 # Password validation
@@ -129,6 +191,14 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+# Cache-Control max-age for static files without a content hash in their name
+# (hashed build assets are served as immutable)
+STATIC_MAX_AGE = 60 * 60
+# manage.py export_static writes the API responses under STATIC_EXPORT_ROOT;
+# STATIC_EXPORT=True also refreshes them after every cron ingestion run. Keep it
+# outside STATIC_ROOT, which build_frontend.sh empties on every build.
+STATIC_EXPORT = os.environ.get('STATIC_EXPORT', 'False') == 'True'
+STATIC_EXPORT_ROOT = os.environ.get('STATIC_EXPORT_ROOT', str(BASE_DIR / 'static_export'))
 
 
 
@@ -137,6 +207,24 @@ STATICFILES_DIRS = [
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# ESPN client (utils.espn_client): pooled session, retries and conditional GET cache
+ESPN_MAX_IN_FLIGHT = int(os.environ.get('ESPN_MAX_IN_FLIGHT', '16'))
+ESPN_TIMEOUT = (
+    float(os.environ.get('ESPN_CONNECT_TIMEOUT', '5')),
+    float(os.environ.get('ESPN_READ_TIMEOUT', '15')),
+)
+ESPN_RETRIES = int(os.environ.get('ESPN_RETRIES', '3'))
+ESPN_BACKOFF = float(os.environ.get('ESPN_BACKOFF', '0.5'))
+# Set ESPN_CACHE_DIR to an empty string to disable the on-disk response cache
+ESPN_CACHE_DIR = os.environ.get('ESPN_CACHE_DIR', str(BASE_DIR / 'cache' / 'espn'))
+# Entries older than this are dropped; past the cap the least recently used go first
+ESPN_CACHE_MAX_AGE = int(os.environ.get('ESPN_CACHE_MAX_AGE', str(7 * 24 * 60 * 60)))
+ESPN_CACHE_MAX_ENTRIES = int(os.environ.get('ESPN_CACHE_MAX_ENTRIES', '5000'))
+
+# DEBUG also logs every SQL statement (django.db.backends); per-request query
+# counts and timings are on /metrics instead (nfl.metrics)
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -144,7 +232,7 @@ LOGGING = {
         'file': {
             'level': 'DEBUG',
             'class': 'logging.FileHandler',
-            'filename': BASE_DIR / 'logs/django.log',
+            'filename': os.environ.get('DJANGO_LOG_FILE', str(BASE_DIR / 'logs/django.log')),
         },
         'console': {
             'level': 'DEBUG',
@@ -154,17 +242,17 @@ LOGGING = {
     'loggers': {
         'django': {
             'handlers': ['file', 'console'],
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
             'propagate': True,
         },
         'nfl': {
             'handlers': ['file', 'console'],
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
             'propagate': True,
         },
         'utils': {
             'handlers': ['file', 'console'],
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
             'propagate': True,
         },
     },
@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# --- TEST SETTINGS (manage.py test uses these unless DJANGO_SETTINGS_MODULE is set) ---
+
+# Tests keep their cache in memory and their log and ESPN responses in the temp
+# directory, so a run never touches backend/cache or backend/logs. Set before
+# the base settings read them; subprocesses started by tests inherit them too.
+TEST_DIR = os.path.join(tempfile.gettempdir(), 'nfl-tests')
+os.makedirs(TEST_DIR, exist_ok=True)
+os.environ.setdefault('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+os.environ.setdefault('DJANGO_CACHE_LOCATION', 'nfl-tests')
+os.environ.setdefault('DJANGO_LOG_FILE', os.path.join(TEST_DIR, 'django.log'))
+os.environ.setdefault('ESPN_CACHE_DIR', os.path.join(TEST_DIR, 'espn'))
+
+from .settings import *  # noqa: E402,F401,F403
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class BulkUpserter:
+    """Collect unsaved model instances and write them with one upsert per chunk.
+
+    Rows are keyed on ``unique_fields`` (the model's unique_together) and
+    ``update_fields`` are overwritten on conflict. Each chunk is written inside
+    its own transaction. Use as a context manager so the last partial chunk is
+    flushed on exit.
+    """
+
+    def __init__(self, model, unique_fields, update_fields, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.model = model
+        self.unique_fields = list(unique_fields)
+        self.update_fields = list(update_fields)
+        self.chunk_size = chunk_size
+        self.pending = {}
+        self.written = 0
+        self.chunks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+    def key(self, obj):
+        return tuple(getattr(obj, self.model._meta.get_field(f).attname) for f in self.unique_fields)
+
+    def add(self, obj):
+        # Last write wins for duplicate keys, matching repeated update_or_create calls
+        self.pending[self.key(obj)] = obj
+        if len(self.pending) >= self.chunk_size:
+            self.flush()
+
+    def extend(self, objs):
+        for obj in objs:
+            self.add(obj)
+
+    def flush(self):
+        if not self.pending:
+            return
+        rows = list(self.pending.values())
+        self.pending = {}
+        with transaction.atomic():
+            self.model.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=self.unique_fields,
+                update_fields=self.update_fields,
+            )
+        self.written += len(rows)
+        self.chunks += 1
+        logger.info(f"Upserted {len(rows)} {self.model.__name__} rows")
+
+
+def fingerprint(*values):
+    """Short stable hash of source values, stored in a row's source_hash"""
+    encoded = json.dumps(values, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class WriteCounts:
+    """Rows created, updated and skipped as unchanged by one or more writers"""
+
+    def __init__(self, created=0, updated=0, skipped=0):
+        self.created = created
+        self.updated = updated
+        self.skipped = skipped
+
+    def __add__(self, other):
+        return WriteCounts(self.created + other.created, self.updated + other.updated, self.skipped + other.skipped)
+
+    def __str__(self):
+        return f"{self.created} created, {self.updated} updated, {self.skipped} unchanged"
+
+
+class ChangeDetectingUpserter(BulkUpserter):
+    """BulkUpserter that only writes rows whose source values changed.
+
+    Each row stores a fingerprint of its ``update_fields`` in ``hash_field``
+    (timestamps and ``volatile_fields`` left out). A flush reads the stored
+    fingerprints for the pending keys in one query, skips rows that match,
+    inserts new ones with bulk_create and writes changed ones with bulk_update.
+    ``queryset`` narrows that lookup (e.g. to one season). Bulk writes don't
+    send post_save, so pass ``on_write(model, objs)`` to invalidate caches.
+    ``checked_field`` is set to the flush time on every row, unchanged ones
+    included (one UPDATE for those), to record when the source was last read.
+    """
+
+    def __init__(self, model, unique_fields, update_fields, chunk_size=DEFAULT_CHUNK_SIZE, queryset=None,
+                 hash_field='source_hash', volatile_fields=(), on_write=None, checked_field=None):
+        super().__init__(model, unique_fields, update_fields, chunk_size)
+        self.queryset = queryset if queryset is not None else model.objects.all()
+        self.hash_field = hash_field
+        self.on_write = on_write
+        self.checked_field = checked_field
+        fields = [model._meta.get_field(f) for f in self.update_fields]
+        self.touched = [f.attname for f in fields if getattr(f, 'auto_now', False)]
+        self.hashed = [f for f in fields if f.attname not in self.touched and f.name not in volatile_fields]
+        self.key_fields = [model._meta.get_field(f) for f in self.unique_fields]
+        self.counts = WriteCounts()
+
+    def key(self, obj):
+        # to_python so '123' from a JSON payload matches 123 from the database
+        return tuple(f.to_python(getattr(obj, f.attname)) for f in self.key_fields)
+
+    def fingerprint(self, obj):
+        return fingerprint(*(f.to_python(getattr(obj, f.attname)) for f in self.hashed))
+
+    def flush(self):
+        if not self.pending:
+            return
+        pending = self.pending
+        self.pending = {}
+        first = self.key_fields[0].attname
+        key_names = [f.attname for f in self.key_fields]
+        with transaction.atomic():
+            stored = self.queryset.filter(**{f'{first}__in': {key[0] for key in pending}})
+            existing = {tuple(row[:-2]): row[-2:] for row in stored.values_list(*key_names, 'pk', self.hash_field)}
+            created, changed, unchanged = [], [], []
+            now = timezone.now()
+            for key, obj in pending.items():
+                setattr(obj, self.hash_field, self.fingerprint(obj))
+                if self.checked_field:
+                    setattr(obj, self.checked_field, now)
+                if key not in existing:
+                    created.append(obj)
+                elif existing[key][1] != getattr(obj, self.hash_field):
+                    obj.pk = existing[key][0]
+                    for attname in self.touched:
+                        setattr(obj, attname, now)
+                    changed.append(obj)
+                else:
+                    unchanged.append(existing[key][0])
+            if created:
+                self.model.objects.bulk_create(created)
+            checked = [self.checked_field] if self.checked_field else []
+            if changed:
+                self.model.objects.bulk_update(changed, [*self.update_fields, self.hash_field, *checked])
+            if unchanged and checked:
+                self.model.objects.filter(pk__in=unchanged).update(**{self.checked_field: now})
+        skipped = len(unchanged)
+        self.counts += WriteCounts(len(created), len(changed), skipped)
+        self.written += len(created) + len(changed)
+        self.chunks += 1
+        logger.info(f"{self.model.__name__}: {WriteCounts(len(created), len(changed), skipped)}")
+        if self.on_write and (created or changed):
+            self.on_write(self.model, created + changed)
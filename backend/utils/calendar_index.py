@@ -0,0 +1,108 @@
+import bisect
+import logging
+import threading
+import time
+from datetime import timedelta
+from django.utils import timezone
+from nfl import models, payload_cache
+from nfl.db_router import read_from_primary
+
+logger = logging.getLogger(__name__)
+
+# The season year rolls over in late May, well after the Super Bowl
+SEASON_ROLLOVER = timedelta(days=140)
+# Weeks turn over two days early so the upcoming slate shows before kickoff
+WEEK_TURNOVER = timedelta(days=2)
+# Seconds between checks of the shared calendar version written by other processes
+VERSION_CHECK_INTERVAL = 30
+
+
+def current_season(now=None):
+    return ((now or timezone.now()) - SEASON_ROLLOVER).year
+
+
+class CalendarIndex:
+    """Every Calendar week held in memory, sorted by start date per season.
+
+    Looking up the week for a moment is a bisect over the start dates, so the
+    current week follows the clock without a query.
+    """
+
+    def __init__(self, weeks, version):
+        self.version = version
+        self.seasons = {}
+        self.latest = None
+        for week in sorted((w for w in weeks if w.start_date and w.end_date), key=lambda w: w.start_date):
+            weeks_for_season, starts, max_ends = self.seasons.setdefault(week.season, ([], [], []))
+            weeks_for_season.append(week)
+            starts.append(week.start_date)
+            # Latest end date of this week and every earlier one, to know when to stop walking back
+            max_ends.append(max(week.end_date, max_ends[-1]) if max_ends else week.end_date)
+            self.latest = week
+
+    def week_at(self, when, season):
+        """The latest-starting week of season that contains when, or None"""
+        weeks, starts, max_ends = self.seasons.get(season, ([], [], []))
+        i = bisect.bisect_right(starts, when) - 1
+        while i >= 0 and max_ends[i] >= when:
+            if weeks[i].end_date >= when:
+                return weeks[i]
+            i -= 1
+        return None
+
+    def _weeks_of_type(self, season, season_type_name):
+        weeks = self.seasons.get(season, ([], [], []))[0]
+        return [w for w in weeks if w.season_type_name == season_type_name]
+
+    def last_week(self, season, season_type_name):
+        return max(self._weeks_of_type(season, season_type_name), key=lambda w: w.week_num, default=None)
+
+    def first_week(self, season, season_type_name):
+        return min(self._weeks_of_type(season, season_type_name), key=lambda w: w.week_num, default=None)
+
+    def current_week(self, now):
+        season = current_season(now)
+        now_offset = now + WEEK_TURNOVER
+        week = self.week_at(now_offset, season)
+        if week:
+            return week
+        # Off-season and pre-season fall back like the original query did
+        if 3 <= now_offset.month <= 5:  # March to May
+            week = self.last_week(season - 1, 'Postseason')
+        elif 6 <= now_offset.month <= 8:  # June to August
+            week = self.first_week(season, 'Pre-Season')
+        return week or self.latest
+
+
+_index = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_index():
+    """The process-wide index, reloaded when the shared calendar version moves"""
+    global _index, _checked_at
+    index = _index
+    if index is not None and time.monotonic() - _checked_at < VERSION_CHECK_INTERVAL:
+        return index
+    # Read the version before loading so a concurrent write triggers another reload
+    version = payload_cache.get_version('calendar')
+    with _lock:
+        if _index is None or _index.version != version:
+            with read_from_primary():
+                _index = CalendarIndex(models.Calendar.objects.all(), version)
+            logger.debug(f"Loaded calendar index for seasons {sorted(_index.seasons)}")
+        _checked_at = time.monotonic()
+        return _index
+
+
+def invalidate():
+    """Drop this process's index and tell the others (called when Calendar rows change)"""
+    global _index
+    _index = None
+    payload_cache.bump_version('calendar')
+
+
+def current_week(now=None):
+    """The Calendar week for now (or None with an empty calendar)"""
+    return get_index().current_week(now or timezone.now())
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = (5, 15)
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+DEFAULT_CACHE_MAX_ENTRIES = 5000
+# Documents that change every minute during games (game packages, gamelogs and
+# live win probabilities) would only fill the cache, so they are never stored
+UNCACHED = ('cdn.espn.com/core/nfl/game?', '/gamelog', '/powerindex/')
+# The cache directory is scanned for expired and surplus entries every this many writes
+PRUNE_EVERY = 100
+
+
+class ClientStats:
+    """Thread-safe counters for upstream traffic"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.not_modified = 0
+            self.downloaded = 0
+            self.bytes = 0
+            self.errors = 0
+            self.elapsed = 0.0
+
+    def record(self, elapsed, status=None, size=0, error=False):
+        with self._lock:
+            self.requests += 1
+            self.elapsed += elapsed
+            if error:
+                self.errors += 1
+            elif status == 304:
+                self.not_modified += 1
+            else:
+                self.downloaded += 1
+                self.bytes += size
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'downloaded': self.downloaded,
+                'bytes': self.bytes,
+                'errors': self.errors,
+                'elapsed': self.elapsed,
+            }
+
+    def __str__(self):
+        s = self.snapshot()
+        return (f"{s['requests']} requests, {s['not_modified']} not modified, "
+                f"{s['downloaded']} downloaded ({s['bytes'] / 1024:.0f} KiB), {s['errors']} errors")
+
+
+stats = ClientStats()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session():
+    """Process-wide keep-alive session with connection pooling and retry with backoff"""
+    global _session
+    if _session is None:
+        # requests is deferred to the first ESPN call; web workers rarely make one
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total=getattr(settings, 'ESPN_RETRIES', DEFAULT_RETRIES),
+                    backoff_factor=getattr(settings, 'ESPN_BACKOFF', DEFAULT_BACKOFF),
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=['GET'],
+                    raise_on_status=False,
+                )
+                pool_size = getattr(settings, 'ESPN_MAX_IN_FLIGHT', 16)
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+                s = requests.Session()
+                s.mount('https://', adapter)
+                s.mount('http://', adapter)
+                _session = s
+    return _session
+
+
+def cache_dir():
+    location = getattr(settings, 'ESPN_CACHE_DIR', None)
+    return Path(location) if location else None
+
+
+def cacheable(url):
+    return cache_dir() is not None and not any(pattern in url for pattern in UNCACHED)
+
+
+def _cache_path(url):
+    return cache_dir() / f'{hashlib.sha256(url.encode()).hexdigest()}.json'
+
+
+def _max_age():
+    return getattr(settings, 'ESPN_CACHE_MAX_AGE', DEFAULT_CACHE_MAX_AGE)
+
+
+def _read_cache(url):
+    if not cacheable(url):
+        return None
+    path = _cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime > _max_age():
+            path.unlink(missing_ok=True)
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _touch_cache(url):
+    """Mark a revalidated entry as recently used"""
+    try:
+        os.utime(_cache_path(url))
+    except OSError:
+        pass
+
+
+_writes = 0
+_writes_lock = threading.Lock()
+
+
+def prune_cache():
+    """Delete expired entries, then the least recently used ones past ESPN_CACHE_MAX_ENTRIES"""
+    directory = cache_dir()
+    if directory is None:
+        return 0
+    try:
+        entries = [(e.stat().st_mtime, e.path) for e in os.scandir(directory) if e.name.endswith('.json')]
+    except OSError:
+        return 0
+    entries.sort(reverse=True)
+    cutoff = time.time() - _max_age()
+    max_entries = getattr(settings, 'ESPN_CACHE_MAX_ENTRIES', DEFAULT_CACHE_MAX_ENTRIES)
+    removed = 0
+    for i, (mtime, path) in enumerate(entries):
+        if i >= max_entries or mtime < cutoff:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        logger.debug(f"Pruned {removed} cached ESPN responses")
+    return removed
+
+
+def _write_cache(url, response):
+    global _writes
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if not cacheable(url) or not (etag or last_modified):
+        return
+    entry = {
+        'url': url,
+        'etag': etag,
+        'last_modified': last_modified,
+        'content_type': response.headers.get('Content-Type'),
+        'body': response.text,
+    }
+    path = _cache_path(url)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f"Could not cache response for {url}: {e}")
+        return
+    with _writes_lock:
+        _writes += 1
+        prune = _writes % PRUNE_EVERY == 0
+    if prune:
+        prune_cache()
+
+
+def _cached_response(url, entry):
+    import requests
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = entry['body'].encode()
+    response.encoding = 'utf-8'
+    if entry.get('content_type'):
+        response.headers['Content-Type'] = entry['content_type']
+    response.from_cache = True
+    return response
+
+
+def get(url, timeout=None, **kwargs):
+    """GET an ESPN url through the pooled session and the conditional request cache.
+
+    A cached copy is revalidated with If-None-Match/If-Modified-Since and a 304
+    is answered from disk as a normal 200 response, so callers can keep using
+    ``.status_code`` and ``.json()``. Live documents (UNCACHED) always go to ESPN.
+    """
+    entry = _read_cache(url)
+    headers = dict(kwargs.pop('headers', None) or {})
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    timeout = timeout or getattr(settings, 'ESPN_TIMEOUT', DEFAULT_TIMEOUT)
+    start = time.perf_counter()
+    import requests
+    try:
+        response = session().get(url, headers=headers, timeout=timeout, **kwargs)
+    except requests.RequestException:
+        stats.record(time.perf_counter() - start, error=True)
+        raise
+    stats.record(time.perf_counter() - start, response.status_code, len(response.content))
+
+    if response.status_code == 304 and entry:
+        logger.debug(f"Not modified: {url}")
+        _touch_cache(url)
+        return _cached_response(url, entry)
+
+    response.from_cache = False
+    if response.status_code == 200:
+        _write_cache(url, response)
+    return response
+
+
+def get_json(url, **kwargs):
+    return get(url, **kwargs).json()
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from utils import espn_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 16
+
+
+def max_in_flight():
+    return getattr(settings, 'ESPN_MAX_IN_FLIGHT', DEFAULT_MAX_IN_FLIGHT)
+
+
+def get_json(url):
+    """Blocking GET of a single ESPN document through the shared client"""
+    logger.debug(f"Fetching {url}")
+    response = espn_client.get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+async def _fetch(loop, executor, semaphore, url):
+    async with semaphore:
+        return await loop.run_in_executor(executor, get_json, url)
+
+
+async def _fetch_all(urls, limit):
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(limit)
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+        tasks = [_fetch(loop, executor, semaphore, url) for url in urls]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def fetch_json_many(urls, limit=None):
+    """Fetch every url concurrently and return the parsed documents in the same order.
+
+    At most ``limit`` requests are in flight at once. A document that fails to
+    download or parse is logged and returned as None so one bad event does not
+    abort a whole season refresh.
+    """
+    urls = list(urls)
+    if not urls:
+        return []
+    limit = max(1, min(limit or max_in_flight(), len(urls)))
+    results = asyncio.run(_fetch_all(urls, limit))
+
+    documents = []
+    for url, result in zip(urls, results):
+        if isinstance(result, Exception):
+            logger.error(f"An error occurred fetching {url}: {result}")
+            documents.append(None)
+        else:
+            documents.append(result)
+    return documents
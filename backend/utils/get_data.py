@@ -1,237 +1,302 @@
 from django.http import HttpResponse
 from django.db.models import Q
-import requests
 import json
 import pytz
 from django.utils import timezone
 from datetime import timedelta, datetime
 import sys
 import os
-from nfl import models
+from nfl import models, live, box_score, odds_history, signals, team_trends
 import utils.helpers as h
+import utils.fetch as fetch
+import utils.espn_client as espn
+from utils.bulk import ChangeDetectingUpserter, WriteCounts
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def __getattr__(name):
+    # Former import-time globals, now resolved when they're read so long-running
+    # processes follow the clock and importing this module doesn't query the DB
+    if name == 'CURRENT_YEAR':
+        return h.current_season()
+    if name == 'CURRENT_WEEK':
+        return h.current_week()
+    if name == 'NOW':
+        return timezone.now()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-CURRENT_YEAR = int(str(datetime.today() - timedelta(days=140))[:4])
-CURRENT_WEEK = h.current_week()
-NOW = datetime.today()
 BASE_URL = 'https://sports.core.api.espn.com/v2/sports/football/leagues'
 
+# Fields each ingest writes; the fingerprint of these (less last_updated) decides
+# whether a row changed since the last run
+TEAM_FIELDS = ['team_name', 'short_name']
+CALENDAR_FIELDS = ['details', 'week_num', 'season', 'season_type_id', 'season_type_name', 'start_date', 'end_date']
+GAME_FIELDS = ['week', 'week_num', 'season', 'game_datetime', 'short_name', 'home_team', 'away_team']
+ATHLETE_FIELDS = ['first_name', 'last_name', 'team', 'jersey', 'position', 'position_key', 'position_id', 'age',
+                  'weight', 'height', 'injuries', 'status', 'status_id', 'debut_year']
+TEAM_STAT_FIELDS = ['value', 'rank', 'display_rank', 'description', 'last_updated']
+ODDS_FIELDS = ['spread_display', 'spread', 'last_updated']
+PROBS_FIELDS = ['pred_diff', 'home_win_prob', 'away_win_prob', 'last_updated']
+
 
 def get_teams_from_espn(season=None):
     if season:
         season = season
     else:
-        season = CURRENT_YEAR
-    [models.Team.objects.update_or_create(team_id=x, team_name='TBD', short_name='TBD') for x in [31,32]]
-    url = f'https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/seasons/{season}/teams?limit=50'
-    logger.info(f"Fetching teams from {url}")
-    data = requests.get(url).json()
-    for x in data['items']:
-        team_id = h.extract_int(x['$ref'], 'teams')
-        url = f'https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/seasons/{season}/teams/{team_id}'
-        logger.info(f"Fetching team from {url}")
-        team = requests.get(url).json()
-        team_name = team['displayName']
-        short_name = team['abbreviation']
-        team, created = models.Team.objects.update_or_create(team_id=team_id, team_name=team_name, short_name=short_name)
-        print(f'{team}: {created}')
-
-    return HttpResponse(models.Team.objects.all())
+        season = h.current_season()
+    writer = ChangeDetectingUpserter(models.Team, ['team_id'], TEAM_FIELDS, on_write=signals.bulk_saved)
+    with writer:
+        writer.extend(models.Team(team_id=x, team_name='TBD', short_name='TBD') for x in [31, 32])
+        url = f'https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/seasons/{season}/teams?limit=50'
+        logger.info(f"Fetching teams from {url}")
+        data = espn.get(url).json()
+        for x in data['items']:
+            team_id = h.extract_int(x['$ref'], 'teams')
+            url = f'https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/seasons/{season}/teams/{team_id}'
+            logger.debug(f"Fetching team from {url}")
+            team = espn.get(url).json()
+            writer.add(models.Team(team_id=team_id, team_name=team['displayName'], short_name=team['abbreviation']))
+
+    print(f'Teams: {writer.counts}')
+    return writer.counts
 
 
 def get_games_from_espn(week=None):
     if week:
         weeks_to_update = [week]
     else:
-        weeks_to_update = models.Calendar.objects.filter(end_date__gte=NOW)
+        weeks_to_update = models.Calendar.objects.filter(end_date__gte=timezone.now())
+
+    return get_games_for_weeks(weeks_to_update)
 
-    for w in weeks_to_update:
-        url = f'{BASE_URL}/nfl/seasons/{w.season}/types/{w.season_type_id}/weeks/{w.week_num}/events'
-        logger.info(f"Fetching games from {url}")
-        games = requests.get(url).json()
+
+def get_games_for_weeks(weeks):
+    """Pull the event lists and every event document for the given weeks in parallel, then save the games"""
+    weeks = list(weeks)
+    week_urls = [f'{BASE_URL}/nfl/seasons/{w.season}/types/{w.season_type_id}/weeks/{w.week_num}/events' for w in weeks]
+    logger.info(f"Fetching games for {len(weeks)} weeks")
+
+    events_to_fetch = []
+    for w, games in zip(weeks, fetch.fetch_json_many(week_urls)):
+        if not games:
+            continue
         for x in games['items']:
-            event_id = h.extract_int(x['$ref'], 'events')
-            url = f'http://sports.core.api.espn.com/v2/sports/football/leagues/nfl/events/{event_id}'
-            logger.info(f"Fetching event from {url}")
-            event = requests.get(url).json()
-            short_name = event['shortName']
-            if event['competitions'][0]['competitors'][0]['homeAway'] == 'home':
-                home_team_url = event['competitions'][0]['competitors'][0]['team']['$ref']
-                away_team_url = event['competitions'][0]['competitors'][1]['team']['$ref']
-            else:
-                away_team_url = event['competitions'][0]['competitors'][0]['team']['$ref']
-                home_team_url = event['competitions'][0]['competitors'][1]['team']['$ref']
-
-            home_team_id = h.extract_int(home_team_url, 'teams')
-            away_team_id = h.extract_int(away_team_url, 'teams')
-
-            print(home_team_id, away_team_id)
-            models.Game.objects.update_or_create(
-                event_id = event_id,
-                week_num = w.week_num,
-                season = w.season,
-                game_datetime = event['date'],
-                short_name = short_name,
-                home_team = models.Team.objects.get(pk=home_team_id),
-                away_team = models.Team.objects.get(pk=away_team_id)
-        )
+            events_to_fetch.append((w, h.extract_int(x['$ref'], 'events')))
+
+    event_urls = [f'{BASE_URL}/nfl/events/{event_id}' for w, event_id in events_to_fetch]
+    logger.info(f"Fetching {len(event_urls)} events")
+    events = fetch.fetch_json_many(event_urls)
+
+    with ChangeDetectingUpserter(models.Game, ['event_id'], GAME_FIELDS, on_write=signals.bulk_saved) as writer:
+        for (w, event_id), event in zip(events_to_fetch, events):
+            if event is None:
+                continue
+            writer.add(game_from_event(w, event_id, event))
+    print(f'Games: {writer.counts}')
+    return writer.counts
+
+
+def game_from_event(week, event_id, event):
+    """An unsaved Game built from an ESPN event document"""
+    short_name = event['shortName']
+    if event['competitions'][0]['competitors'][0]['homeAway'] == 'home':
+        home_team_url = event['competitions'][0]['competitors'][0]['team']['$ref']
+        away_team_url = event['competitions'][0]['competitors'][1]['team']['$ref']
+    else:
+        away_team_url = event['competitions'][0]['competitors'][0]['team']['$ref']
+        home_team_url = event['competitions'][0]['competitors'][1]['team']['$ref']
+
+    home_team_id = h.extract_int(home_team_url, 'teams')
+    away_team_id = h.extract_int(away_team_url, 'teams')
+
+    return models.Game(
+        event_id=event_id,
+        week=week,
+        week_num=week.week_num,
+        season=week.season,
+        game_datetime=event['date'],
+        short_name=short_name,
+        home_team_id=home_team_id,
+        away_team_id=away_team_id,
+    )
+
+def game_package_url(event_id):
+    return f'https://cdn.espn.com/core/nfl/game?xhr=1&gameId={event_id}'
 
-            print(f'Updated/Created data for {short_name}; {w.name} in {w.season_type_name}')
 
 #update a game object with latest info
 def update_game(game):
     try:
-        url = f'https://cdn.espn.com/core/nfl/game?xhr=1&gameId={game.event_id}'
-        logger.info(f"Fetching game data from {url}")
-        response = requests.get(url)
-        logger.info(f"Response status code: {response.status_code}")
-        data = response.json()
-        data = data.get('gamepackageJSON')
-        competition = data['header']['competitions'][0]
-        game.game_datetime = competition['date']
-        if competition['competitors'][0]['homeAway'] == 'home':
-            home_id =  competition['competitors'][0]['id']
-            away_id =  competition['competitors'][1]['id']
-        else:
-            away_id =  competition['competitors'][0]['id']
-            home_id =  competition['competitors'][1]['id']
-        game.home_team = models.Team.objects.get(team_id=home_id)
-        game.away_team = models.Team.objects.get(team_id=away_id)
-        print(f'Updated {game}, {game.game_datetime}')
-        game.save()
+        url = game_package_url(game.event_id)
+        logger.debug(f"Fetching game data from {url}")
+        response = espn.get(url)
+        logger.debug(f"Response status code: {response.status_code}")
+        apply_game_package(game, response.json().get('gamepackageJSON'))
     except Exception as e:
         logger.error(f"An error occurred during update_game for game {game.event_id}: {e}")
 
 
+def apply_game_package(game, data):
+    """Save the schedule info, live score/status and player box score from a downloaded gamepackage"""
+    competition = data['header']['competitions'][0]
+    game.game_datetime = competition['date']
+    if competition['competitors'][0]['homeAway'] == 'home':
+        home_id =  competition['competitors'][0]['id']
+        away_id =  competition['competitors'][1]['id']
+    else:
+        away_id =  competition['competitors'][0]['id']
+        home_id =  competition['competitors'][1]['id']
+    game.home_team = models.Team.objects.get(team_id=home_id)
+    game.away_team = models.Team.objects.get(team_id=away_id)
+    print(f'Updated {game}, {game.game_datetime}')
+    game.save()
+    live.record_game_state(game, live.parse_game_state(data))
+    box_score.save_box_score(game, data)
+
+
 #pass games
 def update_upcoming_games():
-    upcoming_games = models.Game.objects.filter(game_datetime__gt=NOW, game_datetime__lt=NOW + timedelta(days=15))
+    now = timezone.now()
+    upcoming_games = models.Game.objects.filter(game_datetime__gt=now, game_datetime__lt=now + timedelta(days=15))
     [update_game(x) for x in upcoming_games]
 
 
 
 
 
+def outcomes_written(model, outcomes):
+    """Invalidate the games payloads and append odds history for Outcome rows that changed"""
+    signals.bulk_saved(model, outcomes)
+    for outcome in outcomes:
+        odds_history.record(outcome.event_id, spread=outcome.spread,
+                            home_win_prob=outcome.home_win_prob, pred_diff=outcome.pred_diff)
+
+
+def odds_writer():
+    return ChangeDetectingUpserter(models.Outcome, ['event_id'], ODDS_FIELDS, hash_field='odds_hash',
+                                   volatile_fields=['last_updated'], on_write=outcomes_written,
+                                   checked_field='checked_at')
+
+
+def probs_writer():
+    return ChangeDetectingUpserter(models.Outcome, ['event_id'], PROBS_FIELDS, hash_field='probs_hash',
+                                   volatile_fields=['last_updated'], on_write=outcomes_written,
+                                   checked_field='checked_at')
+
+
+def odds_from_payload(game, data):
+    """An unsaved Outcome with the spread from an odds document, or None"""
+    if len(data['items']) > 0 and data['items'][0].get('details'):
+        return models.Outcome(
+            event_id=game,
+            spread_display=data['items'][0]['details'],
+            spread=int(data['items'][0]['spread']),
+            last_updated=timezone.now(),
+        )
+    return None
+
+
+def probs_from_payload(game, data):
+    """An unsaved Outcome with the win probabilities from a power index document, or None"""
+    if data.get('stats'):
+        home_win_prob = float(data['stats'][1]['value'])
+        return models.Outcome(
+            event_id=game,
+            pred_diff=float(data['stats'][0]['value']),
+            home_win_prob=home_win_prob,
+            away_win_prob=100-home_win_prob,
+            last_updated=timezone.now(),
+        )
+    return None
+
+
 def week_num_odds(week_num=None):
     if week_num:
         week_num = week_num
     else:
-        week_num = CURRENT_WEEK.week_num
-    games = models.Game.objects.filter(week_num=week_num)
-    num = 0
-    for x in games:
-        url = f'{BASE_URL}/nfl/events/{x.event_id}/competitions/{x.event_id}/odds'
-        logger.info(f"Fetching odds from {url}")
-        data = requests.get(url).json()
-        if len(data['items']) > 0:
-            if data['items'][0].get('details'):
-                spread_display = data['items'][0]['details']
-                spread = int(data['items'][0]['spread'])
-                odds, created = models.Outcome.objects.update_or_create(
-                            event_id=x,
-                            defaults={
-                                'spread_display': spread_display,
-                                'spread': spread,
-                                'last_updated': timezone.make_aware(NOW)
-                            }
-                        )
-                num += 1
-
-        url = f'{BASE_URL}/nfl/events/{x.event_id}/competitions/{x.event_id}/powerindex/{x.home_team.team_id}'
-        logger.info(f"Fetching power index from {url}")
-        data = requests.get(url).json()
-        if data.get('stats'):
-            pred_diff = float(data['stats'][0]['value'])
-            home_win_prob = float(data['stats'][1]['value'])
-            away_win_prob = 100-home_win_prob
-            odds, created = models.Outcome.objects.update_or_create(
-                            event_id=x,
-                            defaults={
-                                'pred_diff': pred_diff,
-                                'home_win_prob': home_win_prob,
-                                'away_win_prob': away_win_prob,
-                            }
-                        )
-
-    print(f'Updated {num} odds for week {week_num}')
+        week_num = h.current_week().week_num
+    games = models.Game.objects.filter(week_num=week_num).select_related('home_team')
+    with odds_writer() as odds, probs_writer() as probs:
+        for x in games:
+            url = f'{BASE_URL}/nfl/events/{x.event_id}/competitions/{x.event_id}/odds'
+            logger.debug(f"Fetching odds from {url}")
+            outcome = odds_from_payload(x, espn.get(url).json())
+            if outcome:
+                odds.add(outcome)
+
+            url = f'{BASE_URL}/nfl/events/{x.event_id}/competitions/{x.event_id}/powerindex/{x.home_team.team_id}'
+            logger.debug(f"Fetching power index from {url}")
+            outcome = probs_from_payload(x, espn.get(url).json())
+            if outcome:
+                probs.add(outcome)
+
+    print(f'Odds for week {week_num}: {odds.counts}; probabilities: {probs.counts}')
+    return odds.counts + probs.counts
 
 
 def single_game_odds(game):
     try:
         url = f'{BASE_URL}/nfl/events/{game.event_id}/competitions/{game.event_id}/odds'
-        logger.info(f"Fetching odds from {url}")
-        response = requests.get(url)
-        logger.info(f"Response status code: {response.status_code}")
-        data = response.json()
-        if len(data['items']) > 0:
-            if data['items'][0].get('details'):
-                spread_display = data['items'][0]['details']
-                spread = int(data['items'][0]['spread'])
-                odds, created = models.Outcome.objects.update_or_create(
-                                event_id=game,
-                                defaults={
-                                    'spread_display': spread_display,
-                                    'spread': spread,
-                                    'last_updated': timezone.make_aware(NOW)
-                                }
-                            )
-                print(f'Updated odds for {game.short_name}')
+        logger.debug(f"Fetching odds from {url}")
+        response = espn.get(url)
+        logger.debug(f"Response status code: {response.status_code}")
+        outcome = odds_from_payload(game, response.json())
+        if outcome:
+            with odds_writer() as writer:
+                writer.add(outcome)
+            print(f'Odds for {game.short_name}: {writer.counts}')
+            return writer.counts
     except Exception as e:
         logger.error(f"An error occurred during single_game_odds for game {game.event_id}: {e}")
+    return WriteCounts()
 
 
 def single_game_probs(game):
     url = f'{BASE_URL}/nfl/events/{game.event_id}/competitions/{game.event_id}/powerindex/{game.home_team.team_id}'
-    logger.info(f"Fetching power index from {url}")
-    response = requests.get(url)
-    logger.info(f"Response status code: {response.status_code}")
-    logger.info(f"Response content: {response.text}")
-    data = response.json()
-    if data.get('stats'):
-        pred_diff = float(data['stats'][0]['value'])
-        home_win_prob = float(data['stats'][1]['value'])
-        away_win_prob = 100-home_win_prob
-        odds, created = models.Outcome.objects.update_or_create(
-                            event_id=game,
-                            defaults={
-                                'pred_diff': pred_diff,
-                                'home_win_prob': home_win_prob,
-                                'away_win_prob': away_win_prob,
-                                'last_updated': timezone.make_aware(NOW)
-                            }
-                        )
-
+    logger.debug(f"Fetching power index from {url}")
+    response = espn.get(url)
+    logger.debug(f"Response status code: {response.status_code}")
+    outcome = probs_from_payload(game, response.json())
+    if outcome is None:
+        return WriteCounts()
+    with probs_writer() as writer:
+        writer.add(outcome)
+    return writer.counts
 
 
 def get_athletes_from_espn(team_id):
     team = models.Team.objects.get(pk=team_id)
     url = f'https://site.api.espn.com/apis/site/v2/sports/football/nfl/teams/{team_id}/roster?limit=200'
     logger.info(f"Fetching athletes from {url}")
-    data = requests.get(url).json()
-    for group in data['athletes']:
-        for a in group['items']:
-            player = models.Athlete.objects.update_or_create(
-                athlete_id =a['id'],
-                defaults = {
-                    'first_name': a['firstName'],
-                    'last_name': a['lastName'],
-                    'team': team,
-                    'jersey': a.get('jersey', None),
-                    'position': a['position']['name'],
-                    'position_id': a['position']['id'],
-                    'age': a.get('age', None),
-                    'weight': a.get('weight', None) ,
-                    'height': a.get('height', None) ,
-                    'injuries': a['injuries'],
-                    'status': a['status']['name'],
-                    'status_id': a['status']['id'],
-                    'debut_year': a.get('debutYear', None)})
-            print(player[0])
+    data = espn.get(url).json()
+    with ChangeDetectingUpserter(models.Athlete, ['athlete_id'], ATHLETE_FIELDS, on_write=signals.bulk_saved) as writer:
+        for group in data['athletes']:
+            for a in group['items']:
+                writer.add(models.Athlete(
+                    athlete_id=a['id'],
+                    first_name=a['firstName'],
+                    last_name=a['lastName'],
+                    team=team,
+                    jersey=a.get('jersey', None),
+                    position=a['position']['name'],
+                    # Bulk writes skip Athlete.save(), which normally fills this in
+                    position_key=models.normalize_position(a['position']['name']),
+                    position_id=a['position']['id'],
+                    age=a.get('age', None),
+                    weight=a.get('weight', None),
+                    height=a.get('height', None),
+                    injuries=a['injuries'],
+                    status=a['status']['name'],
+                    status_id=a['status']['id'],
+                    debut_year=a.get('debutYear', None),
+                ))
+    print(f'{team} athletes: {writer.counts}')
+    return writer.counts
 
 
 def format_datetime_to_est(dt):
@@ -273,40 +338,48 @@ def should_update(game):
 
 
 def team_stats(team_id):
-    base_url = f'{BASE_URL}/nfl/seasons/{CURRENT_YEAR}/types/2/teams'
+    base_url = f'{BASE_URL}/nfl/seasons/{h.current_season()}/types/2/teams'
     url = f'{base_url}/{team_id}/statistics'
     logger.info(f"Fetching team stats from {url}")
-    data = requests.get(url).json()
+    data = espn.get(url).json()
     if not data.get('splits') or data.get('splits').get('category'):
-            return
+            return WriteCounts()
     data = data['splits']['categories']
     team = models.Team.objects.get(pk=team_id)
-    for category in data:
-        if category.get('stats') and category.get('name'):
-            cat = category['name']
-            for stat in category['stats']:
-                if stat.get('name'):
-                    models.StatTeam.objects.update_or_create(
-                        team_id = team,
-                        stat_name = stat['name'],
-                        category = cat,
-                        defaults = {
-                        'team_id': team,
-                        'value': stat['value'],
-                        'rank': stat.get('rank', None),
-                        'display_rank': stat.get('rankDisplayValue', 'n/a'),
-                        'description': stat['description']
-
-                    })
-                    print(team, stat['name'], stat['value'])
+    writer = ChangeDetectingUpserter(models.StatTeam, ['team_id', 'category', 'stat_name'], TEAM_STAT_FIELDS,
+                                     queryset=models.StatTeam.objects.filter(team_id=team), on_write=signals.bulk_saved)
+    snapshot = []
+    with writer:
+        for category in data:
+            if category.get('stats') and category.get('name'):
+                cat = category['name']
+                for stat in category['stats']:
+                    if stat.get('name'):
+                        writer.add(models.StatTeam(
+                            team_id=team,
+                            stat_name=stat['name'],
+                            category=cat,
+                            value=stat['value'],
+                            rank=stat.get('rank', None),
+                            display_rank=stat.get('rankDisplayValue', 'n/a'),
+                            description=stat['description'],
+                        ))
+                        snapshot.append((cat, stat['name'], stat['value'], stat.get('rank', None)))
+    print(f'{team} stats: {writer.counts}')
+    # Keep this week's values for trends, since StatTeam only holds the latest
+    week = h.current_week()
+    if week and snapshot:
+        team_trends.record_snapshot(team, week, snapshot)
+    return writer.counts
 
 
 def get_team_records():
     teams = models.Team.objects.all()
+    season = h.current_season()
     for x in teams:
-        url = f'{BASE_URL}/nfl/seasons/{CURRENT_YEAR}/types/2/teams/{x.team_id}/record'
+        url = f'{BASE_URL}/nfl/seasons/{season}/types/2/teams/{x.team_id}/record'
         logger.info(f"Fetching team records from {url}")
-        data = requests.get(url).json()
+        data = espn.get(url).json()
         if data['items']:
             record = data['items'][0].get('displayValue', '-')
             x.record = record
@@ -317,35 +390,43 @@ def get_team_records():
 
 
 def update_odds_cron():
-    odds_to_update = models.Game.objects.filter(week_num=CURRENT_WEEK.week_num)
+    odds_to_update = models.Game.objects.filter(week_num=h.current_week().week_num)
+    counts = WriteCounts()
     for x in odds_to_update:
-        single_game_odds(x)
-        print(f'Updated {x}')
+        counts += single_game_odds(x)
+    return counts
 
 
 def update_probs_cron():
-    probs_to_update = models.Game.objects.filter(week_num__gte=CURRENT_WEEK.week_num)
+    probs_to_update = models.Game.objects.filter(week_num__gte=h.current_week().week_num).select_related('home_team')
+    counts = WriteCounts()
     for x in probs_to_update:
-        single_game_probs(x)
+        counts += single_game_probs(x)
+    return counts
 
 
 def current_schedule():
-    url = f'https://cdn.espn.com/core/nfl/schedule?xhr=1&year={CURRENT_YEAR}'
+    season = h.current_season()
+    url = f'https://cdn.espn.com/core/nfl/schedule?xhr=1&year={season}'
     logger.info(f"Fetching current schedule from {url}")
-    calendar = (requests.get(url).json())['content']['calendar']
-    for x in calendar:
-        if int(x['value']) == 2 or int(x['value']) == 3:
-            season_type = x['label']
-            for y in x['entries']:
-                models.Calendar.objects.update_or_create(
-                    name = y['alternateLabel'],
-                    defaults = {
-                        'details': y['detail'],
-                        'week_num': y['value'],
-                        'season': CURRENT_YEAR,
-                        'season_type_id': x['value'],
-                        'season_type_name': season_type,
-                        'start_date': y['startDate'],
-                        'end_date': y['endDate'],
-                    }
-                )
\ No newline at end of file
+    return save_calendar((espn.get(url).json())['content']['calendar'], season)
+
+
+def save_calendar(calendar, season):
+    """Write the regular and post-season weeks of a schedule document's calendar"""
+    with ChangeDetectingUpserter(models.Calendar, ['name'], CALENDAR_FIELDS, on_write=signals.bulk_saved) as writer:
+        for x in calendar:
+            if int(x['value']) == 2 or int(x['value']) == 3:
+                season_type = x['label']
+                for y in x['entries']:
+                    writer.add(models.Calendar(
+                        name=y['alternateLabel'],
+                        details=y['detail'],
+                        week_num=y['value'],
+                        season=season,
+                        season_type_id=x['value'],
+                        season_type_name=season_type,
+                        start_date=y['startDate'],
+                        end_date=y['endDate'],
+                    ))
+    return writer.counts
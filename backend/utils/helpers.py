@@ -1,53 +1,28 @@
 import re
-from nfl import models
-from datetime import datetime, timedelta
-from django.utils.timezone import now
+from django.utils import timezone
+from utils import calendar_index
+
+
+def __getattr__(name):
+    # Former import-time globals, now resolved when they're read
+    if name == 'CURRENT_YEAR':
+        return calendar_index.current_season()
+    if name == 'NOW':
+        return timezone.now()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-CURRENT_YEAR = (datetime.now() - timedelta(days=150)).year
-NOW = now()
 
 def get_espn_api_url(endpoint):
     return f"https://site.web.api.espn.com/apis/common/v3/sports/football/nfl/{endpoint}"
 
-def current_week():
-    # Add a 2-day offset to handle week turnover
-    now_offset = NOW + timedelta(days=2)
-    
-    try:
-        # Try to find the current week with the offset
-        current_week = models.Calendar.objects.filter(
-            season=CURRENT_YEAR,
-            start_date__lte=now_offset,
-            end_date__gte=now_offset
-        ).latest('start_date')
-        
-        print(f"Current schedule week is {current_week.name} of the {current_week.season_type_name}")
-        return current_week
 
-    except models.Calendar.DoesNotExist:
-        # Handle off-season and pre-season logic
-        if 3 <= now_offset.month <= 5:  # March to May
-            # Return the last week of the previous season's post-season
-            last_postseason_week = models.Calendar.objects.filter(
-                season=CURRENT_YEAR - 1,
-                season_type_name='Postseason'
-            ).order_by('-week_num').first()
-            if last_postseason_week:
-                print(f"Current schedule week is {last_postseason_week.name} of the {last_postseason_week.season_type_name}")
-                return last_postseason_week
+def current_season():
+    return calendar_index.current_season()
 
-        elif 6 <= now_offset.month <= 8:  # June to August
-            # Return the first week of the upcoming pre-season
-            first_preseason_week = models.Calendar.objects.filter(
-                season=CURRENT_YEAR,
-                season_type_name='Pre-Season'
-            ).order_by('week_num').first()
-            if first_preseason_week:
-                print(f"Current schedule week is {first_preseason_week.name} of the {first_preseason_week.season_type_name}")
-                return first_preseason_week
-        
-        # If no specific week is found, return the latest available week
-        return models.Calendar.objects.latest('start_date')
+
+def current_week():
+    """The current schedule week, from the in-memory calendar index"""
+    return calendar_index.current_week()
 
 
 
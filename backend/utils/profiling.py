@@ -0,0 +1,141 @@
+"""Span tree for ingestion commands: where a run's time goes, phase by phase.
+
+Each span records wall time, upstream requests and their time (from
+utils.espn_client.stats), SQL statements and their time, and rows written
+(rowcount of INSERT/UPDATE/DELETE statements). Whatever wall time isn't spent
+waiting on ESPN or the database is parsing and Python work. With a dump
+directory, each top-level phase is also run under cProfile and saved as
+<dir>/<nn>-<phase>.prof (open with `python -m pstats` or snakeviz).
+
+Queries are counted on this thread's connections; work handed to a thread
+pool (utils.fetch) shows up in request counts but not in DB figures.
+"""
+import cProfile
+import os
+import re
+import time
+from contextlib import ExitStack, contextmanager
+from django.db import connections
+from utils import espn_client
+
+WRITE_STATEMENT = re.compile(r'\s*(INSERT|UPDATE|DELETE)\b', re.IGNORECASE)
+
+
+class Span:
+    __slots__ = ('name', 'children', 'wall', 'requests', 'request_seconds', 'queries', 'db_seconds', 'rows')
+
+    def __init__(self, name):
+        self.name = name
+        self.children = []
+        self.wall = self.request_seconds = self.db_seconds = 0.0
+        self.requests = self.queries = self.rows = 0
+
+
+class DBCounter:
+    """execute_wrapper keeping running totals of statements, time and rows written"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+            if WRITE_STATEMENT.match(sql):
+                self.rows += max(getattr(context['cursor'], 'rowcount', 0) or 0, 0)
+
+    def totals(self):
+        return self.queries, self.seconds, self.rows
+
+
+class Profiler:
+    """Record nested spans with span(name); does nothing when not enabled"""
+
+    def __init__(self, enabled=True, dump_dir=None):
+        self.enabled = enabled
+        self.dump_dir = dump_dir
+        self.db = DBCounter()
+        self.roots = []
+        self._stack = []
+        self._wrappers = None
+        self._dumped = 0
+
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield None
+            return
+        span = Span(name)
+        (self._stack[-1].children if self._stack else self.roots).append(span)
+        if not self._stack:
+            self._wrappers = ExitStack()
+            for connection in connections.all():
+                self._wrappers.enter_context(connection.execute_wrapper(self.db))
+        # cProfile can't nest, so only phases directly under the root are profiled
+        profile = cProfile.Profile() if self.dump_dir and len(self._stack) == 1 else None
+
+        self._stack.append(span)
+        upstream = espn_client.stats.snapshot()
+        queries, db_seconds, rows = self.db.totals()
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield span
+        finally:
+            if profile:
+                profile.disable()
+            span.wall = time.perf_counter() - start
+            after = espn_client.stats.snapshot()
+            span.requests = after['requests'] - upstream['requests']
+            span.request_seconds = after['elapsed'] - upstream['elapsed']
+            end_queries, end_db_seconds, end_rows = self.db.totals()
+            span.queries = end_queries - queries
+            span.db_seconds = end_db_seconds - db_seconds
+            span.rows = end_rows - rows
+            self._stack.pop()
+            if profile:
+                self._dump(profile, name)
+            if not self._stack:
+                self._wrappers.close()
+
+    def _dump(self, profile, name):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        self._dumped += 1
+        slug = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+        profile.dump_stats(os.path.join(self.dump_dir, f'{self._dumped:02d}-{slug}.prof'))
+
+    def report(self):
+        """The span tree as a table"""
+        lines = [f"{'phase':<32}{'wall s':>9}{'requests':>10}{'req s':>9}{'queries':>9}{'db s':>8}{'rows':>8}{'other s':>9}"]
+
+        def walk(span, depth):
+            # Concurrent requests can add up to more than the wall time
+            other = max(span.wall - span.request_seconds - span.db_seconds, 0)
+            lines.append(f"{'  ' * depth + span.name:<32}{span.wall:>9.2f}{span.requests:>10}"
+                         f"{span.request_seconds:>9.2f}{span.queries:>9}{span.db_seconds:>8.2f}{span.rows:>8}"
+                         f"{other:>9.2f}")
+            for child in span.children:
+                walk(child, depth + 1)
+
+        for root in self.roots:
+            walk(root, 0)
+        if self.dump_dir:
+            lines.append(f"cProfile output per phase in {self.dump_dir}")
+        return '\n'.join(lines)
+
+
+def add_arguments(parser):
+    """--profile and --profile-dir for an ingestion command"""
+    parser.add_argument('--profile', action='store_true',
+                        help='Print wall time, ESPN requests, SQL statements and rows written per phase')
+    parser.add_argument('--profile-dir', help='Also save cProfile output for each phase in this directory')
+
+
+def from_options(options):
+    return Profiler(enabled=options['profile'] or bool(options['profile_dir']), dump_dir=options['profile_dir'])
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubESPNServer:
+    """Local stand-in for the ESPN APIs used by benchmarks.
+
+    Every request sleeps for ``latency`` seconds before answering, which is what
+    dominates a real ingestion run. Week event lists return ``events_per_week``
+    refs, event documents return a minimal competition payload and athlete
+    gamelogs return one season of passing totals. Responses
+    carry an ETag and a matching If-None-Match is answered with a 304.
+    """
+
+    def __init__(self, latency=0.05, events_per_week=16, documents=None, season=2025):
+        self.latency = latency
+        self.events_per_week = events_per_week
+        self.season = season
+        self.documents = documents or {}
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._lock:
+                    stub.request_count += 1
+                time.sleep(stub.latency)
+                body = json.dumps(stub.document_for(self.path)).encode()
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def document_for(self, path):
+        path = path.split('?')[0]
+        if path in self.documents:
+            return self.documents[path]
+
+        week = re.search(r'/weeks/(\d+)/events$', path)
+        if week:
+            week_num = int(week.group(1))
+            return {'items': [
+                {'$ref': f'{self.base_url}/nfl/events/{week_num * 1000 + i}'}
+                for i in range(self.events_per_week)
+            ]}
+
+        event = re.search(r'/events/(\d+)$', path)
+        if event:
+            return {
+                'shortName': f'E{event.group(1)}',
+                'date': '2025-09-07T17:00Z',
+                'competitions': [{'competitors': [
+                    {'homeAway': 'home', 'team': {'$ref': f'{self.base_url}/teams/1'}},
+                    {'homeAway': 'away', 'team': {'$ref': f'{self.base_url}/teams/2'}},
+                ]}],
+            }
+
+        athlete = re.search(r'/athletes/(\d+)/gamelog$', path)
+        if athlete:
+            athlete_id = int(athlete.group(1))
+            totals = [str(athlete_id % 100 + i) for i in range(15)]
+            return {
+                'athlete': {'displayName': f'Athlete {athlete_id}'},
+                'seasonTypes': [{
+                    'displayName': f'{self.season} Regular Season',
+                    'categories': [{'displayName': 'Passing', 'totals': totals}],
+                }],
+            }
+
+        return {}
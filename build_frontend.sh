@@ -8,4 +8,7 @@ rm -rf backend/staticfiles/*
 cp -r frontend/dist/* backend/staticfiles/
 cp backend/staticfiles/index.html backend/templates/index.html
 
+echo "Precompressing static files..."
+python backend/manage.py compress_static
+
 echo "Build complete. Frontend files are ready for production."
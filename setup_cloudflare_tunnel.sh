@@ -260,9 +260,10 @@ setup_django() {
 setup_gunicorn() {
     print_status "Setting up Gunicorn service..."
     
+    # ASGI workers, so the /api/live/ stream doesn't hold a worker
     sudo tee /etc/supervisor/conf.d/$APP_NAME.conf > /dev/null << EOF
 [program:$APP_NAME]
-command=$APP_DIR/venv/bin/gunicorn --workers 3 --bind 127.0.0.1:8000 sports.wsgi:application
+command=$APP_DIR/venv/bin/gunicorn --workers 3 --worker-class uvicorn.workers.UvicornWorker --bind 127.0.0.1:8000 sports.asgi:application
 directory=$APP_DIR/backend
 user=$APP_USER
 autostart=true
@@ -249,10 +249,10 @@ setup_django() {
 setup_gunicorn() {
     print_status "Setting up Gunicorn service..."
     
-    # Create Gunicorn configuration
+    # Create Gunicorn configuration (ASGI workers, so the /api/live/ stream doesn't hold a worker)
     sudo tee /etc/supervisor/conf.d/$APP_NAME.conf > /dev/null << EOF
 [program:$APP_NAME]
-command=$APP_DIR/venv/bin/gunicorn --workers 3 --bind unix:$APP_DIR/gunicorn.sock sports.wsgi:application
+command=$APP_DIR/venv/bin/gunicorn --workers 3 --worker-class uvicorn.workers.UvicornWorker --bind unix:$APP_DIR/gunicorn.sock sports.asgi:application
 directory=$APP_DIR/backend
 user=$APP_USER
 autostart=true
@@ -15,8 +15,8 @@ tmux new-session -d -s nfl-app
 # Split the window into two panes
 tmux split-window -h
 
-# Send commands to the first pane (backend)
-tmux send-keys -t nfl-app:0.0 'export DJANGO_SETTINGS_MODULE=sports.production_settings && source venv/bin/activate && python backend/manage.py runserver 8001' C-m
+# Send commands to the first pane (backend, served over ASGI for the live score stream)
+tmux send-keys -t nfl-app:0.0 'export DJANGO_SETTINGS_MODULE=sports.production_settings && source venv/bin/activate && cd backend && uvicorn sports.asgi:application --port 8001' C-m
 
 # Send commands to the second pane (tunnel)
 tmux send-keys -t nfl-app:0.1 'cloudflared tunnel --config /home/t/projects/nfl-sports-app/sports-info-tunnel.yml run' C-m